@@ -9,6 +9,8 @@ Usage:
     python claude-task-client.py list              # List pending tasks
     python claude-task-client.py next              # Get next task
     python claude-task-client.py claim <id>        # Claim a task
+    python claude-task-client.py claim-next        # Atomically claim the next task
+    python claude-task-client.py watch             # Block until a task is available
     python claude-task-client.py complete <id>     # Mark task complete
     python claude-task-client.py status            # Show queue status
     python claude-task-client.py add "task desc"   # Add a new task
@@ -25,6 +27,7 @@ Created: December 2024
 import os
 import sys
 import json
+import time
 import socket
 import argparse
 import urllib.request
@@ -40,11 +43,15 @@ API_KEY = os.getenv('ATHENA_API_KEY', 'athena-homelab-key')
 INSTANCE_ID = os.getenv('CLAUDE_INSTANCE', socket.gethostname())
 INSTANCE_NAME = os.getenv('CLAUDE_INSTANCE_NAME', INSTANCE_ID)
 
+# Long-poll wait per request (server caps at 60s) and fallback poll interval
+WATCH_TIMEOUT = 30
+POLL_INTERVAL = 15
+
 # =============================================================================
 # API Client
 # =============================================================================
 
-def api_request(endpoint: str, method: str = 'GET', data: dict = None) -> dict:
+def api_request(endpoint: str, method: str = 'GET', data: dict = None, timeout: float = 10) -> dict:
     """Make an API request to Athena."""
     url = f"{API_URL}{endpoint}"
 
@@ -58,7 +65,7 @@ def api_request(endpoint: str, method: str = 'GET', data: dict = None) -> dict:
     req = urllib.request.Request(url, data=body, headers=headers, method=method)
 
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
             return json.loads(response.read().decode('utf-8'))
     except urllib.error.HTTPError as e:
         error_body = e.read().decode('utf-8')
@@ -154,6 +161,91 @@ def cmd_claim(args):
 
     return 0
 
+def cmd_claim_next(args):
+    """Atomically claim the next available task."""
+    result = api_request('/api/tasks/claim-next', 'POST', {
+        'instance_id': INSTANCE_ID,
+        'instance_name': INSTANCE_NAME,
+        'tag': args.tag,
+        'priority': args.priority
+    })
+
+    if 'error' in result:
+        print(f"Error: {result['error']}")
+        return 1
+
+    task = result.get('task')
+
+    if not task:
+        print("✨ No pending tasks. Queue is empty!")
+        return 0
+
+    print(f"✅ Task #{task['id']} claimed by {INSTANCE_NAME}")
+    print(f"Description: {task['description']}")
+    print(f"\nTo complete: python claude-task-client.py complete {task['id']}")
+
+    return 0
+
+def wait_for_task(interval: int) -> dict:
+    """Block until a task is pending, via long-poll or falling back to polling."""
+    long_poll = True
+
+    while True:
+        if long_poll:
+            result = api_request(f'/api/tasks/wait?timeout={WATCH_TIMEOUT}', timeout=WATCH_TIMEOUT + 10)
+            if result.get('status') in (404, 405):
+                # Older server without the long-poll endpoint
+                print(f"Long-poll unavailable, polling every {interval}s")
+                long_poll = False
+                continue
+        else:
+            result = api_request('/api/tasks/next')
+
+        if 'error' in result:
+            print(f"⚠️  {result['error']} (retrying in {interval}s)")
+            time.sleep(interval)
+            continue
+
+        if result.get('task'):
+            return result['task']
+
+        if not long_poll:
+            time.sleep(interval)
+
+def cmd_watch(args):
+    """Wait for the next task, optionally claiming it."""
+    print(f"👀 Watching for tasks as {INSTANCE_NAME}... (Ctrl+C to stop)")
+
+    try:
+        while True:
+            task = wait_for_task(args.interval)
+
+            if not args.claim:
+                priority_icons = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}
+                icon = priority_icons.get(task['priority'], '🟡')
+                print(f"\n⏭️  Task available: #{task['id']} {icon} {task['description']}")
+                print(f"To claim: python claude-task-client.py claim {task['id']}")
+                return 0
+
+            result = api_request('/api/tasks/claim-next', 'POST', {
+                'instance_id': INSTANCE_ID,
+                'instance_name': INSTANCE_NAME
+            })
+            if 'error' in result:
+                print(f"Error: {result['error']}")
+                return 1
+
+            claimed = result.get('task')
+            if claimed:
+                print(f"\n✅ Task #{claimed['id']} claimed by {INSTANCE_NAME}")
+                print(f"Description: {claimed['description']}")
+                print(f"\nTo complete: python claude-task-client.py complete {claimed['id']}")
+                return 0
+            # Another instance won the race; keep watching
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+        return 0
+
 def cmd_complete(args):
     """Mark a task as complete."""
     if not args.task_id:
@@ -288,6 +380,8 @@ Examples:
     %(prog)s list                     List all pending tasks
     %(prog)s next                     Get the next task to work on
     %(prog)s claim 5                  Claim task #5
+    %(prog)s claim-next -p high       Claim the next high priority task
+    %(prog)s watch --claim            Wait for a task and claim it
     %(prog)s complete 5               Mark task #5 as done
     %(prog)s complete 5 -n "notes"    Complete with notes
     %(prog)s add "Deploy new service" Add a new task
@@ -309,6 +403,18 @@ Examples:
     claim_parser = subparsers.add_parser('claim', help='Claim a task')
     claim_parser.add_argument('task_id', type=int, help='Task ID to claim')
 
+    # claim-next
+    claim_next_parser = subparsers.add_parser('claim-next', help='Atomically claim the next task')
+    claim_next_parser.add_argument('-t', '--tag', help='Only claim tasks with this tag')
+    claim_next_parser.add_argument('-p', '--priority', choices=['high', 'medium', 'low'],
+                                   help='Only claim tasks with this priority')
+
+    # watch
+    watch_parser = subparsers.add_parser('watch', help='Wait for the next task')
+    watch_parser.add_argument('-c', '--claim', action='store_true', help='Claim the task once available')
+    watch_parser.add_argument('-i', '--interval', type=int, default=POLL_INTERVAL,
+                              help='Polling interval when long-poll is unavailable')
+
     # complete
     complete_parser = subparsers.add_parser('complete', help='Complete a task')
     complete_parser.add_argument('task_id', type=int, help='Task ID to complete')
@@ -339,6 +445,8 @@ Examples:
         'list': cmd_list,
         'next': cmd_next,
         'claim': cmd_claim,
+        'claim-next': cmd_claim_next,
+        'watch': cmd_watch,
         'complete': cmd_complete,
         'add': cmd_add,
         'status': cmd_status,
@@ -30,9 +30,11 @@ Info:
 
 import os
 import re
+import shlex
 import asyncio
-import subprocess
+from dataclasses import dataclass
 from datetime import datetime
+import asyncssh
 from flask import Flask, request, jsonify
 import discord
 from discord import app_commands, ui
@@ -47,6 +49,10 @@ logger = logging.getLogger(__name__)
 DISCORD_TOKEN = os.environ.get('DISCORD_TOKEN', '')
 WEBHOOK_PORT = int(os.environ.get('WEBHOOK_PORT', '5000'))
 SSH_KEY_PATH = os.environ.get('SSH_KEY_PATH', '/root/.ssh/homelab_ed25519')
+SSH_USER = 'hermes-admin'
+SSH_CONNECT_TIMEOUT = 10
+SSH_KEEPALIVE_INTERVAL = 15
+SSH_MAX_CHANNELS = 8  # Concurrent commands per host, below OpenSSH's MaxSessions (10)
 ALLOWED_CHANNELS = os.environ.get('ALLOWED_CHANNELS', 'container-updates')
 
 # Container to host mapping
@@ -143,6 +149,10 @@ class ArgusBot(commands.Bot):
         await self.tree.sync()
         logger.info("Slash commands synced")
 
+    async def close(self):
+        await ssh_pool.close()
+        await super().close()
+
 bot = ArgusBot()
 
 
@@ -210,9 +220,7 @@ class UpdateApprovalView(ui.View):
         )
 
         # Perform update
-        new_version, error = await asyncio.get_event_loop().run_in_executor(
-            None, update_container, self.host_ip, self.container_name
-        )
+        new_version, error = await update_container(self.host_ip, self.container_name)
 
         if error:
             await interaction.followup.send(
@@ -269,9 +277,7 @@ class UpdateAllView(ui.View):
         failed = []
 
         for container_name, host_ip in self.updates.items():
-            new_version, error = await asyncio.get_event_loop().run_in_executor(
-                None, update_container, host_ip, container_name
-            )
+            new_version, error = await update_container(host_ip, container_name)
 
             if error:
                 failed.append(f"{container_name}: {error[:50]}")
@@ -307,171 +313,228 @@ class UpdateAllView(ui.View):
 # SSH Helper Functions
 # ============================================================================
 
-def ssh_command(host: str, command: str, timeout: int = 30) -> str:
-    """Execute SSH command and return output."""
-    try:
-        cmd = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no "
-            f"-o ConnectTimeout=10 hermes-admin@{host} \"{command}\""
-        )
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
-        return result.stdout.strip() if result.returncode == 0 else ""
-    except Exception as e:
-        logger.error(f"SSH error to {host}: {e}")
-        return ""
+@dataclass
+class SSHResult:
+    """Result of a remote command."""
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+class _PoolClient(asyncssh.SSHClient):
+    """Drops a connection from the pool when it is lost."""
+
+    def __init__(self, pool: 'SSHPool', host: str):
+        self._pool = pool
+        self._host = host
+        self._conn = None
+
+    def connection_made(self, conn):
+        self._conn = conn
+
+    def connection_lost(self, exc):
+        self._pool.discard(self._host, self._conn)
+
+
+class SSHPool:
+    """
+    One long-lived SSH connection per host, shared by all commands.
+
+    Commands run as channels over the pooled connection, so only the first
+    command to a host pays for the handshake. Keepalives detect dead peers
+    and lost connections are reopened on next use.
+    """
+
+    def __init__(self, key_path: str, user: str):
+        self.key_path = key_path
+        self.user = user
+        self._conns = {}
+        self._locks = {}
+        self._slots = {}
+
+    async def _connection(self, host: str):
+        if host not in self._locks:
+            self._locks[host] = asyncio.Lock()
+
+        # Single-flight: concurrent commands to a new host share one connect
+        async with self._locks[host]:
+            conn = self._conns.get(host)
+            if conn is None:
+                conn = await asyncssh.connect(
+                    host,
+                    username=self.user,
+                    client_keys=[self.key_path],
+                    known_hosts=None,
+                    connect_timeout=SSH_CONNECT_TIMEOUT,
+                    keepalive_interval=SSH_KEEPALIVE_INTERVAL,
+                    client_factory=lambda: _PoolClient(self, host),
+                )
+                self._conns[host] = conn
+            return conn
+
+    def discard(self, host: str, conn) -> None:
+        if self._conns.get(host) is conn:
+            del self._conns[host]
+
+    async def run(self, host: str, command: str, timeout: int = 30) -> SSHResult:
+        """Run a command on a host. Failures are returned as returncode -1."""
+        if host not in self._slots:
+            self._slots[host] = asyncio.Semaphore(SSH_MAX_CHANNELS)
+
+        try:
+            async with self._slots[host]:
+                conn = await self._connection(host)
+                result = await asyncio.wait_for(conn.run(command, check=False), timeout=timeout)
+            return SSHResult(
+                returncode=result.exit_status if result.exit_status is not None else -1,
+                stdout=result.stdout or '',
+                stderr=result.stderr or ''
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"SSH command timed out on {host}: {command[:50]}")
+            return SSHResult(-1, '', f'Command timed out after {timeout}s')
+        except (asyncssh.Error, OSError) as e:
+            logger.error(f"SSH error to {host}: {e}")
+            return SSHResult(-1, '', str(e))
 
+    async def close(self) -> None:
+        for conn in list(self._conns.values()):
+            conn.close()
+        self._conns.clear()
 
-def get_container_info(host_ip: str, container_name: str) -> dict:
-    """Get container status and image info."""
-    try:
-        cmd = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no -o ConnectTimeout=5 "
-            f"hermes-admin@{host_ip} "
-            f"\"docker inspect {container_name} --format "
-            f"'{{{{.State.Status}}}}|{{{{.Config.Image}}}}|{{{{.State.StartedAt}}}}' 2>/dev/null\""
-        )
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=15)
-        if result.returncode == 0 and result.stdout.strip():
-            parts = result.stdout.strip().split('|')
-            return {
-                'status': parts[0] if parts else 'unknown',
-                'image': parts[1] if len(parts) > 1 else 'unknown',
-                'started_at': parts[2] if len(parts) > 2 else 'unknown'
-            }
-    except Exception as e:
-        logger.error(f"Error getting info for {container_name}: {e}")
-    return None
 
+ssh_pool = SSHPool(SSH_KEY_PATH, SSH_USER)
 
-def check_for_updates_on_host(host_ip: str) -> str:
-    """Run watchtower check on a specific host."""
-    try:
-        cmd = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no -o ConnectTimeout=10 "
-            f"hermes-admin@{host_ip} "
-            f"\"docker exec watchtower /watchtower --run-once 2>&1\" 2>/dev/null"
-        )
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=120)
-        return result.stdout
-    except Exception as e:
-        logger.error(f"Error checking updates on {host_ip}: {e}")
-    return ""
 
+def group_by_host(containers: dict) -> dict:
+    """Group a container -> host mapping into host -> [containers]."""
+    hosts = {}
+    for container, host_ip in containers.items():
+        hosts.setdefault(host_ip, []).append(container)
+    return hosts
 
-def update_container(host_ip: str, container_name: str) -> tuple:
-    """Update a container and return (new_version, error)."""
-    try:
-        # Get compose directory
-        cmd_dir = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no hermes-admin@{host_ip} "
-            f"\"docker inspect {container_name} --format "
-            f"'{{{{index .Config.Labels \\\"com.docker.compose.project.working_dir\\\"}}}}'\""
-        )
-        result = subprocess.run(cmd_dir, shell=True, capture_output=True, text=True, timeout=30)
-        compose_dir = result.stdout.strip()
-
-        if not compose_dir:
-            return None, "Could not find compose directory"
 
-        # Pull and recreate
-        cmd_update = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no hermes-admin@{host_ip} "
-            f"\"cd {compose_dir} && sudo docker compose pull {container_name} && "
-            f"sudo docker compose up -d {container_name}\""
-        )
-        result = subprocess.run(cmd_update, shell=True, capture_output=True, text=True, timeout=300)
+async def ssh_command(host: str, command: str, timeout: int = 30) -> str:
+    """Execute SSH command and return output."""
+    result = await ssh_pool.run(host, command, timeout=timeout)
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+async def get_host_containers(host_ip: str, containers: list) -> dict:
+    """
+    Get status and image info for several containers on a host in one docker inspect.
+
+    Returns:
+        {container_name: {'status', 'image', 'started_at'}} for the containers found
+    """
+    names = ' '.join(shlex.quote(c) for c in containers)
+    result = await ssh_pool.run(
+        host_ip,
+        f"docker inspect {names} --format "
+        f"'{{{{.Name}}}}|{{{{.State.Status}}}}|{{{{.Config.Image}}}}|{{{{.State.StartedAt}}}}' 2>/dev/null",
+        timeout=15
+    )
 
-        if result.returncode != 0:
-            return None, result.stderr
+    # Missing containers make docker exit non-zero, but the others are still printed
+    info = {}
+    for line in result.stdout.splitlines():
+        parts = line.strip().split('|')
+        if len(parts) < 2:
+            continue
+        info[parts[0].lstrip('/')] = {
+            'status': parts[1],
+            'image': parts[2] if len(parts) > 2 else 'unknown',
+            'started_at': parts[3] if len(parts) > 3 else 'unknown'
+        }
+    return info
 
-        # Get new version
-        cmd_version = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no hermes-admin@{host_ip} "
-            f"\"docker inspect {container_name} --format '{{{{.Config.Image}}}}'\""
-        )
-        result = subprocess.run(cmd_version, shell=True, capture_output=True, text=True, timeout=30)
 
-        return result.stdout.strip(), None
-    except Exception as e:
-        return None, str(e)
+async def check_for_updates_on_host(host_ip: str) -> str:
+    """Run watchtower check on a specific host."""
+    result = await ssh_pool.run(host_ip, "docker exec watchtower /watchtower --run-once 2>&1", timeout=120)
+    return result.stdout
 
 
-def check_vm_updates(host_ip: str) -> dict:
-    """Check for package updates on a VM."""
-    try:
-        # Update apt cache and check for upgrades
-        cmd = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no -o ConnectTimeout=10 "
-            f"hermes-admin@{host_ip} "
-            f"\"sudo apt update -qq 2>/dev/null && apt list --upgradable 2>/dev/null | grep -v Listing | wc -l\""
-        )
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
-        count = int(result.stdout.strip()) if result.stdout.strip().isdigit() else 0
-
-        # Get list of upgradable packages
-        packages = []
-        if count > 0:
-            cmd_list = (
-                f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no "
-                f"hermes-admin@{host_ip} "
-                f"\"apt list --upgradable 2>/dev/null | grep -v Listing | head -10\""
-            )
-            result_list = subprocess.run(cmd_list, shell=True, capture_output=True, text=True, timeout=30)
-            packages = result_list.stdout.strip().split('\n') if result_list.stdout.strip() else []
+async def update_container(host_ip: str, container_name: str) -> tuple:
+    """Update a container and return (new_version, error)."""
+    name = shlex.quote(container_name)
 
+    # Get compose directory
+    compose_dir = await ssh_command(
+        host_ip,
+        f"docker inspect {name} --format "
+        f"'{{{{index .Config.Labels \"com.docker.compose.project.working_dir\"}}}}'"
+    )
+    if not compose_dir:
+        return None, "Could not find compose directory"
+
+    # Pull and recreate
+    result = await ssh_pool.run(
+        host_ip,
+        f"cd {shlex.quote(compose_dir)} && sudo docker compose pull {name} && "
+        f"sudo docker compose up -d {name}",
+        timeout=300
+    )
+    if result.returncode != 0:
+        return None, result.stderr
+
+    # Get new version
+    return await ssh_command(host_ip, f"docker inspect {name} --format '{{{{.Config.Image}}}}'"), None
+
+
+async def check_vm_updates(host_ip: str) -> dict:
+    """Check for package updates on a VM (one exec: refresh the cache, list upgrades)."""
+    # Only the listing may come up empty (grep exits 1); a failed sudo or
+    # cache refresh fails the command, so the host is reported as unchecked
+    result = await ssh_pool.run(
+        host_ip,
+        "sudo -n apt update -qq 2>/dev/null && "
+        "{ apt list --upgradable 2>/dev/null | grep -v Listing || true; }",
+        timeout=60
+    )
+    if result.returncode != 0:
         return {
-            'count': count,
-            'packages': packages,
-            'error': None
+            'count': 0,
+            'packages': [],
+            'error': result.stderr.strip() or f"apt update failed (exit {result.returncode})"
         }
-    except Exception as e:
-        return {'count': 0, 'packages': [], 'error': str(e)}
 
+    packages = [line for line in result.stdout.splitlines() if line.strip()]
+    return {
+        'count': len(packages),
+        'packages': packages[:10],
+        'error': None
+    }
 
-def apply_vm_updates(host_ip: str) -> tuple:
-    """Apply package updates on a VM. Returns (success, message)."""
-    try:
-        cmd = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no "
-            f"hermes-admin@{host_ip} "
-            f"\"sudo apt update -qq && sudo DEBIAN_FRONTEND=noninteractive apt upgrade -y -qq\""
-        )
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=600)
 
-        if result.returncode == 0:
-            # Check if reboot required
-            cmd_reboot = (
-                f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no "
-                f"hermes-admin@{host_ip} \"test -f /var/run/reboot-required && echo 'reboot' || echo 'ok'\""
-            )
-            reboot_result = subprocess.run(cmd_reboot, shell=True, capture_output=True, text=True, timeout=10)
-            needs_reboot = 'reboot' in reboot_result.stdout
+async def apply_vm_updates(host_ip: str) -> tuple:
+    """Apply package updates on a VM. Returns (success, message)."""
+    result = await ssh_pool.run(
+        host_ip,
+        "sudo apt update -qq && sudo DEBIAN_FRONTEND=noninteractive apt upgrade -y -qq && "
+        "(test -f /var/run/reboot-required && echo 'reboot' || echo 'ok')",
+        timeout=600
+    )
+    if result.returncode != 0:
+        return False, result.stderr[:200]
 
-            return True, "Reboot required" if needs_reboot else "Complete"
-        else:
-            return False, result.stderr[:200]
-    except Exception as e:
-        return False, str(e)
+    # Check if reboot required
+    needs_reboot = result.stdout.strip().endswith('reboot')
+    return True, "Reboot required" if needs_reboot else "Complete"
 
 
-def rebuild_container(host_ip: str, container_path: str) -> tuple:
+async def rebuild_container(host_ip: str, container_path: str) -> tuple:
     """Rebuild a custom container. Returns (success, message)."""
-    try:
-        cmd = (
-            f"ssh -i {SSH_KEY_PATH} -o StrictHostKeyChecking=no "
-            f"hermes-admin@{host_ip} "
-            f"\"cd {container_path} && sudo docker compose down && "
-            f"sudo docker compose build --no-cache && "
-            f"sudo docker compose up -d\""
-        )
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=300)
-
-        if result.returncode == 0:
-            return True, "Rebuilt successfully"
-        else:
-            return False, result.stderr[:200]
-    except Exception as e:
-        return False, str(e)
+    result = await ssh_pool.run(
+        host_ip,
+        f"cd {shlex.quote(container_path)} && sudo docker compose down && "
+        f"sudo docker compose build --no-cache && "
+        f"sudo docker compose up -d",
+        timeout=300
+    )
+    if result.returncode == 0:
+        return True, "Rebuilt successfully"
+    return False, result.stderr[:200]
 
 
 # ============================================================================
@@ -539,45 +602,44 @@ async def check_updates(interaction: discord.Interaction):
 
     await interaction.response.defer()
 
-    # Group containers by host
-    hosts = {}
-    for container, host_ip in CONTAINER_HOSTS.items():
-        if host_ip not in hosts:
-            hosts[host_ip] = []
-        hosts[host_ip].append(container)
-
-    results = []
-    updates_found = []
-
-    # Check each host
-    for host_ip, containers in hosts.items():
-        for container in containers:
-            info = await asyncio.get_event_loop().run_in_executor(
-                None, get_container_info, host_ip, container
-            )
-            if info:
-                results.append({
-                    'name': container,
-                    'host': host_ip,
-                    'status': info['status'],
-                    'image': info['image'],
-                    'has_update': False
-                })
-
-        # Run watchtower check
-        output = await asyncio.get_event_loop().run_in_executor(
-            None, check_for_updates_on_host, host_ip
+    async def check_host(host_ip: str, containers: list) -> list:
+        """Inspect a host's containers and run its watchtower check, concurrently."""
+        info, output = await asyncio.gather(
+            get_host_containers(host_ip, containers),
+            check_for_updates_on_host(host_ip)
         )
+        host_results = [
+            {
+                'name': container,
+                'host': host_ip,
+                'status': info[container]['status'],
+                'image': info[container]['image'],
+                'has_update': False
+            }
+            for container in containers if container in info
+        ]
 
         # Parse update notifications
         found = re.findall(r'Found new (.+?) image', output)
         for image_name in found:
             container_name = image_name.split('/')[-1].split(':')[0]
-            for result in results:
+            for result in host_results:
                 if container_name.lower() in result['name'].lower():
                     result['has_update'] = True
-                    updates_found.append(result['name'])
-                    available_updates[result['name']] = host_ip
+        return host_results
+
+    # Check all hosts concurrently
+    hosts = group_by_host(CONTAINER_HOSTS)
+    per_host = await asyncio.gather(*(
+        check_host(host_ip, containers) for host_ip, containers in hosts.items()
+    ))
+
+    results = [result for host_results in per_host for result in host_results]
+    updates_found = []
+    for result in results:
+        if result['has_update']:
+            updates_found.append(result['name'])
+            available_updates[result['name']] = result['host']
 
     # Build response
     embed = discord.Embed(
@@ -636,9 +698,7 @@ async def update_single(interaction: discord.Interaction, container: str):
 
     await interaction.followup.send(f" Updating **{matched}**...")
 
-    new_version, error = await asyncio.get_event_loop().run_in_executor(
-        None, update_container, host_ip, matched
-    )
+    new_version, error = await update_container(host_ip, matched)
 
     if error:
         await interaction.followup.send(
@@ -687,11 +747,7 @@ async def update_all(interaction: discord.Interaction):
 async def list_containers(interaction: discord.Interaction):
     """List all monitored containers."""
     # Group by host
-    hosts = {}
-    for container, host_ip in CONTAINER_HOSTS.items():
-        if host_ip not in hosts:
-            hosts[host_ip] = []
-        hosts[host_ip].append(container)
+    hosts = group_by_host(CONTAINER_HOSTS)
 
     embed = discord.Embed(
         title=" Monitored Containers",
@@ -729,18 +785,15 @@ async def container_status(interaction: discord.Interaction):
     stopped = []
     unknown = []
 
-    # Group by host for efficiency
-    hosts = {}
-    for container, host_ip in CONTAINER_HOSTS.items():
-        if host_ip not in hosts:
-            hosts[host_ip] = []
-        hosts[host_ip].append(container)
+    # One docker inspect per host, all hosts concurrently
+    hosts = group_by_host(CONTAINER_HOSTS)
+    host_info = await asyncio.gather(*(
+        get_host_containers(host_ip, containers) for host_ip, containers in hosts.items()
+    ))
 
-    for host_ip, containers in hosts.items():
+    for containers, infos in zip(hosts.values(), host_info):
         for container in containers:
-            info = await asyncio.get_event_loop().run_in_executor(
-                None, get_container_info, host_ip, container
-            )
+            info = infos.get(container)
             if info:
                 if info['status'] == 'running':
                     running.append(container)
@@ -794,11 +847,10 @@ async def vm_check(interaction: discord.Interaction):
     results = []
     total_updates = 0
 
-    for vm_name, host_ip in VM_HOSTS.items():
-        update_info = await asyncio.get_event_loop().run_in_executor(
-            None, check_vm_updates, host_ip
-        )
+    # Check all VMs concurrently
+    checks = await asyncio.gather(*(check_vm_updates(host_ip) for host_ip in VM_HOSTS.values()))
 
+    for (vm_name, host_ip), update_info in zip(VM_HOSTS.items(), checks):
         results.append({
             'name': vm_name,
             'ip': host_ip,
@@ -871,9 +923,7 @@ async def vm_update(interaction: discord.Interaction, host: str):
     await interaction.response.defer()
 
     # Check for updates first
-    update_info = await asyncio.get_event_loop().run_in_executor(
-        None, check_vm_updates, host_ip
-    )
+    update_info = await check_vm_updates(host_ip)
 
     if update_info['count'] == 0:
         await interaction.followup.send(f" **{matched_name}** is already up to date!")
@@ -884,9 +934,7 @@ async def vm_update(interaction: discord.Interaction, host: str):
     )
 
     # Apply updates
-    success, message = await asyncio.get_event_loop().run_in_executor(
-        None, apply_vm_updates, host_ip
-    )
+    success, message = await apply_vm_updates(host_ip)
 
     if success:
         emoji = "" if message == "Complete" else ""
@@ -908,10 +956,8 @@ async def vm_update_all(interaction: discord.Interaction):
 
     # First check which VMs need updates
     vms_with_updates = []
-    for vm_name, host_ip in VM_HOSTS.items():
-        update_info = await asyncio.get_event_loop().run_in_executor(
-            None, check_vm_updates, host_ip
-        )
+    checks = await asyncio.gather(*(check_vm_updates(host_ip) for host_ip in VM_HOSTS.values()))
+    for (vm_name, host_ip), update_info in zip(VM_HOSTS.items(), checks):
         if update_info['count'] > 0:
             vms_with_updates.append({
                 'name': vm_name,
@@ -937,9 +983,7 @@ async def vm_update_all(interaction: discord.Interaction):
     failed = []
 
     for vm in vms_with_updates:
-        success, message = await asyncio.get_event_loop().run_in_executor(
-            None, apply_vm_updates, vm['ip']
-        )
+        success, message = await apply_vm_updates(vm['ip'])
 
         if success:
             success_count += 1
@@ -994,9 +1038,7 @@ async def rebuild(interaction: discord.Interaction, container: str):
         f" Rebuilding **{matched_name}**... This will update base image and rebuild."
     )
 
-    success, message = await asyncio.get_event_loop().run_in_executor(
-        None, rebuild_container, container_info['host'], container_info['path']
-    )
+    success, message = await rebuild_container(container_info['host'], container_info['path'])
 
     if success:
         await interaction.followup.send(
@@ -3,11 +3,22 @@
 Media Stats API Aggregator
 Combines Radarr and Sonarr stats into a single endpoint for Glance dashboard.
 Returns all media stats in a format suitable for the 3x3 tile grid layout.
+
+Stats are refreshed in the background and served from a snapshot, so
+dashboard hits never reach Radarr or Sonarr (except ?fresh=1).
 """
 
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
 import requests
-from flask import Flask, jsonify
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
 app = Flask(__name__)
@@ -19,151 +30,177 @@ RADARR_API_KEY = os.getenv('RADARR_API_KEY', '')
 SONARR_URL = os.getenv('SONARR_URL', 'http://192.168.40.11:8989')
 SONARR_API_KEY = os.getenv('SONARR_API_KEY', '')
 
-
-def fetch_radarr_stats():
-    """Fetch all Radarr statistics."""
-    headers = {'X-Api-Key': RADARR_API_KEY}
-    stats = {
-        'wanted': 0,
-        'downloading': 0,
-        'downloaded': 0
-    }
-
+# Seconds between refreshes of the cheap counts (wanted, downloading)
+REFRESH_INTERVAL = int(os.getenv('REFRESH_INTERVAL', '60'))
+
+# Seconds between full library listings (downloaded counts); they are also
+# refreshed early whenever a queue shrinks, i.e. something was imported
+LIBRARY_REFRESH_INTERVAL = int(os.getenv('LIBRARY_REFRESH_INTERVAL', '900'))
+
+SERVICES = {
+    'radarr': (RADARR_URL, RADARR_API_KEY),
+    'sonarr': (SONARR_URL, SONARR_API_KEY),
+}
+
+# Dashboard tiles: (label, service, stat, color, icon)
+TILES = [
+    ('WANTED MOVIES', 'radarr', 'wanted', '#f59e0b', 'movie'),
+    ('MOVIES DOWNLOADING', 'radarr', 'downloading', '#3b82f6', 'download'),
+    ('MOVIES DOWNLOADED', 'radarr', 'downloaded', '#22c55e', 'check'),
+    ('WANTED EPISODES', 'sonarr', 'wanted', '#ef4444', 'tv'),
+    ('EPISODES DOWNLOADING', 'sonarr', 'downloading', '#8b5cf6', 'download'),
+    ('EPISODES DOWNLOADED', 'sonarr', 'downloaded', '#06b6d4', 'check'),
+]
+
+# Pooled HTTP session shared by the refresh workers
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=len(SERVICES), pool_maxsize=len(TILES)))
+session.mount('https://', HTTPAdapter(pool_connections=len(SERVICES), pool_maxsize=len(TILES)))
+executor = ThreadPoolExecutor(max_workers=len(TILES), thread_name_prefix='refresh')
+
+# Latest stats and the response built from them
+stats = {service: {'wanted': 0, 'downloading': 0, 'downloaded': 0} for service in SERVICES}
+snapshot = {'generation': 0, 'response': None, 'library_at': 0.0, 'library_generation': 0}
+refresh_lock = threading.Lock()
+
+
+def api_get(service, endpoint, params=None, timeout=5):
+    """GET an *arr endpoint. Returns decoded JSON, or None on failure."""
+    base_url, api_key = SERVICES[service]
     try:
-        # Wanted movies
-        resp = requests.get(
-            f'{RADARR_URL}/api/v3/wanted/missing',
-            headers=headers,
-            params={'pageSize': 1},
-            timeout=5
+        resp = session.get(
+            f'{base_url}{endpoint}',
+            headers={'X-Api-Key': api_key},
+            params=params,
+            timeout=timeout
         )
         if resp.ok:
-            stats['wanted'] = resp.json().get('totalRecords', 0)
-
-        # Downloading
-        resp = requests.get(
-            f'{RADARR_URL}/api/v3/queue',
-            headers=headers,
-            params={'pageSize': 1},
-            timeout=5
-        )
-        if resp.ok:
-            stats['downloading'] = resp.json().get('totalRecords', 0)
+            return resp.json()
+        print(f"{service.title()} {endpoint} error: HTTP {resp.status_code}")
+    except (requests.RequestException, ValueError) as e:
+        print(f"{service.title()} {endpoint} error: {e}")
+    return None
 
-        # Downloaded (movies with files)
-        resp = requests.get(
-            f'{RADARR_URL}/api/v3/movie',
-            headers=headers,
-            timeout=10
-        )
-        if resp.ok:
-            movies = resp.json()
-            stats['downloaded'] = sum(1 for m in movies if m.get('hasFile', False))
 
-    except requests.RequestException as e:
-        print(f"Radarr error: {e}")
+def fetch_total(service, endpoint):
+    """Record count of a paged endpoint, fetching a single record."""
+    data = api_get(service, endpoint, params={'pageSize': 1})
+    return data.get('totalRecords', 0) if data is not None else None
 
-    return stats
 
+def fetch_movies_downloaded():
+    """Movies with files."""
+    movies = api_get('radarr', '/api/v3/movie', timeout=10)
+    return sum(1 for m in movies if m.get('hasFile', False)) if movies is not None else None
 
-def fetch_sonarr_stats():
-    """Fetch all Sonarr statistics."""
-    headers = {'X-Api-Key': SONARR_API_KEY}
-    stats = {
-        'wanted': 0,
-        'downloading': 0,
-        'downloaded': 0
-    }
 
-    try:
-        # Wanted episodes
-        resp = requests.get(
-            f'{SONARR_URL}/api/v3/wanted/missing',
-            headers=headers,
-            params={'pageSize': 1},
-            timeout=5
-        )
-        if resp.ok:
-            stats['wanted'] = resp.json().get('totalRecords', 0)
-
-        # Downloading
-        resp = requests.get(
-            f'{SONARR_URL}/api/v3/queue',
-            headers=headers,
-            params={'pageSize': 1},
-            timeout=5
-        )
-        if resp.ok:
-            stats['downloading'] = resp.json().get('totalRecords', 0)
+def fetch_episodes_downloaded():
+    """Episode files, from the per-series statistics (Sonarr has no count endpoint for them)."""
+    series = api_get('sonarr', '/api/v3/series', timeout=10)
+    if series is None:
+        return None
+    return sum(s.get('statistics', {}).get('episodeFileCount', 0) for s in series)
 
-        # Downloaded episodes
-        resp = requests.get(
-            f'{SONARR_URL}/api/v3/series',
-            headers=headers,
-            timeout=10
-        )
-        if resp.ok:
-            series = resp.json()
-            stats['downloaded'] = sum(
-                s.get('statistics', {}).get('episodeFileCount', 0)
-                for s in series
-            )
 
-    except requests.RequestException as e:
-        print(f"Sonarr error: {e}")
+def build_body():
+    """Return the JSON response body for the current stats."""
+    return json.dumps({
+        'stats': [
+            {
+                'label': label,
+                'value': stats[service][stat],
+                'color': color,
+                'icon': icon
+            }
+            for label, service, stat, color, icon in TILES
+        ],
+        'radarr': stats['radarr'],
+        'sonarr': stats['sonarr'],
+        'updated': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+    })
+
 
-    return stats
+def refresh(force=False):
+    """
+    Fetch the stats concurrently and rebuild the snapshot.
+
+    Only one refresh runs at a time; a caller that waited for another
+    refresh to finish uses its result, if that refresh also fetched the
+    library listings when the caller forces them. A failed fetch keeps
+    the previous value.
+
+    Args:
+        force: Also fetch the library listings even if they aren't due
+    """
+    generation = snapshot['generation']
+    with refresh_lock:
+        if snapshot['generation'] != generation and (not force or snapshot['library_generation'] > generation):
+            return
+
+        jobs = {
+            ('radarr', 'wanted'): executor.submit(fetch_total, 'radarr', '/api/v3/wanted/missing'),
+            ('radarr', 'downloading'): executor.submit(fetch_total, 'radarr', '/api/v3/queue'),
+            ('sonarr', 'wanted'): executor.submit(fetch_total, 'sonarr', '/api/v3/wanted/missing'),
+            ('sonarr', 'downloading'): executor.submit(fetch_total, 'sonarr', '/api/v3/queue'),
+        }
+
+        library_due = force or time.monotonic() - snapshot['library_at'] >= LIBRARY_REFRESH_INTERVAL
+        if library_due:
+            jobs[('radarr', 'downloaded')] = executor.submit(fetch_movies_downloaded)
+            jobs[('sonarr', 'downloaded')] = executor.submit(fetch_episodes_downloaded)
+
+        results = {key: job.result() for key, job in jobs.items()}
+
+        # A shrinking queue usually means an import; pick it up now rather than on the next listing
+        imported = any(
+            results[(service, 'downloading')] is not None
+            and results[(service, 'downloading')] < stats[service]['downloading']
+            for service in SERVICES
+        )
+        if imported and not library_due:
+            movies = executor.submit(fetch_movies_downloaded)
+            episodes = executor.submit(fetch_episodes_downloaded)
+            results[('radarr', 'downloaded')] = movies.result()
+            results[('sonarr', 'downloaded')] = episodes.result()
+            library_due = True
+
+        for (service, stat), value in results.items():
+            if value is not None:
+                stats[service][stat] = value
+
+        # Body and ETag are swapped in together
+        etag = hashlib.sha1(json.dumps(stats, sort_keys=True).encode()).hexdigest()
+        snapshot['response'] = (build_body(), etag)
+        snapshot['generation'] += 1
+        if library_due:
+            snapshot['library_at'] = time.monotonic()
+            snapshot['library_generation'] = snapshot['generation']
+
+
+def refresh_loop():
+    """Background refresher."""
+    while True:
+        try:
+            refresh()
+        except Exception as e:
+            print(f"Refresh error: {e}")
+        time.sleep(REFRESH_INTERVAL)
 
 
 @app.route('/api/stats')
 def get_stats():
     """Return combined media stats for Glance dashboard grid."""
-    radarr = fetch_radarr_stats()
-    sonarr = fetch_sonarr_stats()
+    if request.args.get('fresh') == '1' or snapshot['response'] is None:
+        refresh(force=request.args.get('fresh') == '1')
 
     # Return structured data for the 6-tile grid (3x2)
-    return jsonify({
-        'stats': [
-            {
-                'label': 'WANTED MOVIES',
-                'value': radarr['wanted'],
-                'color': '#f59e0b',
-                'icon': 'movie'
-            },
-            {
-                'label': 'MOVIES DOWNLOADING',
-                'value': radarr['downloading'],
-                'color': '#3b82f6',
-                'icon': 'download'
-            },
-            {
-                'label': 'MOVIES DOWNLOADED',
-                'value': radarr['downloaded'],
-                'color': '#22c55e',
-                'icon': 'check'
-            },
-            {
-                'label': 'WANTED EPISODES',
-                'value': sonarr['wanted'],
-                'color': '#ef4444',
-                'icon': 'tv'
-            },
-            {
-                'label': 'EPISODES DOWNLOADING',
-                'value': sonarr['downloading'],
-                'color': '#8b5cf6',
-                'icon': 'download'
-            },
-            {
-                'label': 'EPISODES DOWNLOADED',
-                'value': sonarr['downloaded'],
-                'color': '#06b6d4',
-                'icon': 'check'
-            }
-        ],
-        'radarr': radarr,
-        'sonarr': sonarr
-    })
+    body, etag = snapshot['response']
+    response = Response(body, mimetype='application/json')
+    # Weak: the body's 'updated' time changes even when the stats don't
+    response.set_etag(etag, weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = REFRESH_INTERVAL
+    return response.make_conditional(request)
 
 
 @app.route('/health')
@@ -172,5 +209,8 @@ def health():
     return jsonify({'status': 'ok'})
 
 
+threading.Thread(target=refresh_loop, name='refresh-loop', daemon=True).start()
+
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5054, debug=False)
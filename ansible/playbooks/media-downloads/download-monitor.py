@@ -23,7 +23,9 @@ SONARR_URL = os.getenv("SONARR_URL", "http://192.168.40.11:8989")
 SONARR_API_KEY = os.getenv("SONARR_API_KEY", "")
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL", "")
 JELLYFIN_URL = os.getenv("JELLYFIN_URL", "https://jellyfin.hrmsmrflrii.xyz")
-POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "30"))  # seconds
+# Completions arrive through the webhook receiver; the queue poll only catches
+# starts and milestones, so it runs at a reconciliation cadence
+POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "600"))  # seconds
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
 # Progress thresholds for notifications
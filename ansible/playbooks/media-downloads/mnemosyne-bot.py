@@ -8,7 +8,7 @@ Features:
 - Slash commands for media management
 - Radarr/Sonarr integration
 - Quality profile management
-- Library browsing
+- Library browsing from a local SQLite index (FTS5 title search, paging)
 
 Commands:
   /downloads       - Show current download queue
@@ -26,8 +26,9 @@ Commands:
 import os
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Set, List
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Set, List, Tuple
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
@@ -48,9 +49,17 @@ SONARR_API_KEY = os.getenv("SONARR_API_KEY", "")
 JELLYFIN_URL = os.getenv("JELLYFIN_URL", "https://jellyfin.hrmsmrflrii.xyz")
 
 # Monitoring settings
-POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "60"))  # seconds
+# Each tick fetches both full queues, so it runs at a reconciliation cadence
+# (as Sentinel's *arr queue sweep does) rather than near-real-time
+POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "600"))  # seconds
 PROGRESS_THRESHOLDS = [50, 80, 100]
 
+# Library index (local SQLite copy of the Radarr/Sonarr libraries)
+LIBRARY_DB_PATH = os.getenv("LIBRARY_DB_PATH", "/app/data/library.db")
+LIBRARY_SYNC_MINUTES = int(os.getenv("LIBRARY_SYNC_MINUTES", "10"))
+LIBRARY_FULL_SYNC_HOURS = 24  # full listing reconciles deletions the history feed can't show
+SHOWLIST_PAGE_SIZE = 25
+
 # Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -153,6 +162,189 @@ class DownloadTracker:
 tracker = DownloadTracker()
 
 
+# === Library Index ===
+LIBRARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS library_items (
+    id INTEGER PRIMARY KEY,
+    service TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    sort_title TEXT NOT NULL,
+    year INTEGER,
+    quality TEXT,
+    added TEXT,
+    has_file INTEGER NOT NULL DEFAULT 0,
+    monitored INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    episode_file_count INTEGER NOT NULL DEFAULT 0,
+    episode_count INTEGER NOT NULL DEFAULT 0,
+    season_count INTEGER NOT NULL DEFAULT 0,
+    size_on_disk INTEGER NOT NULL DEFAULT 0,
+    external_id INTEGER,
+    UNIQUE (service, item_id)
+);
+CREATE INDEX IF NOT EXISTS idx_library_title ON library_items(service, has_file, sort_title);
+CREATE INDEX IF NOT EXISTS idx_library_year ON library_items(service, has_file, year);
+CREATE INDEX IF NOT EXISTS idx_library_quality ON library_items(service, has_file, quality);
+CREATE INDEX IF NOT EXISTS idx_library_added ON library_items(service, has_file, added);
+CREATE VIRTUAL TABLE IF NOT EXISTS library_fts USING fts5(
+    title, content='library_items', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS library_items_ai AFTER INSERT ON library_items BEGIN
+    INSERT INTO library_fts(rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS library_items_ad AFTER DELETE ON library_items BEGIN
+    INSERT INTO library_fts(library_fts, rowid, title) VALUES ('delete', old.id, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS library_items_au AFTER UPDATE OF title ON library_items BEGIN
+    INSERT INTO library_fts(library_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    INSERT INTO library_fts(rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TABLE IF NOT EXISTS library_sync (
+    service TEXT PRIMARY KEY,
+    history_cursor TEXT,
+    full_sync_at TEXT
+);
+"""
+
+LIBRARY_COLUMNS = (
+    "service", "item_id", "title", "sort_title", "year", "quality", "added", "has_file",
+    "monitored", "status", "episode_file_count", "episode_count", "season_count",
+    "size_on_disk", "external_id",
+)
+LIBRARY_SORTS = {"title": "sort_title", "year": "year", "quality": "quality", "added": "added"}
+DESCENDING_SORTS = {"year", "added"}
+
+
+def normalize_movie(movie: dict) -> dict:
+    """Library row for a Radarr movie (added = file import date when it has one)."""
+    movie_file = movie.get("movieFile") or {}
+    return {
+        "service": "radarr",
+        "item_id": movie["id"],
+        "title": movie.get("title") or "Unknown",
+        "sort_title": (movie.get("sortTitle") or movie.get("title") or "").lower(),
+        "year": movie.get("year") or None,
+        "quality": movie_file.get("quality", {}).get("quality", {}).get("name"),
+        "added": movie_file.get("dateAdded") or movie.get("added"),
+        "has_file": int(bool(movie.get("hasFile"))),
+        "monitored": int(bool(movie.get("monitored"))),
+        "status": movie.get("status"),
+        "episode_file_count": 0,
+        "episode_count": 0,
+        "season_count": 0,
+        "size_on_disk": movie.get("sizeOnDisk") or 0,
+        "external_id": movie.get("tmdbId"),
+    }
+
+
+def normalize_series(series: dict) -> dict:
+    """Library row for a Sonarr series."""
+    stats = series.get("statistics") or {}
+    return {
+        "service": "sonarr",
+        "item_id": series["id"],
+        "title": series.get("title") or "Unknown",
+        "sort_title": (series.get("sortTitle") or series.get("title") or "").lower(),
+        "year": series.get("year") or None,
+        "quality": None,
+        "added": series.get("added"),
+        "has_file": int(stats.get("episodeFileCount", 0) > 0),
+        "monitored": int(bool(series.get("monitored"))),
+        "status": series.get("status"),
+        "episode_file_count": stats.get("episodeFileCount", 0),
+        "episode_count": stats.get("totalEpisodeCount", 0),
+        "season_count": stats.get("seasonCount", series.get("seasonCount", 0)),
+        "size_on_disk": stats.get("sizeOnDisk", 0),
+        "external_id": series.get("tvdbId"),
+    }
+
+
+class LibraryIndex:
+    """SQLite index of the Radarr/Sonarr libraries with FTS5 title search."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(LIBRARY_SCHEMA)
+
+    def _write_rows(self, rows: List[dict]):
+        updates = ", ".join(f"{c} = excluded.{c}" for c in LIBRARY_COLUMNS[2:])
+        self.conn.executemany(
+            f"INSERT INTO library_items ({', '.join(LIBRARY_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in LIBRARY_COLUMNS)}) "
+            f"ON CONFLICT (service, item_id) DO UPDATE SET {updates}",
+            [tuple(row[c] for c in LIBRARY_COLUMNS) for row in rows]
+        )
+
+    def upsert(self, rows: List[dict]):
+        with self.conn:
+            self._write_rows(rows)
+
+    def replace(self, service: str, rows: List[dict], history_cursor: str) -> int:
+        """Make a service's rows match a full listing. Returns the number removed."""
+        existing = {r[0] for r in self.conn.execute("SELECT item_id FROM library_items WHERE service = ?", (service,))}
+        gone = existing - {row["item_id"] for row in rows}
+        with self.conn:
+            self._write_rows(rows)
+            self.conn.executemany(
+                "DELETE FROM library_items WHERE service = ? AND item_id = ?",
+                [(service, item_id) for item_id in gone]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO library_sync (service, history_cursor, full_sync_at) VALUES (?, ?, ?)",
+                (service, history_cursor, datetime.now(timezone.utc).isoformat())
+            )
+        return len(gone)
+
+    def get_sync(self, service: str) -> Optional[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM library_sync WHERE service = ?", (service,)).fetchone()
+
+    def set_cursor(self, service: str, history_cursor: str):
+        with self.conn:
+            self.conn.execute("UPDATE library_sync SET history_cursor = ? WHERE service = ?", (history_cursor, service))
+
+    def synced(self, service: str) -> bool:
+        """Whether the service has completed a full sync."""
+        return self.get_sync(service) is not None
+
+    def query(self, service: str, available_only: bool = True, search: str = None, sort: str = "title",
+              limit: int = 20, offset: int = 0) -> Tuple[List[sqlite3.Row], int]:
+        """One page of the index plus the total number of matching rows."""
+        where, params = ["service = ?"], [service]
+        if available_only:
+            where.append("has_file = 1")
+        terms = " ".join('"{}"*'.format(term.replace('"', '""')) for term in (search or "").split())
+        if terms:
+            where.append("id IN (SELECT rowid FROM library_fts WHERE library_fts MATCH ?)")
+            params.append(terms)
+        where_sql = " AND ".join(where)
+
+        total = self.conn.execute(f"SELECT COUNT(*) FROM library_items WHERE {where_sql}", params).fetchone()[0]
+        direction = "DESC" if sort in DESCENDING_SORTS else "ASC"
+        rows = self.conn.execute(
+            f"SELECT * FROM library_items WHERE {where_sql} "
+            f"ORDER BY {LIBRARY_SORTS.get(sort, 'sort_title')} {direction}, sort_title LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return rows, total
+
+    def stats(self) -> Dict[str, sqlite3.Row]:
+        rows = self.conn.execute(
+            """SELECT service, COUNT(*) AS total, SUM(has_file) AS available, SUM(monitored) AS monitored,
+                      SUM(IFNULL(status = 'continuing', 0)) AS continuing,
+                      SUM(IFNULL(status = 'ended', 0)) AS ended,
+                      SUM(episode_file_count) AS episode_files
+               FROM library_items GROUP BY service"""
+        ).fetchall()
+        return {row["service"]: row for row in rows}
+
+
+library = LibraryIndex(LIBRARY_DB_PATH)
+
+
 # === Helper Functions ===
 def format_size(bytes_size: int) -> str:
     """Format bytes to human readable size."""
@@ -182,6 +374,38 @@ def create_embed(title: str, description: str = None, color: int = 0x9b59b6, fie
     return embed
 
 
+def add_line_fields(embed: discord.Embed, name: str, lines: List[str]):
+    """Add lines as one or more embed fields (max 1024 chars per field)."""
+    current_chunk = []
+    current_len = 0
+    chunk_num = 1
+
+    for line in lines:
+        if current_len + len(line) + 1 > 1000:
+            embed.add_field(
+                name=f"{name} {chunk_num}" if chunk_num > 1 else name,
+                value="\n".join(current_chunk),
+                inline=False
+            )
+            current_chunk = [line]
+            current_len = len(line)
+            chunk_num += 1
+        else:
+            current_chunk.append(line)
+            current_len += len(line) + 1
+
+    if current_chunk:
+        embed.add_field(
+            name=f"{name} {chunk_num}" if chunk_num > 1 else name,
+            value="\n".join(current_chunk),
+            inline=False
+        )
+
+
+def page_count(total: int, per_page: int) -> int:
+    return max(1, -(-total // per_page))
+
+
 # === Bot Setup ===
 intents = discord.Intents.default()
 bot = commands.Bot(command_prefix="!", intents=intents)
@@ -534,38 +758,34 @@ async def request_command(interaction: discord.Interaction, title: str, media_ty
 @bot.tree.command(name="stats", description="Show media library statistics")
 @is_allowed_channel()
 async def stats_command(interaction: discord.Interaction):
-    """Show library statistics from Radarr and Sonarr."""
+    """Show library statistics from the library index."""
     await interaction.response.defer()
 
     embed = create_embed("Media Library Stats", color=0x9b59b6)
 
-    # Radarr stats
-    movies = await fetch_radarr("movie")
+    await ensure_library()
+    stats = library.stats()
+
+    movies = stats.get("radarr")
     if movies:
-        total_movies = len(movies)
-        downloaded = sum(1 for m in movies if m.get("hasFile"))
-        monitored = sum(1 for m in movies if m.get("monitored"))
         embed.add_field(
             name="Movies",
-            value=f"Total: {total_movies}\nDownloaded: {downloaded}\nMonitored: {monitored}",
+            value=f"Total: {movies['total']}\nDownloaded: {movies['available']}\nMonitored: {movies['monitored']}",
             inline=True
         )
 
-    # Sonarr stats
-    series = await fetch_sonarr("series")
+    series = stats.get("sonarr")
     if series:
-        total_series = len(series)
-        continuing = sum(1 for s in series if s.get("status") == "continuing")
-        ended = sum(1 for s in series if s.get("status") == "ended")
         embed.add_field(
             name="TV Shows",
-            value=f"Total: {total_series}\nContinuing: {continuing}\nEnded: {ended}",
+            value=f"Total: {series['total']}\nContinuing: {series['continuing']}\nEnded: {series['ended']}",
             inline=True
         )
 
     # System stats
-    radarr_status = await fetch_radarr("system/status")
-    sonarr_status = await fetch_sonarr("system/status")
+    radarr_status, sonarr_status = await asyncio.gather(
+        fetch_radarr("system/status"), fetch_sonarr("system/status")
+    )
 
     if radarr_status:
         embed.add_field(
@@ -700,13 +920,25 @@ async def quality_command(interaction: discord.Interaction, service: str = "rada
 
 @bot.tree.command(name="availablemovies", description="List movies available in your library")
 @is_allowed_channel()
-@app_commands.describe(limit="Number of movies to show (default: 20)")
-async def available_movies_command(interaction: discord.Interaction, limit: int = 20):
+@app_commands.describe(
+    limit="Movies per page (default: 20)",
+    page="Page number",
+    sort="Sort order",
+    search="Only titles matching these words"
+)
+@app_commands.choices(sort=[
+    app_commands.Choice(name="Title", value="title"),
+    app_commands.Choice(name="Year (newest first)", value="year"),
+    app_commands.Choice(name="Quality", value="quality"),
+    app_commands.Choice(name="Recently added", value="added"),
+])
+async def available_movies_command(interaction: discord.Interaction, limit: int = 20, page: int = 1,
+                                   sort: str = "title", search: Optional[str] = None):
     """Show movies that are downloaded and available to watch."""
     await interaction.response.defer()
 
-    movies = await fetch_radarr("movie")
-    if not movies:
+    await ensure_library()
+    if not library.synced("radarr"):
         await interaction.followup.send(embed=create_embed(
             "Error",
             "Could not fetch movies from Radarr.",
@@ -714,77 +946,54 @@ async def available_movies_command(interaction: discord.Interaction, limit: int
         ))
         return
 
-    # Filter to only movies with files (available to watch)
-    available = [m for m in movies if m.get("hasFile")]
+    limit, page = max(1, min(limit, 50)), max(1, page)
+    displayed, total = library.query("radarr", search=search, sort=sort, limit=limit, offset=(page - 1) * limit)
 
-    if not available:
+    if not displayed:
         await interaction.followup.send(embed=create_embed(
             "No Movies Available",
-            "No movies are currently downloaded in your library.",
+            "No movies match." if search or page > 1 else "No movies are currently downloaded in your library.",
             color=0xff9900
         ))
         return
 
-    # Sort by title
-    available.sort(key=lambda x: x.get("title", "").lower())
-
-    # Limit results
-    limit = min(limit, 50)
-    displayed = available[:limit]
-
     embed = create_embed(
-        f"Available Movies ({len(available)} total)",
-        f"Showing {len(displayed)} of {len(available)} movies in your library.",
+        f"Available Movies ({total} total)",
+        f"Page {page}/{page_count(total, limit)}: showing {len(displayed)} of {total} movies in your library.",
         color=0x2ecc71
     )
 
-    # Split into chunks for fields
-    movie_lines = []
-    for movie in displayed:
-        title = movie.get("title", "Unknown")
-        year = movie.get("year", "N/A")
-        quality = movie.get("movieFile", {}).get("quality", {}).get("quality", {}).get("name", "Unknown")
-        movie_lines.append(f"**{title}** ({year}) - {quality}")
-
-    # Add movies in chunks (max 1024 chars per field)
-    current_chunk = []
-    current_len = 0
-    chunk_num = 1
+    add_line_fields(embed, "Movies", [
+        f"**{movie['title']}** ({movie['year'] or 'N/A'}) - {movie['quality'] or 'Unknown'}"
+        for movie in displayed
+    ])
 
-    for line in movie_lines:
-        if current_len + len(line) + 1 > 1000:
-            embed.add_field(
-                name=f"Movies {chunk_num}" if chunk_num > 1 else "Movies",
-                value="\n".join(current_chunk),
-                inline=False
-            )
-            current_chunk = [line]
-            current_len = len(line)
-            chunk_num += 1
-        else:
-            current_chunk.append(line)
-            current_len += len(line) + 1
-
-    if current_chunk:
-        embed.add_field(
-            name=f"Movies {chunk_num}" if chunk_num > 1 else "Movies",
-            value="\n".join(current_chunk),
-            inline=False
-        )
-
-    embed.set_footer(text=f"Mnemosyne - {len(available)} movies available | {len(movies) - len(available)} missing")
+    stats = library.stats().get("radarr")
+    embed.set_footer(text=f"Mnemosyne - {stats['available']} movies available | {stats['total'] - stats['available']} missing")
     await interaction.followup.send(embed=embed)
 
 
 @bot.tree.command(name="availableseries", description="List TV series available in your library")
 @is_allowed_channel()
-@app_commands.describe(limit="Number of series to show (default: 20)")
-async def available_series_command(interaction: discord.Interaction, limit: int = 20):
+@app_commands.describe(
+    limit="Series per page (default: 20)",
+    page="Page number",
+    sort="Sort order",
+    search="Only titles matching these words"
+)
+@app_commands.choices(sort=[
+    app_commands.Choice(name="Title", value="title"),
+    app_commands.Choice(name="Year (newest first)", value="year"),
+    app_commands.Choice(name="Quality", value="quality"),
+    app_commands.Choice(name="Recently added", value="added"),
+])
+async def available_series_command(interaction: discord.Interaction, limit: int = 20, page: int = 1,
+                                   sort: str = "title", search: Optional[str] = None):
     """Show TV series that have episodes downloaded."""
     await interaction.response.defer()
 
-    series = await fetch_sonarr("series")
-    if not series:
+    await ensure_library()
+    if not library.synced("sonarr"):
         await interaction.followup.send(embed=create_embed(
             "Error",
             "Could not fetch series from Sonarr.",
@@ -792,113 +1001,72 @@ async def available_series_command(interaction: discord.Interaction, limit: int
         ))
         return
 
-    # Filter to series with at least one episode
-    available = [s for s in series if s.get("statistics", {}).get("episodeFileCount", 0) > 0]
+    limit, page = max(1, min(limit, 50)), max(1, page)
+    displayed, total = library.query("sonarr", search=search, sort=sort, limit=limit, offset=(page - 1) * limit)
 
-    if not available:
+    if not displayed:
         await interaction.followup.send(embed=create_embed(
             "No Series Available",
-            "No TV series episodes are currently downloaded in your library.",
+            "No series match." if search or page > 1 else "No TV series episodes are currently downloaded in your library.",
             color=0xff9900
         ))
         return
 
-    # Sort by title
-    available.sort(key=lambda x: x.get("title", "").lower())
-
-    # Limit results
-    limit = min(limit, 50)
-    displayed = available[:limit]
-
     embed = create_embed(
-        f"Available Series ({len(available)} total)",
-        f"Showing {len(displayed)} of {len(available)} series in your library.",
+        f"Available Series ({total} total)",
+        f"Page {page}/{page_count(total, limit)}: showing {len(displayed)} of {total} series in your library.",
         color=0x2ecc71
     )
 
-    # Split into chunks for fields
-    series_lines = []
-    for show in displayed:
-        title = show.get("title", "Unknown")
-        stats = show.get("statistics", {})
-        episodes = stats.get("episodeFileCount", 0)
-        total_eps = stats.get("totalEpisodeCount", 0)
-        seasons = show.get("seasonCount", 0)
-        status = show.get("status", "Unknown").title()
-        series_lines.append(f"**{title}** - {episodes}/{total_eps} eps ({seasons} seasons) [{status}]")
-
-    # Add series in chunks (max 1024 chars per field)
-    current_chunk = []
-    current_len = 0
-    chunk_num = 1
-
-    for line in series_lines:
-        if current_len + len(line) + 1 > 1000:
-            embed.add_field(
-                name=f"Series {chunk_num}" if chunk_num > 1 else "Series",
-                value="\n".join(current_chunk),
-                inline=False
-            )
-            current_chunk = [line]
-            current_len = len(line)
-            chunk_num += 1
-        else:
-            current_chunk.append(line)
-            current_len += len(line) + 1
+    add_line_fields(embed, "Series", [
+        f"**{show['title']}** - {show['episode_file_count']}/{show['episode_count']} eps "
+        f"({show['season_count']} seasons) [{(show['status'] or 'Unknown').title()}]"
+        for show in displayed
+    ])
 
-    if current_chunk:
-        embed.add_field(
-            name=f"Series {chunk_num}" if chunk_num > 1 else "Series",
-            value="\n".join(current_chunk),
-            inline=False
-        )
-
-    total_episodes = sum(s.get("statistics", {}).get("episodeFileCount", 0) for s in available)
-    embed.set_footer(text=f"Mnemosyne - {len(available)} series | {total_episodes} episodes available")
+    stats = library.stats().get("sonarr")
+    embed.set_footer(text=f"Mnemosyne - {stats['available']} series | {stats['episode_files']} episodes available")
     await interaction.followup.send(embed=embed)
 
 
 @bot.tree.command(name="showlist", description="Quick list of all available media titles")
 @is_allowed_channel()
-@app_commands.describe(media_type="Type of media to list")
+@app_commands.describe(media_type="Type of media to list", page="Page number")
 @app_commands.choices(media_type=[
     app_commands.Choice(name="Movies", value="movie"),
     app_commands.Choice(name="TV Shows", value="tv"),
     app_commands.Choice(name="Both", value="both"),
 ])
-async def showlist_command(interaction: discord.Interaction, media_type: str = "both"):
+async def showlist_command(interaction: discord.Interaction, media_type: str = "both", page: int = 1):
     """Quick compact list of all available media."""
     await interaction.response.defer()
 
+    await ensure_library()
+    page = max(1, page)
+    offset = (page - 1) * SHOWLIST_PAGE_SIZE
     lines = []
 
     if media_type in ["movie", "both"]:
-        movies = await fetch_radarr("movie")
+        movies, total = library.query("radarr", limit=SHOWLIST_PAGE_SIZE, offset=offset)
         if movies:
-            available_movies = [m for m in movies if m.get("hasFile")]
-            available_movies.sort(key=lambda x: x.get("title", "").lower())
-            if available_movies:
-                lines.append(f"**MOVIES ({len(available_movies)})**")
-                lines.extend([f"- {m.get('title')} ({m.get('year', 'N/A')})" for m in available_movies[:25]])
-                if len(available_movies) > 25:
-                    lines.append(f"*...and {len(available_movies) - 25} more*")
-                lines.append("")
+            lines.append(f"**MOVIES ({total})**")
+            lines.extend([f"- {m['title']} ({m['year'] or 'N/A'})" for m in movies])
+            if total > offset + len(movies):
+                lines.append(f"*...and {total - offset - len(movies)} more (page {page + 1})*")
+            lines.append("")
 
     if media_type in ["tv", "both"]:
-        series = await fetch_sonarr("series")
+        series, total = library.query("sonarr", limit=SHOWLIST_PAGE_SIZE, offset=offset)
         if series:
-            available_series = [s for s in series if s.get("statistics", {}).get("episodeFileCount", 0) > 0]
-            available_series.sort(key=lambda x: x.get("title", "").lower())
-            if available_series:
-                lines.append(f"**TV SERIES ({len(available_series)})**")
-                lines.extend([f"- {s.get('title')}" for s in available_series[:25]])
-                if len(available_series) > 25:
-                    lines.append(f"*...and {len(available_series) - 25} more*")
+            lines.append(f"**TV SERIES ({total})**")
+            lines.extend([f"- {s['title']}" for s in series])
+            if total > offset + len(series):
+                lines.append(f"*...and {total - offset - len(series)} more (page {page + 1})*")
 
     if not lines:
         await interaction.followup.send(embed=create_embed(
             "No Media Available",
-            "Your library is empty.",
+            "Your library is empty." if page == 1 else f"Nothing on page {page}.",
             color=0xff9900
         ))
         return
@@ -954,6 +1122,77 @@ async def help_command(interaction: discord.Interaction):
     await interaction.response.send_message(embed=embed)
 
 
+# === Background Task: Library Sync ===
+# service -> (fetcher, library endpoint, history/queue ID field, normalizer)
+LIBRARY_SOURCES = {
+    "radarr": (fetch_radarr, "movie", "movieId", normalize_movie),
+    "sonarr": (fetch_sonarr, "series", "seriesId", normalize_series),
+}
+library_lock = asyncio.Lock()
+
+
+async def refresh_library_items(service: str, item_ids):
+    """Re-fetch specific movies/series into the index."""
+    fetch, endpoint, _, normalize = LIBRARY_SOURCES[service]
+    items = await asyncio.gather(*(fetch(f"{endpoint}/{item_id}") for item_id in set(item_ids)))
+    library.upsert([normalize(item) for item in items if item])
+
+
+async def sync_library_service(service: str):
+    """Full listing when due, otherwise re-fetch only what history says changed."""
+    fetch, endpoint, id_field, normalize = LIBRARY_SOURCES[service]
+    state = library.get_sync(service)
+    now = datetime.now(timezone.utc)
+
+    if not state or now - datetime.fromisoformat(state["full_sync_at"]) >= timedelta(hours=LIBRARY_FULL_SYNC_HOURS):
+        items = await fetch(endpoint)
+        if items is None:
+            return
+        removed = library.replace(service, [normalize(item) for item in items], now.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        logger.info(f"Library full sync ({service}): {len(items)} items, {removed} removed")
+        return
+
+    history = await fetch("history/since", {"date": state["history_cursor"]})
+    if not history:
+        return
+    # history/since includes records at the cursor itself, which the last sync already applied
+    cursor = datetime.fromisoformat(state["history_cursor"])
+    history = [record for record in history if record.get("date") and datetime.fromisoformat(record["date"]) > cursor]
+    if not history:
+        return
+    item_ids = {record[id_field] for record in history if record.get(id_field)}
+    if item_ids:
+        await refresh_library_items(service, item_ids)
+    latest = max(history, key=lambda record: datetime.fromisoformat(record["date"]))
+    library.set_cursor(service, latest["date"])
+
+
+async def sync_library():
+    async with library_lock:
+        for service in LIBRARY_SOURCES:
+            try:
+                await sync_library_service(service)
+            except Exception as e:
+                logger.error(f"Library sync ({service}) failed: {e}")
+
+
+async def ensure_library():
+    """Build the index on first use if the sync loop hasn't yet."""
+    if not all(library.synced(service) for service in LIBRARY_SOURCES):
+        await sync_library()
+
+
+@tasks.loop(minutes=LIBRARY_SYNC_MINUTES)
+async def library_sync_loop():
+    """Keep the library index current."""
+    await sync_library()
+
+
+@library_sync_loop.before_loop
+async def before_library_sync():
+    await bot.wait_until_ready()
+
+
 # === Background Task: Download Monitor ===
 @tasks.loop(seconds=POLL_INTERVAL)
 async def monitor_downloads():
@@ -982,7 +1221,7 @@ async def monitor_downloads():
                     poster = img.get("remoteUrl")
                     break
 
-            info = {"title": full_title, "type": "movie", "poster": poster}
+            info = {"title": full_title, "type": "movie", "poster": poster, "library": ("radarr", item.get("movieId"))}
 
             # New download notification
             if tracker.should_notify_start(download_id, info):
@@ -1032,7 +1271,7 @@ async def monitor_downloads():
                     poster = img.get("remoteUrl")
                     break
 
-            info = {"title": full_title, "type": "tv", "poster": poster}
+            info = {"title": full_title, "type": "tv", "poster": poster, "library": ("sonarr", item.get("seriesId"))}
 
             # New download notification
             if tracker.should_notify_start(download_id, info):
@@ -1066,6 +1305,9 @@ async def monitor_downloads():
         if download_id not in active_ids:
             info = tracker.mark_completed(download_id)
             if info:
+                service, item_id = info.get("library", (None, None))
+                if item_id:
+                    await refresh_library_items(service, [item_id])
                 embed = create_embed(
                     "Download Complete!",
                     f"**{info.get('title')}** has finished downloading!",
@@ -1100,6 +1342,10 @@ async def on_ready():
         monitor_downloads.start()
         logger.info(f"Download monitor started (interval: {POLL_INTERVAL}s)")
 
+    if not library_sync_loop.is_running():
+        library_sync_loop.start()
+        logger.info(f"Library sync started (interval: {LIBRARY_SYNC_MINUTES}m)")
+
     # Send welcome message to all allowed channels
     for channel_ref in ALLOWED_CHANNEL_LIST:
         channel = None
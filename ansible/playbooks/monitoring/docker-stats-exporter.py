@@ -3,99 +3,134 @@
 Docker Stats Prometheus Exporter
 Exposes container metrics with proper container names.
 Includes uptime and start time metrics.
+
+Running containers are read straight from cgroup v2 files when the host's
+cgroupfs and /proc are mounted (CGROUP_ROOT, PROC_ROOT); containers that
+can't be read that way fall back to the Docker stats API.
 """
 
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timezone
 import docker
-from prometheus_client import start_http_server, Gauge, Info
+from prometheus_client import start_http_server
 from prometheus_client.core import GaugeMetricFamily, REGISTRY
 
 REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "15"))
 EXPORTER_PORT = int(os.getenv("EXPORTER_PORT", "9417"))
 
-# Docker client
-client = docker.from_env()
-
-# Metrics
-container_cpu_percent = Gauge(
-    'docker_container_cpu_percent',
-    'CPU usage percentage',
-    ['name', 'id', 'image']
-)
-
-container_memory_usage = Gauge(
-    'docker_container_memory_usage_bytes',
-    'Memory usage in bytes',
-    ['name', 'id', 'image']
-)
-
-container_memory_limit = Gauge(
-    'docker_container_memory_limit_bytes',
-    'Memory limit in bytes',
-    ['name', 'id', 'image']
-)
-
-container_memory_percent = Gauge(
-    'docker_container_memory_percent',
-    'Memory usage percentage',
-    ['name', 'id', 'image']
-)
-
-container_network_rx = Gauge(
-    'docker_container_network_rx_bytes',
-    'Network received bytes',
-    ['name', 'id', 'image']
-)
-
-container_network_tx = Gauge(
-    'docker_container_network_tx_bytes',
-    'Network transmitted bytes',
-    ['name', 'id', 'image']
-)
-
-container_status = Gauge(
-    'docker_container_running',
-    'Container running status (1=running, 0=stopped)',
-    ['name', 'id', 'image', 'status']
-)
-
-host_total_memory = Gauge(
-    'docker_host_memory_total_bytes',
-    'Total host memory in bytes',
-    ['host']
-)
-
-host_containers_total = Gauge(
-    'docker_host_containers_total',
-    'Total number of containers',
-    ['host']
-)
-
-host_containers_running = Gauge(
-    'docker_host_containers_running',
-    'Number of running containers',
-    ['host']
-)
-
-host_uptime_seconds = Gauge(
-    'docker_host_uptime_seconds',
-    'Host VM uptime in seconds',
-    ['host']
-)
-
-container_uptime_seconds = Gauge(
-    'docker_container_uptime_seconds',
-    'Container uptime in seconds',
-    ['name', 'id', 'image']
-)
-
-container_started_at = Gauge(
-    'docker_container_started_at',
-    'Container start time as Unix timestamp',
-    ['name', 'id', 'image']
-)
+# Concurrent stats requests; each blocks ~1-2s while Docker samples CPU
+STATS_WORKERS = int(os.getenv("STATS_WORKERS", "8"))
+
+# Stats source: auto (cgroupfs where readable, else the Docker API) or api
+STATS_SOURCE = os.getenv("STATS_SOURCE", "auto").lower()
+
+# Host cgroup v2 hierarchy and /proc, as mounted into the exporter container
+CGROUP_ROOT = os.getenv("CGROUP_ROOT", "/sys/fs/cgroup")
+PROC_ROOT = os.getenv("PROC_ROOT", "/proc")
+
+# Container cgroup locations under CGROUP_ROOT (systemd driver, cgroupfs driver)
+CGROUP_PATHS = ('system.slice/docker-{id}.scope', 'docker/{id}')
+
+# Docker client (connection pool sized for the stats workers plus the main thread)
+client = docker.from_env(max_pool_size=STATS_WORKERS + 2)
+
+# Worker pool for container.stats() calls
+stats_executor = ThreadPoolExecutor(max_workers=STATS_WORKERS, thread_name_prefix='stats')
+
+# Image ID -> image label, so each image is looked up once rather than once per container per cycle
+image_labels = {}
+
+# Container ID -> (cpu.stat usage_usec, monotonic time) from the previous cycle
+cpu_samples = {}
+
+# Metrics: (name, help, snapshot key)
+CONTAINER_LABELS = ['name', 'id', 'image']
+
+HOST_METRICS = [
+    ('docker_host_memory_total_bytes', 'Total host memory in bytes', 'memory_total'),
+    ('docker_host_containers_total', 'Total number of containers', 'containers_total'),
+    ('docker_host_containers_running', 'Number of running containers', 'containers_running'),
+    ('docker_host_uptime_seconds', 'Host VM uptime in seconds', 'uptime'),
+    ('docker_exporter_collect_duration_seconds', 'Duration of the last collection cycle', 'collect_duration'),
+    ('docker_exporter_cgroup_containers', 'Containers read from cgroupfs in the last cycle', 'cgroup_containers'),
+]
+
+CONTAINER_METRICS = [
+    ('docker_container_cpu_percent', 'CPU usage percentage', 'cpu_percent'),
+    ('docker_container_memory_usage_bytes', 'Memory usage in bytes', 'memory_usage'),
+    ('docker_container_memory_limit_bytes', 'Memory limit in bytes', 'memory_limit'),
+    ('docker_container_memory_percent', 'Memory usage percentage', 'memory_percent'),
+    ('docker_container_network_rx_bytes', 'Network received bytes', 'network_rx'),
+    ('docker_container_network_tx_bytes', 'Network transmitted bytes', 'network_tx'),
+    ('docker_container_uptime_seconds', 'Container uptime in seconds', 'uptime'),
+    ('docker_container_started_at', 'Container start time as Unix timestamp', 'started_at'),
+    ('docker_container_memory_working_set_bytes', 'Memory usage minus inactive file cache in bytes',
+     'memory_working_set'),
+    ('docker_container_cpu_periods', 'Elapsed CPU quota enforcement periods', 'cpu_periods'),
+    ('docker_container_cpu_throttled_periods', 'CPU quota periods in which the container was throttled',
+     'cpu_throttled_periods'),
+    ('docker_container_cpu_throttled_seconds', 'Total time the container was CPU throttled', 'cpu_throttled_seconds'),
+    ('docker_container_blkio_read_bytes', 'Block I/O bytes read', 'blkio_read'),
+    ('docker_container_blkio_write_bytes', 'Block I/O bytes written', 'blkio_write'),
+    ('docker_container_pids', 'Number of processes in the container', 'pids'),
+    ('docker_container_stats_duration_seconds', 'Time taken to read container stats (cgroupfs or Docker API)',
+     'stats_duration'),
+]
+
+
+def empty_snapshot():
+    """Snapshot with no samples (before the first collection cycle)."""
+    return {'host': None, 'host_values': {}, 'containers': []}
+
+
+# Latest completed collection, replaced whole each cycle and read by scrapes
+latest_snapshot = empty_snapshot()
+
+
+class DockerStatsCollector:
+    """
+    Prometheus collector serving the latest snapshot.
+
+    Metric families are rebuilt from the snapshot on every scrape, so series
+    exist only for containers present in the last cycle: a recreated
+    container's old ID, or a status it has left, disappears instead of
+    lingering as a stale series.
+    """
+
+    def describe(self):
+        return self._families(empty_snapshot())
+
+    def collect(self):
+        return self._families(latest_snapshot)
+
+    def _families(self, snapshot):
+        host = snapshot['host']
+        for name, doc, key in HOST_METRICS:
+            family = GaugeMetricFamily(name, doc, labels=['host'])
+            if host and key in snapshot['host_values']:
+                family.add_metric([host], snapshot['host_values'][key])
+            yield family
+
+        status = GaugeMetricFamily(
+            'docker_container_running',
+            'Container running status (1=running, 0=stopped)',
+            labels=CONTAINER_LABELS + ['status']
+        )
+        for container in snapshot['containers']:
+            status.add_metric(
+                container['labels'] + [container['status']],
+                1 if container['status'] == 'running' else 0
+            )
+        yield status
+
+        for name, doc, key in CONTAINER_METRICS:
+            family = GaugeMetricFamily(name, doc, labels=CONTAINER_LABELS)
+            for container in snapshot['containers']:
+                if key in container['values']:
+                    family.add_metric(container['labels'], container['values'][key])
+            yield family
 
 
 def calculate_cpu_percent(stats):
@@ -124,102 +159,336 @@ def get_network_stats(stats):
     return rx_bytes, tx_bytes
 
 
+def get_api_extra_stats(stats):
+    """Throttling, working set, block I/O and PID values from Docker stats."""
+    values = {}
+    cpu_stats = stats.get('cpu_stats', {})
+    memory_stats = stats.get('memory_stats', {})
+
+    throttling = cpu_stats.get('throttling_data')
+    if throttling:
+        values['cpu_periods'] = throttling.get('periods', 0)
+        values['cpu_throttled_periods'] = throttling.get('throttled_periods', 0)
+        values['cpu_throttled_seconds'] = throttling.get('throttled_time', 0) / 1e9
+
+    if 'usage' in memory_stats:
+        inactive_file = memory_stats.get('stats', {}).get('inactive_file', 0)
+        values['memory_working_set'] = max(0, memory_stats['usage'] - inactive_file)
+
+    blkio = stats.get('blkio_stats', {}).get('io_service_bytes_recursive')
+    if blkio:
+        values['blkio_read'] = sum(e.get('value', 0) for e in blkio if e.get('op', '').lower() == 'read')
+        values['blkio_write'] = sum(e.get('value', 0) for e in blkio if e.get('op', '').lower() == 'write')
+
+    if 'current' in stats.get('pids_stats', {}):
+        values['pids'] = stats['pids_stats']['current']
+
+    return values
+
+
+# ==================== cgroup v2 reader ====================
+
+def cgroup_available():
+    """Whether CGROUP_ROOT is a readable cgroup v2 hierarchy."""
+    return os.path.isfile(os.path.join(CGROUP_ROOT, 'cgroup.controllers'))
+
+
+def find_cgroup_dir(container_id):
+    """A container's cgroup directory under CGROUP_ROOT, or None."""
+    for pattern in CGROUP_PATHS:
+        path = os.path.join(CGROUP_ROOT, pattern.format(id=container_id))
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+def read_keyed_file(path):
+    """Parse a flat-keyed cgroup file ("key value" per line) into ints."""
+    values = {}
+    with open(path) as f:
+        for line in f:
+            key, _, value = line.partition(' ')
+            values[key] = int(value)
+    return values
+
+
+def read_single_value(path):
+    """Read a single-value cgroup file; "max" (no limit) reads as None."""
+    with open(path) as f:
+        value = f.read().strip()
+    return None if value == 'max' else int(value)
+
+
+def read_io_stat(path):
+    """Total bytes read and written across devices from io.stat."""
+    read_bytes = write_bytes = 0
+    with open(path) as f:
+        for line in f:
+            # "8:0 rbytes=1 wbytes=2 rios=3 wios=4 dbytes=0 dios=0"
+            fields = dict(item.split('=', 1) for item in line.split()[1:])
+            read_bytes += int(fields.get('rbytes', 0))
+            write_bytes += int(fields.get('wbytes', 0))
+    return read_bytes, write_bytes
+
+
+def read_net_dev(pid):
+    """Received and transmitted bytes of a process's network namespace, excluding loopback."""
+    rx_bytes = tx_bytes = 0
+    with open(os.path.join(PROC_ROOT, str(pid), 'net', 'dev')) as f:
+        # Two header lines, then "iface: rx_bytes packets ... tx_bytes ..."
+        for line in f.readlines()[2:]:
+            iface, _, counters = line.partition(':')
+            if iface.strip() == 'lo':
+                continue
+            fields = counters.split()
+            rx_bytes += int(fields[0])
+            tx_bytes += int(fields[8])
+    return rx_bytes, tx_bytes
+
+
+def read_cgroup_stats(container, host_memory):
+    """
+    Read a running container's stats from cgroupfs and /proc.
+
+    CPU percent is the usage_usec delta since the previous cycle, so it is
+    missing on a container's first cycle.
+
+    Returns:
+        Metric values, or None if the container's files aren't readable
+        (the caller then falls back to the stats API)
+    """
+    path = find_cgroup_dir(container.id)
+    if path is None:
+        return None
+
+    try:
+        cpu = read_keyed_file(os.path.join(path, 'cpu.stat'))
+        memory = read_keyed_file(os.path.join(path, 'memory.stat'))
+        mem_usage = read_single_value(os.path.join(path, 'memory.current'))
+        mem_limit = read_single_value(os.path.join(path, 'memory.max')) or host_memory
+        blkio_read, blkio_write = read_io_stat(os.path.join(path, 'io.stat'))
+        pids = read_single_value(os.path.join(path, 'pids.current'))
+        rx, tx = read_net_dev(container.attrs['State']['Pid'])
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"Error reading cgroup stats for {container.name}, using API: {e}")
+        return None
+
+    values = {
+        'memory_usage': mem_usage,
+        'memory_limit': mem_limit,
+        'memory_percent': (mem_usage / mem_limit * 100) if mem_limit else 0,
+        'memory_working_set': max(0, mem_usage - memory.get('inactive_file', 0)),
+        'network_rx': rx,
+        'network_tx': tx,
+        'blkio_read': blkio_read,
+        'blkio_write': blkio_write,
+        'pids': pids,
+    }
+    if 'nr_periods' in cpu:
+        values['cpu_periods'] = cpu['nr_periods']
+        values['cpu_throttled_periods'] = cpu['nr_throttled']
+        values['cpu_throttled_seconds'] = cpu['throttled_usec'] / 1e6
+
+    # Percent of one CPU, as calculate_cpu_percent() reports it
+    now = time.monotonic()
+    previous = cpu_samples.get(container.id)
+    cpu_samples[container.id] = (cpu['usage_usec'], now)
+    if previous and now > previous[1]:
+        values['cpu_percent'] = max(0.0, (cpu['usage_usec'] - previous[0]) / ((now - previous[1]) * 1e6) * 100)
+
+    return values
+
+
+def parse_started_at(started_at_str):
+    """Parse a Docker StartedAt timestamp (e.g. "2024-12-21T08:00:00.123456789Z")."""
+    # Handle nanoseconds by truncating to microseconds
+    if '.' in started_at_str:
+        base, frac = started_at_str.rsplit('.', 1)
+        # Remove 'Z' and truncate to 6 digits for microseconds
+        frac = frac.rstrip('Z')[:6]
+        started_at_str = f"{base}.{frac}+00:00"
+    else:
+        started_at_str = started_at_str.replace('Z', '+00:00')
+
+    return datetime.fromisoformat(started_at_str)
+
+
+def get_image_label(container):
+    """Image label for a container: first tag, else short image ID (cached per image)."""
+    image_id = container.attrs.get('Image', '')
+    if image_id not in image_labels:
+        image = container.image
+        image_labels[image_id] = image.tags[0] if image.tags else image.short_id
+    return image_labels[image_id]
+
+
+def sample_container(container):
+    """
+    Fetch one container's stats (runs in the worker pool).
+
+    Returns:
+        (stats, seconds taken); stats is None if the request failed
+    """
+    started = time.monotonic()
+    try:
+        stats = container.stats(stream=False)
+    except Exception as e:
+        print(f"Error collecting stats for {container.name}: {e}")
+        stats = None
+    return stats, time.monotonic() - started
+
+
 def collect_metrics():
-    """Collect metrics from all containers."""
+    """
+    Collect metrics from all containers into a new snapshot.
+
+    The previous snapshot keeps being served until this one is complete.
+    If listing containers fails, it is kept as-is.
+
+    Returns:
+        Cycle duration in seconds
+    """
+    global latest_snapshot
+    use_cgroup = STATS_SOURCE != 'api' and cgroup_available()
     hostname = os.uname().nodename
+    cycle_start = time.monotonic()
+    snapshot = {'host': hostname, 'host_values': {}, 'containers': []}
+    host_values = snapshot['host_values']
 
     try:
         # Host info
         info = client.info()
-        host_total_memory.labels(host=hostname).set(info.get('MemTotal', 0))
-        host_containers_total.labels(host=hostname).set(info.get('Containers', 0))
-        host_containers_running.labels(host=hostname).set(info.get('ContainersRunning', 0))
+        host_values['memory_total'] = info.get('MemTotal', 0)
+        host_values['containers_total'] = info.get('Containers', 0)
+        host_values['containers_running'] = info.get('ContainersRunning', 0)
 
         # Host uptime from /proc/uptime
         try:
             with open('/proc/uptime', 'r') as f:
-                uptime_seconds = float(f.read().split()[0])
-                host_uptime_seconds.labels(host=hostname).set(uptime_seconds)
+                host_values['uptime'] = float(f.read().split()[0])
         except Exception as e:
             print(f"Error reading host uptime: {e}")
 
         # Container stats
         containers = client.containers.list(all=True)
 
+        # Read running containers from cgroupfs where possible; start API
+        # samples for the rest now, so they run while the loop below works
+        cgroup_stats = {}
+        samples = {}
+        for container in containers:
+            if container.status != 'running':
+                continue
+            started = time.monotonic()
+            values = read_cgroup_stats(container, host_values['memory_total']) if use_cgroup else None
+            if values is not None:
+                values['stats_duration'] = time.monotonic() - started
+                cgroup_stats[container.id] = values
+            else:
+                samples[container.id] = stats_executor.submit(sample_container, container)
+        host_values['cgroup_containers'] = len(cgroup_stats)
+        # A hung stats request must not stall the cycle: API samples get one
+        # refresh interval, after which their containers are left unsampled
+        stats_deadline = cycle_start + REFRESH_INTERVAL
+
+        live_images = set()
         for container in containers:
             name = container.name
-            cid = container.short_id
-            image = container.image.tags[0] if container.image.tags else container.image.short_id
             status = container.status
+            values = {}
+            snapshot['containers'].append({
+                'labels': [name, container.short_id, get_image_label(container)],
+                'status': status,
+                'values': values,
+            })
+            live_images.add(container.attrs.get('Image', ''))
 
-            # Status metric
-            is_running = 1 if status == 'running' else 0
-            container_status.labels(name=name, id=cid, image=image, status=status).set(is_running)
+            if status != 'running':
+                continue
 
             # Uptime metrics (only for running containers)
-            if status == 'running':
-                try:
-                    started_at_str = container.attrs['State'].get('StartedAt', '')
-                    if started_at_str:
-                        # Parse ISO 8601 timestamp (e.g., "2024-12-21T08:00:00.123456789Z")
-                        # Handle nanoseconds by truncating to microseconds
-                        if '.' in started_at_str:
-                            base, frac = started_at_str.rsplit('.', 1)
-                            # Remove 'Z' and truncate to 6 digits for microseconds
-                            frac = frac.rstrip('Z')[:6]
-                            started_at_str = f"{base}.{frac}+00:00"
-                        else:
-                            started_at_str = started_at_str.replace('Z', '+00:00')
-
-                        start_time = datetime.fromisoformat(started_at_str)
-                        now = datetime.now(timezone.utc)
-                        uptime = (now - start_time).total_seconds()
-
-                        container_uptime_seconds.labels(name=name, id=cid, image=image).set(uptime)
-                        container_started_at.labels(name=name, id=cid, image=image).set(start_time.timestamp())
-                except Exception as e:
-                    print(f"Error getting uptime for {name}: {e}")
-
-            if status == 'running':
-                try:
-                    stats = container.stats(stream=False)
-
-                    # CPU
-                    cpu_pct = calculate_cpu_percent(stats)
-                    container_cpu_percent.labels(name=name, id=cid, image=image).set(cpu_pct)
-
-                    # Memory
-                    mem_usage = stats['memory_stats'].get('usage', 0)
-                    mem_limit = stats['memory_stats'].get('limit', 0)
-                    mem_pct = (mem_usage / mem_limit * 100) if mem_limit > 0 else 0
-
-                    container_memory_usage.labels(name=name, id=cid, image=image).set(mem_usage)
-                    container_memory_limit.labels(name=name, id=cid, image=image).set(mem_limit)
-                    container_memory_percent.labels(name=name, id=cid, image=image).set(mem_pct)
-
-                    # Network
-                    rx, tx = get_network_stats(stats)
-                    container_network_rx.labels(name=name, id=cid, image=image).set(rx)
-                    container_network_tx.labels(name=name, id=cid, image=image).set(tx)
-
-                except Exception as e:
-                    print(f"Error collecting stats for {name}: {e}")
+            try:
+                started_at_str = container.attrs['State'].get('StartedAt', '')
+                if started_at_str:
+                    start_time = parse_started_at(started_at_str)
+                    now = datetime.now(timezone.utc)
+                    values['uptime'] = (now - start_time).total_seconds()
+                    values['started_at'] = start_time.timestamp()
+            except Exception as e:
+                print(f"Error getting uptime for {name}: {e}")
+
+            if container.id in cgroup_stats:
+                values.update(cgroup_stats[container.id])
+                continue
+
+            try:
+                stats, elapsed = samples[container.id].result(timeout=max(0, stats_deadline - time.monotonic()))
+            except FutureTimeoutError:
+                print(f"Timed out collecting stats for {name}")
+                values['stats_duration'] = time.monotonic() - cycle_start
+                continue
+            values['stats_duration'] = elapsed
+            if stats is None:
+                continue
+
+            try:
+                # CPU
+                values['cpu_percent'] = calculate_cpu_percent(stats)
+
+                # Memory
+                mem_usage = stats['memory_stats'].get('usage', 0)
+                mem_limit = stats['memory_stats'].get('limit', 0)
+                values['memory_usage'] = mem_usage
+                values['memory_limit'] = mem_limit
+                values['memory_percent'] = (mem_usage / mem_limit * 100) if mem_limit > 0 else 0
+
+                # Network
+                values['network_rx'], values['network_tx'] = get_network_stats(stats)
+
+                # Throttling, working set, block I/O, PIDs
+                values.update(get_api_extra_stats(stats))
+
+            except Exception as e:
+                print(f"Error collecting stats for {name}: {e}")
+
+        # Forget images and CPU samples of containers that are gone
+        for image_id in set(image_labels) - live_images:
+            del image_labels[image_id]
+        for container_id in set(cpu_samples) - set(cgroup_stats):
+            del cpu_samples[container_id]
 
     except Exception as e:
         print(f"Error collecting metrics: {e}")
+        return time.monotonic() - cycle_start
+
+    duration = time.monotonic() - cycle_start
+    host_values['collect_duration'] = duration
+    latest_snapshot = snapshot
+    return duration
 
 
 def main():
     """Main function."""
     print(f"Starting Docker Stats Exporter on port {EXPORTER_PORT}")
     print(f"Refresh interval: {REFRESH_INTERVAL}s")
+    print(f"Stats workers: {STATS_WORKERS}")
+    if STATS_SOURCE == 'api':
+        print("Stats source: Docker API")
+    elif cgroup_available():
+        print(f"Stats source: cgroupfs ({CGROUP_ROOT}), Docker API fallback")
+    else:
+        print(f"Stats source: Docker API ({CGROUP_ROOT} is not a readable cgroup v2 hierarchy)")
+
+    # Serve the latest snapshot on every scrape
+    REGISTRY.register(DockerStatsCollector())
 
     # Start Prometheus HTTP server
     start_http_server(EXPORTER_PORT)
 
     while True:
-        collect_metrics()
-        time.sleep(REFRESH_INTERVAL)
+        duration = collect_metrics()
+        # Keep a steady cadence: the cycle's own duration counts towards the interval
+        time.sleep(max(0, REFRESH_INTERVAL - duration))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,28 @@
+"""
+Docker Stats Exporter Tests
+Offline tests with a fake Docker client. Run from the monitoring directory:
+
+    python -m pytest tests
+"""
+
+import importlib.util
+import os
+
+import docker
+import pytest
+
+from fake_docker import FakeDockerClient
+
+EXPORTER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'docker-stats-exporter.py')
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """A freshly loaded exporter module talking to a FakeDockerClient."""
+    fake = FakeDockerClient()
+    monkeypatch.setattr(docker, 'from_env', lambda **kwargs: fake)
+    spec = importlib.util.spec_from_file_location('docker_stats_exporter', EXPORTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    module.stats_executor.shutdown(wait=False)
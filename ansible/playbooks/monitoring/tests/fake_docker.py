@@ -0,0 +1,52 @@
+"""Fake Docker SDK client and containers for the exporter tests."""
+
+import docker
+
+
+class FakeImage:
+    def __init__(self, image_id):
+        self.tags = [f'{image_id}:latest']
+        self.short_id = image_id[:12]
+
+
+class FakeContainer:
+    """The parts of docker.models.containers.Container the exporter uses."""
+
+    def __init__(self, container_id, name, status='running', pid=0, stats=None):
+        self.id = container_id
+        self.short_id = container_id[:12]
+        self.name = name
+        self.status = status
+        self.attrs = {
+            'Image': f'image-{name}',
+            'State': {'Pid': pid, 'StartedAt': '2024-12-21T08:00:00.123456789Z'},
+        }
+        self._stats = stats
+        self.stats_calls = 0
+
+    @property
+    def image(self):
+        return FakeImage(self.attrs['Image'])
+
+    def stats(self, stream=False):
+        self.stats_calls += 1
+        if self._stats is None:
+            raise docker.errors.APIError('no stats')
+        return self._stats
+
+
+class FakeContainers:
+    def __init__(self):
+        self.current = []
+
+    def list(self, all=False):
+        return list(self.current)
+
+
+class FakeDockerClient:
+    def __init__(self):
+        self.containers = FakeContainers()
+
+    def info(self):
+        running = sum(1 for c in self.containers.current if c.status == 'running')
+        return {'MemTotal': 8 * 1024 ** 3, 'Containers': len(self.containers.current), 'ContainersRunning': running}
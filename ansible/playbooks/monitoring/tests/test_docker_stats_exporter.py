@@ -0,0 +1,190 @@
+"""docker-stats-exporter snapshot collection and cgroup v2 reader."""
+
+import os
+import threading
+
+import pytest
+
+from fake_docker import FakeContainer
+
+# Fixture cgroup v2 / proc tree: A (systemd driver, 100MiB limit), B (cgroupfs
+# driver, no limit) and C (io.stat missing, so it falls back to the API)
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+ID_A, ID_B, ID_C = 'a' * 64, 'b' * 64, 'c' * 64
+PID_A, PID_B = 4242, 4343
+HOST_MEMORY = 8 * 1024 ** 3
+
+API_STATS = {
+    'cpu_stats': {
+        'cpu_usage': {'total_usage': 200_000_000}, 'system_cpu_usage': 2_000_000_000, 'online_cpus': 2,
+        'throttling_data': {'periods': 10, 'throttled_periods': 2, 'throttled_time': 500_000_000},
+    },
+    'precpu_stats': {'cpu_usage': {'total_usage': 100_000_000}, 'system_cpu_usage': 1_000_000_000},
+    'memory_stats': {'usage': 50 * 1024 ** 2, 'limit': 100 * 1024 ** 2, 'stats': {'inactive_file': 1024 ** 2}},
+    'networks': {'eth0': {'rx_bytes': 1000, 'tx_bytes': 2000}},
+    'blkio_stats': {'io_service_bytes_recursive': [{'op': 'Read', 'value': 4096}, {'op': 'Write', 'value': 8192}]},
+    'pids_stats': {'current': 7},
+}
+
+
+class HungContainer(FakeContainer):
+    """A container whose stats request blocks until released."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+
+    def stats(self, stream=False):
+        self.release.wait(5)
+        return super().stats(stream)
+
+
+def sample_count(collector):
+    return sum(len(family.samples) for family in collector.collect())
+
+
+def test_series_count_flat_across_churn(exporter):
+    """Recreated containers replace their old series instead of adding to them."""
+    exporter.STATS_SOURCE = 'api'
+    collector = exporter.DockerStatsCollector()
+    names = ['sonarr', 'radarr', 'prowlarr', 'bazarr', 'jellyfin']
+
+    counts = []
+    for cycle in range(6):
+        # Every cycle recreates all containers with new IDs; one is stopped, in rotation
+        exporter.client.containers.current = [
+            FakeContainer(
+                f'{cycle:04d}{i:04d}' + 'f' * 56, name,
+                status='exited' if i == cycle % len(names) else 'running',
+                stats=API_STATS,
+            )
+            for i, name in enumerate(names)
+        ]
+        exporter.collect_metrics()
+        counts.append(sample_count(collector))
+
+    assert len(set(counts)) == 1, counts
+    # Caches keyed by container/image ID don't grow either
+    assert len(exporter.image_labels) <= len(names)
+
+
+def test_describe_has_no_samples(exporter):
+    collector = exporter.DockerStatsCollector()
+    assert sample_count(collector) == 0
+    assert [family.name for family in collector.describe()] == [family.name for family in collector.collect()]
+
+
+def test_failed_listing_keeps_previous_snapshot(exporter):
+    exporter.STATS_SOURCE = 'api'
+    exporter.client.containers.current = [FakeContainer('a' * 64, 'sonarr', stats=API_STATS)]
+    exporter.collect_metrics()
+    before = exporter.latest_snapshot
+
+    def broken(all=False):
+        raise RuntimeError('docker down')
+    exporter.client.containers.list = broken
+    exporter.collect_metrics()
+
+    assert exporter.latest_snapshot is before
+
+
+def test_hung_stats_request_leaves_container_unsampled(exporter):
+    exporter.STATS_SOURCE = 'api'
+    exporter.REFRESH_INTERVAL = 0.2
+    hung = HungContainer('a' * 64, 'sonarr', stats=API_STATS)
+    exporter.client.containers.current = [hung, FakeContainer('b' * 64, 'radarr', stats=API_STATS)]
+
+    try:
+        duration = exporter.collect_metrics()
+    finally:
+        hung.release.set()
+    values = {c['labels'][0]: c['values'] for c in exporter.latest_snapshot['containers']}
+
+    assert duration < 2
+    assert 'cpu_percent' not in values['sonarr'] and values['sonarr']['stats_duration'] >= 0.2
+    assert 'cpu_percent' in values['radarr']
+
+
+# ==================== cgroup v2 reader ====================
+
+@pytest.fixture
+def cgroup_exporter(exporter):
+    exporter.CGROUP_ROOT = os.path.join(FIXTURES, 'cgroup')
+    exporter.PROC_ROOT = os.path.join(FIXTURES, 'proc')
+    return exporter
+
+
+def test_cgroup_file_parsers(cgroup_exporter):
+    container_dir = cgroup_exporter.find_cgroup_dir(ID_A)
+    assert container_dir.endswith(f'docker-{ID_A}.scope')
+    assert cgroup_exporter.find_cgroup_dir(ID_B).endswith(os.path.join('docker', ID_B))
+    assert cgroup_exporter.find_cgroup_dir('d' * 64) is None
+
+    cpu = cgroup_exporter.read_keyed_file(os.path.join(container_dir, 'cpu.stat'))
+    assert cpu['usage_usec'] == 5_000_000 and cpu['nr_throttled'] == 5
+    # Summed across devices
+    assert cgroup_exporter.read_io_stat(os.path.join(container_dir, 'io.stat')) == (1048576 + 4096, 2097152 + 8192)
+    # Loopback excluded
+    assert cgroup_exporter.read_net_dev(PID_A) == (123456 + 544, 65432 + 568)
+
+
+def test_read_cgroup_stats(cgroup_exporter):
+    container = FakeContainer(ID_A, 'sonarr', pid=PID_A)
+    values = cgroup_exporter.read_cgroup_stats(container, HOST_MEMORY)
+
+    assert values['memory_usage'] == 50 * 1024 ** 2
+    assert values['memory_limit'] == 100 * 1024 ** 2
+    assert values['memory_percent'] == 50
+    assert values['memory_working_set'] == 50 * 1024 ** 2 - 4194304
+    assert values['network_rx'] == 124000 and values['network_tx'] == 66000
+    assert values['pids'] == 12
+    assert values['cpu_periods'] == 100 and values['cpu_throttled_periods'] == 5
+    assert values['cpu_throttled_seconds'] == 0.25
+    # CPU percent needs a previous sample
+    assert 'cpu_percent' not in values
+    assert 'cpu_percent' in cgroup_exporter.read_cgroup_stats(container, HOST_MEMORY)
+
+
+def test_unlimited_memory_uses_host_memory(cgroup_exporter):
+    values = cgroup_exporter.read_cgroup_stats(FakeContainer(ID_B, 'radarr', pid=PID_B), HOST_MEMORY)
+    assert values['memory_limit'] == HOST_MEMORY
+    assert values['memory_percent'] == 50 * 1024 ** 2 / HOST_MEMORY * 100
+
+
+def test_unreadable_cgroup_returns_none(cgroup_exporter):
+    # io.stat missing
+    assert cgroup_exporter.read_cgroup_stats(FakeContainer(ID_C, 'bazarr', pid=PID_A), HOST_MEMORY) is None
+    # No /proc entry for the PID
+    assert cgroup_exporter.read_cgroup_stats(FakeContainer(ID_A, 'sonarr', pid=1), HOST_MEMORY) is None
+    # No cgroup directory
+    assert cgroup_exporter.read_cgroup_stats(FakeContainer('d' * 64, 'jellyfin'), HOST_MEMORY) is None
+
+
+def test_collect_falls_back_to_api(cgroup_exporter):
+    cgroup_exporter.STATS_SOURCE = 'auto'
+    cgroup_read = FakeContainer(ID_A, 'sonarr', pid=PID_A, stats=API_STATS)
+    fallback = FakeContainer(ID_C, 'bazarr', pid=PID_A, stats=API_STATS)
+    stopped = FakeContainer('e' * 64, 'prowlarr', status='exited', stats=API_STATS)
+    cgroup_exporter.client.containers.current = [cgroup_read, fallback, stopped]
+
+    cgroup_exporter.collect_metrics()
+    snapshot = cgroup_exporter.latest_snapshot
+    values = {c['labels'][0]: c['values'] for c in snapshot['containers']}
+
+    assert snapshot['host_values']['cgroup_containers'] == 1
+    assert cgroup_read.stats_calls == 0 and fallback.stats_calls == 1 and stopped.stats_calls == 0
+    assert values['sonarr']['memory_limit'] == 100 * 1024 ** 2
+    assert values['bazarr']['memory_limit'] == API_STATS['memory_stats']['limit']
+    assert values['bazarr']['pids'] == 7
+    assert values['prowlarr'] == {}
+
+
+def test_api_source_skips_cgroupfs(cgroup_exporter):
+    cgroup_exporter.STATS_SOURCE = 'api'
+    container = FakeContainer(ID_A, 'sonarr', pid=PID_A, stats=API_STATS)
+    cgroup_exporter.client.containers.current = [container]
+
+    cgroup_exporter.collect_metrics()
+
+    assert container.stats_calls == 1
+    assert cgroup_exporter.latest_snapshot['host_values']['cgroup_containers'] == 0
@@ -125,13 +125,13 @@ class GitLabCog(commands.Cog, name="GitLab"):
         data = {"state_event": "close"}
 
         # Use PUT for updating
-        if not self.bot.http_session:
-            await interaction.followup.send(":x: HTTP session not available")
+        client = self.bot.services.get('gitlab')
+        if not client:
+            await interaction.followup.send(":x: GitLab client not available")
             return
 
-        headers = self.bot.get_api_headers('gitlab')
         try:
-            async with self.bot.http_session.put(url, headers=headers, json=data) as resp:
+            async with client.request('PUT', url, json=data) as resp:
                 if resp.status == 200:
                     result = await resp.json()
                     embed = discord.Embed(
@@ -10,6 +10,7 @@ from discord import app_commands
 from discord.ext import commands
 from typing import TYPE_CHECKING
 
+from core.fanout import fan_out, FanOutResult
 from core.progress import make_progress_bar, ProgressEmbed
 
 if TYPE_CHECKING:
@@ -104,14 +105,19 @@ class HomelabCog(commands.Cog, name="Homelab"):
 
     # ==================== Insight Command ====================
 
+    def _progress_callback(self, progress: ProgressEmbed, status_msg: discord.Message):
+        """Build a fan-out callback that streams per-host results into a progress embed."""
+        async def on_result(result: FanOutResult, done: int, total: int):
+            state = "timed out" if result.timed_out else "done"
+            progress.update(done, f":hourglass: **{result.key}** {state} ({done}/{total})")
+            await status_msg.edit(embed=progress.embed)
+        return on_result
+
     @app_commands.command(name="insight", description="Get health insights for your homelab")
     async def insight_command(self, interaction: discord.Interaction):
         """Check homelab health: high memory, errors, storage, and issues."""
         await interaction.response.defer()
 
-        progress = ProgressEmbed(":mag: Analyzing Homelab Health...", 5)
-        status_msg = await interaction.followup.send(embed=progress.embed)
-
         issues = []
         warnings = []
         healthy = []
@@ -122,96 +128,85 @@ class HomelabCog(commands.Cog, name="Homelab"):
             ('media', self.config.ssh.docker_media_ip),
             ('glance', self.config.ssh.docker_glance_ip),
         ]
+        other_hosts = [
+            ('traefik', self.config.ssh.traefik_ip),
+            ('authentik', self.config.ssh.authentik_ip),
+        ]
+        proxmox_nodes = [
+            ('node01', self.config.ssh.node01_ip),
+            ('node02', self.config.ssh.node02_ip),
+        ]
 
-        # Step 1: Check container memory usage
-        progress.update(0, ":hourglass: Checking container memory usage...")
-        await status_msg.edit(embed=progress.embed)
+        progress = ProgressEmbed(
+            ":mag: Analyzing Homelab Health...",
+            len(docker_hosts) + len(other_hosts) + len(proxmox_nodes) + 2
+        )
+        status_msg = await interaction.followup.send(embed=progress.embed)
 
-        high_memory_containers = []
+        # Send every probe at once; results stream into the progress embed
+        probes = {}
         for host_name, host_ip in docker_hosts:
-            result = await self.ssh.run(
-                host_ip,
-                'docker stats --no-stream --format "{{.Name}}:{{.MemPerc}}" 2>/dev/null'
-            )
-            if result.success:
-                for line in result.output.split('\n'):
-                    if ':' in line:
-                        name, mem = line.split(':')
-                        try:
-                            mem_pct = float(mem.replace('%', '').strip())
-                            if mem_pct > 80:
-                                high_memory_containers.append(f"{name} ({mem_pct:.0f}%)")
-                        except:
-                            pass
+            probes[host_name] = self.ssh.probe(host_ip, ['stats', 'containers', 'disk'])
+        for host_name, host_ip in other_hosts:
+            probes[host_name] = self.ssh.probe(host_ip, ['disk'])
+        for node_name, node_ip in proxmox_nodes:
+            probes[node_name] = self.ssh.pve_node_status(node_ip)
+        probes['radarr'] = self.bot.api_get(f"{self.bot.config.api.radarr_url}/api/v3/queue", 'radarr')
+        probes['sonarr'] = self.bot.api_get(f"{self.bot.config.api.sonarr_url}/api/v3/queue", 'sonarr')
+
+        results = await fan_out(probes, on_result=self._progress_callback(progress, status_msg))
+
+        timed_out = [key for key, r in results.items() if r.timed_out]
+
+        # Container memory usage, container health and disk usage
+        high_memory_containers = []
+        unhealthy_containers = []
+        disk_warnings = []
+        for host_name, _ in docker_hosts + other_hosts:
+            r = results[host_name]
+            if not r.ok or not r.value.success:
+                continue
+            probe = r.value
+
+            for stats in probe.stats or []:
+                if stats.mem_percent > 80:
+                    high_memory_containers.append(f"{stats.name} ({stats.mem_percent:.0f}%)")
+
+            for container in probe.containers or []:
+                if container.problem:
+                    unhealthy_containers.append(f"{container.name} ({container.problem})")
+
+            if probe.disk:
+                usage = probe.disk.percent
+                if usage > 90:
+                    disk_warnings.append(f"{host_name} ({usage}%) 🔴")
+                elif usage > 80:
+                    disk_warnings.append(f"{host_name} ({usage}%) 🟡")
 
         if high_memory_containers:
             issues.append(f"🔴 **High Memory** ({len(high_memory_containers)}): " + ", ".join(high_memory_containers[:5]))
         else:
             healthy.append("✅ Container memory usage normal")
 
-        # Step 2: Check for unhealthy/restarting containers
-        progress.update(1, ":hourglass: Checking container health...")
-        await status_msg.edit(embed=progress.embed)
-
-        unhealthy_containers = []
-        for host_name, host_ip in docker_hosts:
-            result = await self.ssh.run(
-                host_ip,
-                'docker ps -a --format "{{.Names}}:{{.Status}}" 2>/dev/null'
-            )
-            if result.success:
-                for line in result.output.split('\n'):
-                    if ':' in line:
-                        name, status = line.split(':', 1)
-                        status_lower = status.lower()
-                        if 'restarting' in status_lower:
-                            unhealthy_containers.append(f"{name} (restarting)")
-                        elif 'unhealthy' in status_lower:
-                            unhealthy_containers.append(f"{name} (unhealthy)")
-                        elif 'exited' in status_lower and 'exited (0)' not in status_lower:
-                            unhealthy_containers.append(f"{name} (crashed)")
-
         if unhealthy_containers:
             issues.append(f"🔴 **Unhealthy Containers** ({len(unhealthy_containers)}): " + ", ".join(unhealthy_containers[:5]))
         else:
             healthy.append("✅ All containers healthy")
 
-        # Step 3: Check disk usage
-        progress.update(2, ":hourglass: Checking disk usage...")
-        await status_msg.edit(embed=progress.embed)
-
-        disk_warnings = []
-        all_hosts = docker_hosts + [
-            ('traefik', self.config.ssh.traefik_ip),
-            ('authentik', self.config.ssh.authentik_ip),
-        ]
-        for host_name, host_ip in all_hosts:
-            result = await self.ssh.run(host_ip, "df -h / | tail -1 | awk '{print $5}'")
-            if result.success:
-                try:
-                    usage = int(result.output.replace('%', '').strip())
-                    if usage > 90:
-                        disk_warnings.append(f"{host_name} ({usage}%) 🔴")
-                    elif usage > 80:
-                        disk_warnings.append(f"{host_name} ({usage}%) 🟡")
-                except:
-                    pass
-
         if disk_warnings:
             warnings.append(f"💾 **Disk Usage**: " + ", ".join(disk_warnings))
         else:
             healthy.append("✅ Disk usage normal (<80%)")
 
-        # Step 4: Check Proxmox nodes
-        progress.update(3, ":hourglass: Checking Proxmox nodes...")
-        await status_msg.edit(embed=progress.embed)
-
+        # Proxmox nodes
         proxmox_issues = []
-        for node_name, node_ip in [('node01', self.config.ssh.node01_ip), ('node02', self.config.ssh.node02_ip)]:
-            result = await self.ssh.pve_node_status(node_ip)
-            if result.success:
+        for node_name, _ in proxmox_nodes:
+            r = results[node_name]
+            if r.timed_out:
+                proxmox_issues.append(f"{node_name} timed out 🔴")
+            elif r.ok and r.value.success:
                 try:
-                    data = json.loads(result.stdout)
+                    data = json.loads(r.value.stdout)
                     cpu = data.get('cpu', 0) * 100
                     mem = data.get('memory', {})
                     mem_pct = (mem.get('used', 0) / mem.get('total', 1)) * 100 if mem.get('total') else 0
@@ -235,30 +230,23 @@ class HomelabCog(commands.Cog, name="Homelab"):
         else:
             healthy.append("✅ Proxmox nodes healthy")
 
-        # Step 5: Check for failed downloads
-        progress.update(4, ":hourglass: Checking download queues...")
-        await status_msg.edit(embed=progress.embed)
-
+        # Failed downloads
         failed_downloads = []
-        # Check Radarr
-        radarr_url = f"{self.bot.config.api.radarr_url}/api/v3/queue"
-        radarr_data = await self.bot.api_get(radarr_url, 'radarr')
-        if radarr_data:
-            for item in radarr_data.get('records', []):
-                if item.get('status', '').lower() in ['failed', 'warning']:
-                    failed_downloads.append(f"🎬 {item.get('title', 'Unknown')[:20]}")
-
-        # Check Sonarr
-        sonarr_url = f"{self.bot.config.api.sonarr_url}/api/v3/queue"
-        sonarr_data = await self.bot.api_get(sonarr_url, 'sonarr')
-        if sonarr_data:
-            for item in sonarr_data.get('records', []):
-                if item.get('status', '').lower() in ['failed', 'warning']:
-                    failed_downloads.append(f"📺 {item.get('title', 'Unknown')[:20]}")
+        for service, emoji in [('radarr', '🎬'), ('sonarr', '📺')]:
+            r = results[service]
+            if r.ok and r.value:
+                for item in r.value.get('records', []):
+                    if item.get('status', '').lower() in ['failed', 'warning']:
+                        failed_downloads.append(f"{emoji} {item.get('title', 'Unknown')[:20]}")
 
         if failed_downloads:
             warnings.append(f"⬇️ **Failed Downloads** ({len(failed_downloads)}): " + ", ".join(failed_downloads[:3]))
 
+        # Hosts that did not answer before the deadline
+        stragglers = [key for key in timed_out if key not in dict(proxmox_nodes)]
+        if stragglers:
+            warnings.append(f"⏱️ **Timed Out**: " + ", ".join(stragglers))
+
         # Build final embed
         total_issues = len(issues) + len(warnings)
         if total_issues == 0:
@@ -312,51 +300,41 @@ class HomelabCog(commands.Cog, name="Homelab"):
         """Get Proxmox cluster status overview."""
         await interaction.response.defer()
 
-        nodes = [
-            ('node01', self.config.ssh.node01_ip),
-            ('node02', self.config.ssh.node02_ip)
-        ]
-
-        progress = ProgressEmbed(":house: Checking Cluster Status...", len(nodes))
-        status_msg = await interaction.followup.send(embed=progress.embed)
+        # One /cluster/resources call covers every node and guest
+        inventory = await self.bot.inventory.get(refresh=True)
+        if not inventory:
+            await interaction.followup.send(":x: Cluster unreachable: no Proxmox node answered")
+            return
 
         node_results = []
-        checked = 0
-
-        # Get node statuses
-        for node_name, node_ip in nodes:
-            progress.update(checked, f":hourglass: Checking **{node_name}**...")
-            await status_msg.edit(embed=progress.embed)
-
-            result = await self.ssh.pve_node_status(node_ip)
-            if result.success:
-                try:
-                    data = json.loads(result.stdout)
-                    cpu = data.get('cpu', 0) * 100
-                    mem_used = data.get('memory', {}).get('used', 0) / (1024**3)
-                    mem_total = data.get('memory', {}).get('total', 0) / (1024**3)
-                    uptime_days = data.get('uptime', 0) / 86400
-
-                    node_results.append((
-                        f":green_circle: {node_name}",
-                        f"CPU: {cpu:.1f}%\nMemory: {mem_used:.1f}/{mem_total:.1f} GB\nUptime: {uptime_days:.1f} days"
-                    ))
-                except json.JSONDecodeError:
-                    node_results.append((f":yellow_circle: {node_name}", "Parse error"))
-            else:
-                node_results.append((f":red_circle: {node_name}", "Unreachable"))
-            checked += 1
+        for node in sorted(inventory.nodes.values(), key=lambda n: n.name):
+            if not node.online:
+                node_results.append((f":red_circle: {node.name}", "Offline"))
+                continue
+
+            vms = inventory.on_node(node.name, 'qemu')
+            lxcs = inventory.on_node(node.name, 'lxc')
+            node_results.append((
+                f":green_circle: {node.name}",
+                f"CPU: {node.cpu * 100:.1f}%\n"
+                f"Memory: {node.mem / (1024**3):.1f}/{node.maxmem / (1024**3):.1f} GB\n"
+                f"Uptime: {node.uptime / 86400:.1f} days\n"
+                f"VMs: {sum(g.running for g in vms)}/{len(vms)} • "
+                f"LXCs: {sum(g.running for g in lxcs)}/{len(lxcs)}"
+            ))
 
         # Build final embed
         all_healthy = all(":green_circle:" in r[0] for r in node_results)
         color = discord.Color.green() if all_healthy else discord.Color.yellow()
-        embed = progress.complete(":house: MorpheusCluster Status", "Cluster check complete", color)
-        embed.clear_fields()
+        embed = discord.Embed(title=":house: MorpheusCluster Status", color=color)
 
         for name, value in node_results:
             embed.add_field(name=name, value=value, inline=True)
 
-        await status_msg.edit(embed=embed)
+        if inventory.age > self.bot.inventory.ttl:
+            embed.set_footer(text=f"Cluster unreachable - showing data from {inventory.age:.0f}s ago")
+
+        await interaction.followup.send(embed=embed)
 
     @homelab_group.command(name="uptime", description="Show uptime for all nodes")
     async def homelab_uptime(self, interaction: discord.Interaction):
@@ -378,34 +356,25 @@ class HomelabCog(commands.Cog, name="Homelab"):
         progress = ProgressEmbed(":clock: Checking Infrastructure Uptime...", total_hosts)
         status_msg = await interaction.followup.send(embed=progress.embed)
 
-        checked = 0
-
-        # Proxmox nodes (use root user)
-        nodes = []
+        # Proxmox nodes use run_proxmox (requires root); all hosts are probed at once
+        probes = {}
         for node_name, node_ip in proxmox_nodes:
-            progress.update(checked, f":hourglass: Checking **{node_name}**...")
-            await status_msg.edit(embed=progress.embed)
+            probes[node_name] = self.ssh.probe(node_ip, ['uptime'], user=self.ssh.proxmox_user)
+        for name, ip in docker_hosts_list:
+            probes[name] = self.ssh.probe(ip, ['uptime'])
 
-            # Use run_proxmox for Proxmox nodes (requires root)
-            result = await self.ssh.run_proxmox(node_ip, 'uptime -p')
-            if result.success:
-                nodes.append(f"**{node_name}**: {result.output}")
-            else:
-                nodes.append(f"**{node_name}**: :x: Unreachable")
-            checked += 1
+        results = await fan_out(probes, on_result=self._progress_callback(progress, status_msg))
 
-        # Docker hosts
-        docker_hosts = []
-        for name, ip in docker_hosts_list:
-            progress.update(checked, f":hourglass: Checking **{name}**...")
-            await status_msg.edit(embed=progress.embed)
+        def describe(name: str) -> str:
+            r = results[name]
+            if r.timed_out:
+                return f"**{name}**: :hourglass: Timed out"
+            if r.ok and r.value.uptime:
+                return f"**{name}**: {r.value.uptime}"
+            return f"**{name}**: :x: Unreachable"
 
-            result = await self.ssh.system_uptime(ip)
-            if result.success:
-                docker_hosts.append(f"**{name}**: {result.output}")
-            else:
-                docker_hosts.append(f"**{name}**: :x: Unreachable")
-            checked += 1
+        nodes = [describe(node_name) for node_name, _ in proxmox_nodes]
+        docker_hosts = [describe(name) for name, _ in docker_hosts_list]
 
         # Build final embed
         embed = progress.complete(":clock: Infrastructure Uptime", "Uptime check complete")
@@ -520,58 +489,49 @@ class HomelabCog(commands.Cog, name="Homelab"):
             else:
                 await interaction.followup.send(f":x: Failed to get status: {result.stderr}")
 
-        elif action == "vms":
-            result = await self.ssh.pve_list_vms(node_ip)
-            if result.success:
-                try:
-                    vms = json.loads(result.stdout)
-                    if not vms:
-                        await interaction.followup.send(f":information_source: No VMs on {name}")
-                        return
-
-                    lines = []
-                    for vm in vms:
-                        status_emoji = ":green_circle:" if vm.get('status') == 'running' else ":red_circle:"
-                        lines.append(f"{status_emoji} **{vm.get('name')}** (VMID: {vm.get('vmid')})")
+        elif action in ("vms", "lxc"):
+            # guest type, plural label, ID label, title
+            guest_type, label, id_label, title = {
+                "vms": ('qemu', "VMs", "VMID", f":desktop: VMs on {name}"),
+                "lxc": ('lxc', "LXC containers", "CTID", f":package: LXC Containers on {name}"),
+            }[action]
 
-                    embed = discord.Embed(
-                        title=f":desktop: VMs on {name}",
-                        description="\n".join(lines),
-                        color=discord.Color.blue()
-                    )
-                    await interaction.followup.send(embed=embed)
-                except json.JSONDecodeError:
-                    await interaction.followup.send(f":warning: Could not parse VM list")
-            else:
-                await interaction.followup.send(f":x: Failed to list VMs: {result.stderr}")
+            inventory = await self.bot.inventory.get(refresh=True)
+            if not inventory:
+                await interaction.followup.send(f":x: Failed to list {label}: no Proxmox node answered")
+                return
 
-        elif action == "lxc":
-            result = await self.ssh.pve_list_lxc(node_ip)
-            if result.success:
-                try:
-                    containers = json.loads(result.stdout)
-                    if not containers:
-                        await interaction.followup.send(f":information_source: No LXC containers on {name}")
-                        return
+            guests = inventory.on_node(name.lower(), guest_type)
+            if not guests:
+                await interaction.followup.send(f":information_source: No {label} on {name}")
+                return
 
-                    lines = []
-                    for ct in containers:
-                        status_emoji = ":green_circle:" if ct.get('status') == 'running' else ":red_circle:"
-                        lines.append(f"{status_emoji} **{ct.get('name')}** (CTID: {ct.get('vmid')})")
+            lines = []
+            for guest in guests:
+                status_emoji = ":green_circle:" if guest.running else ":red_circle:"
+                lines.append(f"{status_emoji} **{guest.name}** ({id_label}: {guest.vmid})")
 
-                    embed = discord.Embed(
-                        title=f":package: LXC Containers on {name}",
-                        description="\n".join(lines),
-                        color=discord.Color.blue()
-                    )
-                    await interaction.followup.send(embed=embed)
-                except json.JSONDecodeError:
-                    await interaction.followup.send(f":warning: Could not parse LXC list")
-            else:
-                await interaction.followup.send(f":x: Failed to list LXC: {result.stderr}")
+            embed = discord.Embed(
+                title=title,
+                description="\n".join(lines),
+                color=discord.Color.blue()
+            )
+            await interaction.followup.send(embed=embed)
 
     # ==================== VM Commands ====================
 
+    async def _find_guest(self, guest_id: int, guest_type: str):
+        """
+        Locate a VM ('qemu') or LXC ('lxc') in the cluster inventory.
+
+        Returns:
+            Tuple of (node_ip, Guest), or (None, None) if not found
+        """
+        guest = await self.bot.inventory.guest(guest_id, guest_type)
+        if not guest or not guest.node_ip:
+            return None, None
+        return guest.node_ip, guest
+
     @app_commands.command(name="vm", description="Manage VMs")
     @app_commands.describe(
         vmid="VM ID",
@@ -592,13 +552,7 @@ class HomelabCog(commands.Cog, name="Homelab"):
         """Manage VMs by VMID."""
         await interaction.response.defer()
 
-        # Try both nodes
-        node_ip = None
-        for ip in [self.config.ssh.node01_ip, self.config.ssh.node02_ip]:
-            result = await self.ssh.pve_vm_status(ip, vmid)
-            if result.success:
-                node_ip = ip
-                break
+        node_ip, guest = await self._find_guest(vmid, 'qemu')
 
         if not node_ip:
             await interaction.followup.send(f":x: VM {vmid} not found on any node")
@@ -616,6 +570,8 @@ class HomelabCog(commands.Cog, name="Homelab"):
                 embed.add_field(name="Status", value=data.get('status', 'unknown'), inline=True)
                 embed.add_field(name="CPU", value=f"{data.get('cpu', 0) * 100:.1f}%", inline=True)
                 await interaction.followup.send(embed=embed)
+            else:
+                await interaction.followup.send(f":x: Failed to get status: {result.stderr}")
 
         elif action in ["start", "stop", "restart"]:
             action_func = {
@@ -625,6 +581,7 @@ class HomelabCog(commands.Cog, name="Homelab"):
             }[action]
 
             result = await action_func(node_ip, vmid)
+            self.bot.inventory.invalidate()
             if result.success:
                 await interaction.followup.send(f":white_check_mark: VM {vmid} {action} command sent")
             else:
@@ -653,24 +610,14 @@ class HomelabCog(commands.Cog, name="Homelab"):
         """Manage LXC containers by CTID."""
         await interaction.response.defer()
 
-        # Try both nodes to find the container
-        node_ip = None
-        container_name = None
-        for ip in [self.config.ssh.node01_ip, self.config.ssh.node02_ip]:
-            result = await self.ssh.pve_lxc_status(ip, ctid)
-            if result.success:
-                node_ip = ip
-                try:
-                    data = json.loads(result.stdout)
-                    container_name = data.get('name', f'CT{ctid}')
-                except:
-                    container_name = f'CT{ctid}'
-                break
+        node_ip, guest = await self._find_guest(ctid, 'lxc')
 
         if not node_ip:
             await interaction.followup.send(f":x: LXC container {ctid} not found on any node")
             return
 
+        container_name = guest.name
+
         if action == "status":
             result = await self.ssh.pve_lxc_status(node_ip, ctid)
             if result.success:
@@ -697,6 +644,7 @@ class HomelabCog(commands.Cog, name="Homelab"):
             }[action]
 
             result = await action_func(node_ip, ctid)
+            self.bot.inventory.invalidate()
             if result.success:
                 emoji = ":arrow_forward:" if action == "start" else ":stop_button:" if action == "stop" else ":arrows_counterclockwise:"
                 await interaction.followup.send(f"{emoji} LXC **{container_name}** ({ctid}) {action} command sent")
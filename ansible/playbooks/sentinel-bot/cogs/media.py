@@ -8,8 +8,10 @@ import logging
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import TYPE_CHECKING, Optional, List
+from typing import TYPE_CHECKING, Optional, List, Dict, Tuple
 
+from core.database import LIBRARY_SORTS
+from core.library_index import NORMALIZERS
 from core.progress import make_progress_bar, ProgressEmbed
 
 if TYPE_CHECKING:
@@ -17,6 +19,20 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger('sentinel.cogs.media')
 
+# Items shown per section by /recent
+RECENT_LIMIT = 5
+
+# Embeds hold at most 25 fields
+MAX_PAGE_SIZE = 25
+
+SORT_CHOICES = [
+    app_commands.Choice(name="Title", value="title"),
+    app_commands.Choice(name="Year (newest first)", value="year"),
+    app_commands.Choice(name="Quality", value="quality"),
+    app_commands.Choice(name="Recently added", value="added"),
+]
+DESCENDING_SORTS = {'year', 'added'}
+
 
 class MediaCog(commands.Cog, name="Media"):
     """Media download tracking and library management."""
@@ -153,12 +169,26 @@ class MediaCog(commands.Cog, name="Media"):
     library_group = app_commands.Group(name="library", description="Media library commands")
 
     @library_group.command(name="movies", description="List movies in library")
-    @app_commands.describe(limit="Number of movies to show")
-    async def library_movies(self, interaction: discord.Interaction, limit: int = 10):
+    @app_commands.describe(
+        limit="Movies per page",
+        page="Page number",
+        sort="Sort order",
+        search="Only titles matching these words"
+    )
+    @app_commands.choices(sort=SORT_CHOICES)
+    async def library_movies(
+        self,
+        interaction: discord.Interaction,
+        limit: int = 10,
+        page: int = 1,
+        sort: str = "title",
+        search: Optional[str] = None
+    ):
         """List movies in the Radarr library."""
         await interaction.response.defer()
 
-        movies = await self._get_radarr_movies(limit)
+        limit, page = max(1, min(limit, MAX_PAGE_SIZE)), max(1, page)
+        movies, total = await self._library_page('radarr', page, limit, sort, search)
 
         if not movies:
             await interaction.followup.send(":information_source: No movies found")
@@ -169,23 +199,39 @@ class MediaCog(commands.Cog, name="Media"):
             color=discord.Color.blue()
         )
 
-        for movie in movies[:limit]:
-            status = ":white_check_mark:" if movie.get('hasFile') else ":hourglass:"
+        for movie in movies:
+            status = ":white_check_mark:" if movie['has_file'] else ":hourglass:"
+            quality = f" · {movie['quality']}" if movie['quality'] else ""
             embed.add_field(
-                name=f"{status} {movie.get('title', 'Unknown')}",
-                value=f"{movie.get('year', 'Unknown')}",
+                name=f"{status} {movie['title']}",
+                value=f"{movie['year'] or 'Unknown'}{quality}",
                 inline=True
             )
 
+        embed.set_footer(text=self._page_footer(page, limit, total, "movies"))
         await interaction.followup.send(embed=embed)
 
     @library_group.command(name="shows", description="List TV shows in library")
-    @app_commands.describe(limit="Number of shows to show")
-    async def library_shows(self, interaction: discord.Interaction, limit: int = 10):
+    @app_commands.describe(
+        limit="Shows per page",
+        page="Page number",
+        sort="Sort order",
+        search="Only titles matching these words"
+    )
+    @app_commands.choices(sort=SORT_CHOICES)
+    async def library_shows(
+        self,
+        interaction: discord.Interaction,
+        limit: int = 10,
+        page: int = 1,
+        sort: str = "title",
+        search: Optional[str] = None
+    ):
         """List TV shows in the Sonarr library."""
         await interaction.response.defer()
 
-        shows = await self._get_sonarr_shows(limit)
+        limit, page = max(1, min(limit, MAX_PAGE_SIZE)), max(1, page)
+        shows, total = await self._library_page('sonarr', page, limit, sort, search)
 
         if not shows:
             await interaction.followup.send(":information_source: No shows found")
@@ -196,14 +242,16 @@ class MediaCog(commands.Cog, name="Media"):
             color=discord.Color.blue()
         )
 
-        for show in shows[:limit]:
-            status = ":white_check_mark:" if show.get('statistics', {}).get('percentOfEpisodes', 0) == 100 else ":hourglass:"
+        for show in shows:
+            complete = show['episode_count'] and show['episode_file_count'] >= show['episode_count']
+            status = ":white_check_mark:" if complete else ":hourglass:"
             embed.add_field(
-                name=f"{status} {show.get('title', 'Unknown')}",
-                value=f"Episodes: {show.get('statistics', {}).get('episodeFileCount', 0)}",
+                name=f"{status} {show['title']}",
+                value=f"Episodes: {show['episode_file_count']}/{show['episode_count']}",
                 inline=True
             )
 
+        embed.set_footer(text=self._page_footer(page, limit, total, "shows"))
         await interaction.followup.send(embed=embed)
 
     @library_group.command(name="stats", description="Show library statistics")
@@ -216,25 +264,21 @@ class MediaCog(commands.Cog, name="Media"):
             color=discord.Color.blue()
         )
 
-        # Get Radarr stats
-        movies = await self._get_radarr_movies(limit=9999)
+        stats = await self._library_stats()
+
+        movies = stats.get('radarr')
         if movies:
-            total_movies = len(movies)
-            available = sum(1 for m in movies if m.get('hasFile'))
             embed.add_field(
                 name=":movie_camera: Movies",
-                value=f"Total: {total_movies}\nAvailable: {available}",
+                value=f"Total: {movies['total']}\nAvailable: {movies['available']}",
                 inline=True
             )
 
-        # Get Sonarr stats
-        shows = await self._get_sonarr_shows(limit=9999)
+        shows = stats.get('sonarr')
         if shows:
-            total_shows = len(shows)
-            total_episodes = sum(s.get('statistics', {}).get('episodeFileCount', 0) for s in shows)
             embed.add_field(
                 name=":tv: TV Shows",
-                value=f"Shows: {total_shows}\nEpisodes: {total_episodes}",
+                value=f"Shows: {shows['total']}\nEpisodes: {shows['episode_files']}",
                 inline=True
             )
 
@@ -257,23 +301,82 @@ class MediaCog(commands.Cog, name="Media"):
         )
 
         if media_type in ["movie", "both"]:
-            # Get recently added movies
+            movies, _ = await self._library_page('radarr', 1, RECENT_LIMIT, 'added', available_only=True)
             embed.add_field(
                 name=":movie_camera: Movies",
-                value="Feature coming soon",
+                value="\n".join(f"• {m['title']} ({m['year'] or '?'})" for m in movies) or "Nothing yet",
                 inline=False
             )
 
         if media_type in ["tv", "both"]:
-            # Get recently added shows
+            shows, _ = await self._library_page('sonarr', 1, RECENT_LIMIT, 'added', available_only=True)
             embed.add_field(
                 name=":tv: TV Shows",
-                value="Feature coming soon",
+                value="\n".join(f"• {s['title']} ({s['year'] or '?'})" for s in shows) or "Nothing yet",
                 inline=False
             )
 
         await interaction.followup.send(embed=embed)
 
+    # ==================== Library Index ====================
+
+    async def _library_rows(self, service: str) -> List[dict]:
+        """Full library as index rows, from the cached API listing (used until the index is built)."""
+        listing = await (self._get_radarr_movies if service == 'radarr' else self._get_sonarr_shows)(limit=None)
+        return [NORMALIZERS[service](item) for item in listing]
+
+    async def _library_page(
+        self,
+        service: str,
+        page: int,
+        per_page: int,
+        sort: str = 'title',
+        search: Optional[str] = None,
+        available_only: bool = False
+    ) -> Tuple[List[dict], int]:
+        """One page of the library, newest/latest first for date and year sorts."""
+        descending = sort in DESCENDING_SORTS
+        offset = (page - 1) * per_page
+
+        if self.bot.library and self.bot.library.ready:
+            return await self.bot.db.query_library(
+                service, available_only=available_only, search=search, sort=sort,
+                descending=descending, limit=per_page, offset=offset
+            )
+
+        rows = await self._library_rows(service)
+        if available_only:
+            rows = [r for r in rows if r['has_file']]
+        if search:
+            words = search.lower().split()
+            rows = [r for r in rows if all(word in r['title'].lower() for word in words)]
+
+        column = LIBRARY_SORTS.get(sort, 'sort_title')
+        rows.sort(key=lambda r: r['sort_title'])
+        rows.sort(key=lambda r: (r[column] is not None, r[column]), reverse=descending)
+        return rows[offset:offset + per_page], len(rows)
+
+    async def _library_stats(self) -> Dict[str, dict]:
+        """Per-service library totals."""
+        if self.bot.library and self.bot.library.ready:
+            return await self.bot.db.get_library_stats()
+
+        stats = {}
+        for service in ('radarr', 'sonarr'):
+            rows = await self._library_rows(service)
+            if rows:
+                stats[service] = {
+                    'total': len(rows),
+                    'available': sum(r['has_file'] for r in rows),
+                    'episode_files': sum(r['episode_file_count'] for r in rows),
+                }
+        return stats
+
+    @staticmethod
+    def _page_footer(page: int, per_page: int, total: int, noun: str) -> str:
+        pages = max(1, -(-total // per_page))
+        return f"Page {page}/{pages} · {total} {noun}"
+
     # ==================== API Helpers ====================
 
     async def _get_radarr_queue(self) -> List[dict]:
@@ -304,16 +407,14 @@ class MediaCog(commands.Cog, name="Media"):
             return [r for r in results if r.get('mediaType') == 'tv']
         return results
 
-    async def _get_radarr_movies(self, limit: int = 10) -> List[dict]:
-        """Get movies from Radarr."""
-        url = f"{self.config.api.radarr_url}/api/v3/movie"
-        data = await self.bot.api_get(url, 'radarr')
+    async def _get_radarr_movies(self, limit: Optional[int] = 10) -> List[dict]:
+        """Get movies from Radarr (cached; the full library is one large payload)."""
+        data = await self.bot.cached_api_get('radarr', '/api/v3/movie')
         return (data or [])[:limit]
 
-    async def _get_sonarr_shows(self, limit: int = 10) -> List[dict]:
-        """Get shows from Sonarr."""
-        url = f"{self.config.api.sonarr_url}/api/v3/series"
-        data = await self.bot.api_get(url, 'sonarr')
+    async def _get_sonarr_shows(self, limit: Optional[int] = 10) -> List[dict]:
+        """Get shows from Sonarr (cached; the full library is one large payload)."""
+        data = await self.bot.cached_api_get('sonarr', '/api/v3/series')
         return (data or [])[:limit]
 
 
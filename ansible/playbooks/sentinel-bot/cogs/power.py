@@ -4,7 +4,6 @@ Cluster-wide power management commands for safe shutdown and startup.
 """
 
 import logging
-import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -13,11 +12,15 @@ from dataclasses import dataclass, field
 import time
 
 from config import (
-    PROXMOX_NODES, LXC_CONTAINERS,
-    WOL_MAC_ADDRESSES, WOL_BROADCAST,
-    NODE_SHUTDOWN_ORDER, NODE_STARTUP_ORDER,
-    LXC_STARTUP_ORDER, CRITICAL_LXCS
+    PROXMOX_NODES, WOL_MAC_ADDRESSES,
+    NODE_SHUTDOWN_ORDER, CRITICAL_LXCS
 )
+from core.inventory import InventoryService
+from core.power_plan import (
+    PowerExecutor, PowerPlan, PowerStep, SimulatedCluster,
+    build_shutdown_plan, build_wake_plan, build_startup_plan
+)
+from core.progress import make_progress_bar
 
 if TYPE_CHECKING:
     from core import SentinelBot
@@ -28,6 +31,12 @@ logger = logging.getLogger('sentinel.cogs.power')
 CONFIRM_EMOJI = "\u26a0\ufe0f"  # Warning sign
 CANCEL_EMOJI = "\u274c"  # Red X
 
+# Minimum seconds between progress embed edits while a plan runs
+PROGRESS_INTERVAL = 2
+
+# Report field names per step kind
+STEP_FIELDS = {'node': 'nodes', 'vm': 'vms', 'lxc': 'lxcs'}
+
 
 @dataclass
 class PowerOperationReport:
@@ -48,6 +57,9 @@ class PowerOperationReport:
     lxcs_failures: List[str] = field(default_factory=list)
     lxcs_skipped: List[str] = field(default_factory=list)
 
+    steps: List[PowerStep] = field(default_factory=list)
+    dry_run: bool = False
+
     start_time: float = field(default_factory=time.time)
 
     @property
@@ -61,6 +73,29 @@ class PowerOperationReport:
     def has_failures(self) -> bool:
         return bool(self.nodes_failures or self.vms_failures or self.lxcs_failures)
 
+    def record(self, step: PowerStep) -> None:
+        """Count a finished plan step (steps that found nothing to do aren't counted)."""
+        self.steps.append(step)
+        if step.ok and not step.changed:
+            return
+
+        prefix = STEP_FIELDS[step.kind]
+        setattr(self, f"{prefix}_total", getattr(self, f"{prefix}_total") + 1)
+        if step.ok:
+            setattr(self, f"{prefix}_success", getattr(self, f"{prefix}_success") + 1)
+        else:
+            getattr(self, f"{prefix}_failures").append(f"{step.label}: {step.error}" if step.error else step.label)
+
+    def timings(self, limit: int = 5) -> str:
+        """Slowest steps, and how much parallelism saved over running them in series."""
+        ran = sorted((s for s in self.steps if s.duration), key=lambda s: s.duration, reverse=True)
+        if not ran:
+            return ""
+        lines = [f"`{s.duration:5.1f}s` {s.kind.upper()} {s.label} ({s.action})" for s in ran[:limit]]
+        serial = sum(s.duration for s in ran)
+        lines.append(f"{len(ran)} steps, {serial:.0f}s of work in {self.duration}")
+        return "\n".join(lines)
+
     def to_embed(self) -> discord.Embed:
         """Generate summary embed."""
         if self.operation == 'shutdown':
@@ -78,8 +113,14 @@ class PowerOperationReport:
                 title = ":warning: Startup Completed with Errors"
                 color = discord.Color.yellow()
 
+        if self.dry_run:
+            title = f":test_tube: Dry Run - {title}"
+            color = discord.Color.blurple()
+
         embed = discord.Embed(title=title, color=color)
         embed.description = f"Completed in **{self.duration}**"
+        if self.dry_run:
+            embed.description += "\nSimulated against a copy of the inventory; nothing was touched."
 
         # Node status
         node_emoji = ":white_check_mark:" if not self.nodes_failures else ":warning:"
@@ -124,6 +165,10 @@ class PowerOperationReport:
         if skipped_items:
             embed.add_field(name=":fast_forward: Kept Running", value="\n".join(skipped_items), inline=False)
 
+        timings = self.timings()
+        if timings:
+            embed.add_field(name=":stopwatch: Slowest Steps", value=timings, inline=False)
+
         return embed
 
 
@@ -148,30 +193,36 @@ class PowerCog(commands.Cog, name="Power"):
         name="shutdownall",
         description="Gracefully shutdown all VMs, LXCs, and Proxmox nodes"
     )
-    async def shutdown_all(self, interaction: discord.Interaction):
+    @app_commands.describe(dry_run="Simulate the shutdown without touching anything")
+    async def shutdown_all(self, interaction: discord.Interaction, dry_run: bool = False):
         """Shutdown the entire homelab cluster."""
         await interaction.response.defer()
 
-        # Build summary of what will be affected
+        if dry_run:
+            await self._dry_run(interaction, self._perform_shutdown_all)
+            return
+
+        # Build summary of what will be affected (one cluster-wide listing)
         summary_lines = []
         total_vms = 0
         total_lxcs = 0
+        inventory = await self.bot.inventory.get(refresh=True)
 
         for node_name in NODE_SHUTDOWN_ORDER:
             node_ip = PROXMOX_NODES.get(node_name)
-            if not node_ip:
+            if not node_ip or not inventory:
                 continue
 
-            vms = await self.ssh.pve_get_running_vms(node_ip)
-            lxcs = await self.ssh.pve_get_running_lxcs(node_ip)
+            vms = inventory.on_node(node_name, 'qemu', running=True)
+            lxcs = inventory.on_node(node_name, 'lxc', running=True)
 
             if vms or lxcs:
                 summary_lines.append(f"**{node_name}** ({node_ip})")
                 if vms:
-                    summary_lines.append(f"  VMs: {', '.join(v['name'] for v in vms)}")
+                    summary_lines.append(f"  VMs: {', '.join(v.name for v in vms)}")
                     total_vms += len(vms)
                 if lxcs:
-                    summary_lines.append(f"  LXCs: {', '.join(l['name'] for l in lxcs)}")
+                    summary_lines.append(f"  LXCs: {', '.join(l.name for l in lxcs)}")
                     total_lxcs += len(lxcs)
 
         await self._confirm_and_execute(
@@ -185,9 +236,9 @@ class PowerCog(commands.Cog, name="Power"):
                 f"- {total_lxcs} LXC containers\n"
                 f"- {len(PROXMOX_NODES)} Proxmox nodes\n\n"
                 "**Shutdown order:**\n"
-                "1. Stop all VMs (gracefully)\n"
-                "2. Stop all LXC containers\n"
-                "3. Shutdown all Proxmox nodes\n\n"
+                "1. Shut down all VMs (in parallel, forced after 60s)\n"
+                "2. Stop all LXC containers (Pi-hole last)\n"
+                "3. Shutdown each node once its guests are down\n\n"
                 ":warning: **Everything will be offline!**\n"
                 "Use `/startall` to bring it back up."
             ),
@@ -200,10 +251,15 @@ class PowerCog(commands.Cog, name="Power"):
         name="shutdown-nodns",
         description="Shutdown all except Pi-hole (DNS) and its host node"
     )
-    async def shutdown_nodns(self, interaction: discord.Interaction):
+    @app_commands.describe(dry_run="Simulate the shutdown without touching anything")
+    async def shutdown_nodns(self, interaction: discord.Interaction, dry_run: bool = False):
         """Shutdown everything except Pi-hole for DNS availability."""
         await interaction.response.defer()
 
+        if dry_run:
+            await self._dry_run(interaction, self._perform_shutdown_nodns)
+            return
+
         # Get Pi-hole info
         pihole_info = CRITICAL_LXCS.get('pi-hole')
         pihole_node_ip = pihole_info[0] if pihole_info else None
@@ -216,10 +272,11 @@ class PowerCog(commands.Cog, name="Power"):
                 kept_node = name
                 break
 
-        # Build summary
+        # Build summary (one cluster-wide listing)
         total_vms = 0
         total_lxcs = 0
         nodes_to_shutdown = []
+        inventory = await self.bot.inventory.get(refresh=True)
 
         for node_name in NODE_SHUTDOWN_ORDER:
             node_ip = PROXMOX_NODES.get(node_name)
@@ -230,15 +287,14 @@ class PowerCog(commands.Cog, name="Power"):
                 continue  # Skip the node hosting Pi-hole
 
             nodes_to_shutdown.append(node_name)
-            vms = await self.ssh.pve_get_running_vms(node_ip)
-            lxcs = await self.ssh.pve_get_running_lxcs(node_ip)
-            total_vms += len(vms)
-            total_lxcs += len(lxcs)
+            if inventory:
+                total_vms += len(inventory.on_node(node_name, 'qemu', running=True))
+                total_lxcs += len(inventory.on_node(node_name, 'lxc', running=True))
 
         # Count LXCs on Pi-hole's node that will be stopped (excluding Pi-hole)
-        if pihole_node_ip:
-            lxcs_on_pihole_node = await self.ssh.pve_get_running_lxcs(pihole_node_ip)
-            other_lxcs = [l for l in lxcs_on_pihole_node if l['ctid'] != pihole_ctid]
+        if kept_node and inventory:
+            lxcs_on_pihole_node = inventory.on_node(kept_node, 'lxc', running=True)
+            other_lxcs = [l for l in lxcs_on_pihole_node if l.vmid != pihole_ctid]
             total_lxcs += len(other_lxcs)
 
         await self._confirm_and_execute(
@@ -265,16 +321,20 @@ class PowerCog(commands.Cog, name="Power"):
         name="startall",
         description="Wake all nodes via WoL and start all VMs/LXCs"
     )
-    async def start_all(self, interaction: discord.Interaction):
+    @app_commands.describe(dry_run="Simulate a startup from a powered-off cluster")
+    async def start_all(self, interaction: discord.Interaction, dry_run: bool = False):
         """Start the entire homelab cluster."""
         await interaction.response.defer()
 
-        # Check which nodes are currently online
+        if dry_run:
+            await self._dry_run(interaction, self._perform_startup_all)
+            return
+
+        # Check which nodes are currently online (probed concurrently)
         online_nodes = []
         offline_nodes = []
 
-        for node_name, node_ip in PROXMOX_NODES.items():
-            is_online = await self.ssh.pve_is_node_online(node_ip)
+        for node_name, is_online in (await self.ssh.pve_nodes_online()).items():
             if is_online:
                 online_nodes.append(node_name)
             else:
@@ -305,9 +365,9 @@ class PowerCog(commands.Cog, name="Power"):
                 f"- Offline: {', '.join(offline_nodes) if offline_nodes else 'None'}\n\n"
                 "**Startup order:**\n"
                 "1. Send Wake-on-LAN to offline nodes\n"
-                "2. Wait for nodes to come online (up to 5 min each)\n"
-                "3. Start all LXC containers (Pi-hole first)\n"
-                "4. Start all VMs\n\n"
+                "2. Wait for nodes to come online (up to 5 min, in parallel)\n"
+                "3. Start Pi-hole first for DNS\n"
+                "4. Start the other LXCs and all VMs (in parallel)\n\n"
                 f":hourglass: This may take 5-10 minutes.{warning_text}"
             ),
             callback=self._perform_startup_all
@@ -315,6 +375,16 @@ class PowerCog(commands.Cog, name="Power"):
 
     # ==================== Confirmation Pattern ====================
 
+    async def _dry_run(self, interaction: discord.Interaction, callback):
+        """Run an operation against a simulated cluster (no confirmation needed)."""
+        embed = discord.Embed(
+            title=":test_tube: Dry Run",
+            description="Simulating against a copy of the current inventory...",
+            color=discord.Color.blurple()
+        )
+        msg = await interaction.followup.send(embed=embed, wait=True)
+        await callback(msg, interaction.channel, dry_run=True)
+
     async def _confirm_and_execute(
         self,
         interaction: discord.Interaction,
@@ -400,9 +470,9 @@ class PowerCog(commands.Cog, name="Power"):
 
     # ==================== Shutdown Implementation ====================
 
-    async def _perform_shutdown_all(self, message: discord.Message, channel):
+    async def _perform_shutdown_all(self, message: discord.Message, channel, dry_run: bool = False):
         """Execute full cluster shutdown."""
-        report = PowerOperationReport(operation='shutdown')
+        report = PowerOperationReport(operation='shutdown', dry_run=dry_run)
 
         # Update embed to show progress
         embed = discord.Embed(
@@ -413,21 +483,18 @@ class PowerCog(commands.Cog, name="Power"):
         embed.add_field(name="Phase", value=":computer: Preparing...", inline=False)
         await message.edit(embed=embed)
 
-        # Phase 1: Stop VMs (in reverse node order - services on node02 first)
-        await self._shutdown_vms(message, embed, report, exclude_node_ips=[])
-
-        # Phase 2: Stop LXCs
-        await self._shutdown_lxcs(message, embed, report, exclude_ctids=[])
-
-        # Phase 3: Shutdown nodes
-        await self._shutdown_nodes(message, embed, report, exclude_node_ips=[])
+        ssh, inventory = await self._backend(dry_run)
+        plan = build_shutdown_plan(await inventory.get(refresh=True))
+        await self._execute(plan, ssh, ":stop_button: Stopping guests and nodes...", message, embed, report)
+        if not dry_run:
+            self.bot.inventory.invalidate()
 
         # Final report
         await message.edit(embed=report.to_embed())
 
-    async def _perform_shutdown_nodns(self, message: discord.Message, channel):
+    async def _perform_shutdown_nodns(self, message: discord.Message, channel, dry_run: bool = False):
         """Execute partial shutdown keeping Pi-hole and node01."""
-        report = PowerOperationReport(operation='shutdown')
+        report = PowerOperationReport(operation='shutdown', dry_run=dry_run)
 
         # Get Pi-hole info
         pihole_info = CRITICAL_LXCS.get('pi-hole')
@@ -449,162 +516,27 @@ class PowerCog(commands.Cog, name="Power"):
         embed.add_field(name="Phase", value=":computer: Preparing...", inline=False)
         await message.edit(embed=embed)
 
-        # Phase 1: Stop VMs on all nodes except Pi-hole's node
-        # Actually, we stop VMs on ALL nodes since Pi-hole is an LXC, not a VM
-        await self._shutdown_vms(message, embed, report, exclude_node_ips=[])
-
-        # Phase 2: Stop LXCs except Pi-hole
-        await self._shutdown_lxcs(message, embed, report, exclude_ctids=[pihole_ctid])
+        # VMs are stopped on ALL nodes since Pi-hole is an LXC, not a VM
+        ssh, inventory = await self._backend(dry_run)
+        plan = build_shutdown_plan(
+            await inventory.get(refresh=True),
+            keep_ctids=[pihole_ctid] if pihole_ctid else [],
+            keep_nodes=[kept_node] if kept_node else []
+        )
+        await self._execute(plan, ssh, ":stop_button: Stopping everything but Pi-hole...", message, embed, report)
         report.lxcs_skipped.append(f"pi-hole (CT{pihole_ctid})")
-
-        # Phase 3: Shutdown nodes except Pi-hole's host
-        await self._shutdown_nodes(message, embed, report, exclude_node_ips=[pihole_node_ip])
         report.nodes_skipped.append(f"{kept_node} (Pi-hole host)")
+        if not dry_run:
+            self.bot.inventory.invalidate()
 
         # Final report
         await message.edit(embed=report.to_embed())
 
-    async def _shutdown_vms(
-        self,
-        message: discord.Message,
-        embed: discord.Embed,
-        report: PowerOperationReport,
-        exclude_node_ips: List[str]
-    ):
-        """Stop all VMs in proper order."""
-        for node_name in NODE_SHUTDOWN_ORDER:
-            node_ip = PROXMOX_NODES.get(node_name)
-            if not node_ip or node_ip in exclude_node_ips:
-                continue
-
-            # Check if node is online
-            if not await self.ssh.pve_is_node_online(node_ip):
-                logger.info(f"Node {node_name} is offline, skipping VM shutdown")
-                continue
-
-            embed.set_field_at(
-                0, name="Phase",
-                value=f":computer: Stopping VMs on {node_name}...",
-                inline=False
-            )
-            await message.edit(embed=embed)
-
-            # Get running VMs
-            vms = await self.ssh.pve_get_running_vms(node_ip)
-
-            for vm in vms:
-                vmid = vm['vmid']
-                name = vm['name']
-                report.vms_total += 1
-
-                logger.info(f"Stopping VM {name} ({vmid}) on {node_name}")
-                result = await self.ssh.pve_stop_vm(node_ip, vmid)
-
-                if result.success:
-                    report.vms_success += 1
-                    logger.info(f"VM {name} stopped successfully")
-                else:
-                    report.vms_failures.append(f"{name} ({vmid})")
-                    logger.error(f"Failed to stop VM {name}: {result.stderr}")
-
-                # Small delay between VM stops
-                await asyncio.sleep(1)
-
-    async def _shutdown_lxcs(
-        self,
-        message: discord.Message,
-        embed: discord.Embed,
-        report: PowerOperationReport,
-        exclude_ctids: List[int]
-    ):
-        """Stop all LXC containers in proper order."""
-        embed.set_field_at(
-            0, name="Phase",
-            value=":package: Stopping LXC containers...",
-            inline=False
-        )
-        await message.edit(embed=embed)
-
-        for node_name in NODE_SHUTDOWN_ORDER:
-            node_ip = PROXMOX_NODES.get(node_name)
-            if not node_ip:
-                continue
-
-            # Check if node is online
-            if not await self.ssh.pve_is_node_online(node_ip):
-                logger.info(f"Node {node_name} is offline, skipping LXC shutdown")
-                continue
-
-            # Get running LXCs
-            lxcs = await self.ssh.pve_get_running_lxcs(node_ip)
-
-            for lxc in lxcs:
-                ctid = lxc['ctid']
-                name = lxc['name']
-
-                if ctid in exclude_ctids:
-                    logger.info(f"Skipping LXC {name} ({ctid}) - excluded")
-                    continue
-
-                report.lxcs_total += 1
-
-                logger.info(f"Stopping LXC {name} ({ctid}) on {node_name}")
-                result = await self.ssh.pve_stop_lxc(node_ip, ctid)
-
-                if result.success:
-                    report.lxcs_success += 1
-                    logger.info(f"LXC {name} stopped successfully")
-                else:
-                    report.lxcs_failures.append(f"{name} ({ctid})")
-                    logger.error(f"Failed to stop LXC {name}: {result.stderr}")
-
-                await asyncio.sleep(1)
-
-    async def _shutdown_nodes(
-        self,
-        message: discord.Message,
-        embed: discord.Embed,
-        report: PowerOperationReport,
-        exclude_node_ips: List[str]
-    ):
-        """Shutdown Proxmox nodes in proper order."""
-        for node_name in NODE_SHUTDOWN_ORDER:
-            node_ip = PROXMOX_NODES.get(node_name)
-            if not node_ip or node_ip in exclude_node_ips:
-                continue
-
-            # Check if node is online
-            if not await self.ssh.pve_is_node_online(node_ip):
-                logger.info(f"Node {node_name} is already offline")
-                continue
-
-            report.nodes_total += 1
-            embed.set_field_at(
-                0, name="Phase",
-                value=f":desktop_computer: Shutting down {node_name}...",
-                inline=False
-            )
-            await message.edit(embed=embed)
-
-            logger.info(f"Shutting down node {node_name} ({node_ip})")
-            result = await self.ssh.pve_shutdown_node(node_ip)
-
-            # Connection reset is expected during shutdown
-            if result.success or 'Connection reset' in result.stderr or 'closed' in result.stderr.lower():
-                report.nodes_success += 1
-                logger.info(f"Node {node_name} shutdown initiated")
-            else:
-                report.nodes_failures.append(node_name)
-                logger.error(f"Failed to shutdown node {node_name}: {result.stderr}")
-
-            # Wait between node shutdowns
-            await asyncio.sleep(5)
-
     # ==================== Startup Implementation ====================
 
-    async def _perform_startup_all(self, message: discord.Message, channel):
+    async def _perform_startup_all(self, message: discord.Message, channel, dry_run: bool = False):
         """Execute full cluster startup."""
-        report = PowerOperationReport(operation='startup')
+        report = PowerOperationReport(operation='startup', dry_run=dry_run)
 
         embed = discord.Embed(
             title=":hourglass: Starting Cluster...",
@@ -614,195 +546,76 @@ class PowerCog(commands.Cog, name="Power"):
         embed.add_field(name="Phase", value=":satellite: Preparing...", inline=False)
         await message.edit(embed=embed)
 
-        # Phase 1: Wake nodes via WoL
-        await self._wake_nodes(message, embed, report)
+        ssh, inventory = await self._backend(dry_run, powered_off=True)
 
-        # Phase 2: Wait for nodes to come online
-        await self._wait_for_nodes(message, embed, report)
-
-        # Phase 3: Start LXCs (Pi-hole first for DNS)
-        await self._start_lxcs(message, embed, report)
+        # Stage 1: Wake nodes via WoL and wait for them to boot
+        wake = await self._execute(
+            build_wake_plan(), ssh, ":satellite: Waking nodes...", message, embed, report
+        )
+        online = [step.node for step in wake.steps.values() if step.ok]
 
-        # Phase 4: Start VMs
-        await self._start_vms(message, embed, report)
+        # Stage 2: Guests can only be listed once their nodes are up
+        plan = build_startup_plan(await inventory.get(refresh=True), online)
+        await self._execute(plan, ssh, ":package: Starting guests (Pi-hole first)...", message, embed, report)
+        if not dry_run:
+            self.bot.inventory.invalidate()
 
         # Final report
         await message.edit(embed=report.to_embed())
 
-    async def _wake_nodes(
-        self,
-        message: discord.Message,
-        embed: discord.Embed,
-        report: PowerOperationReport
-    ):
-        """Send WoL packets to all offline nodes."""
-        for node_name in NODE_STARTUP_ORDER:
-            node_ip = PROXMOX_NODES.get(node_name)
-            if not node_ip:
-                continue
+    # ==================== Plan Execution ====================
 
-            # Check if already online
-            if await self.ssh.pve_is_node_online(node_ip):
-                logger.info(f"Node {node_name} is already online")
-                continue
+    async def _backend(self, dry_run: bool, powered_off: bool = False):
+        """
+        SSH backend and inventory for an operation.
 
-            mac = WOL_MAC_ADDRESSES.get(node_name)
-            if not mac or mac == 'TBD':
-                logger.warning(f"No MAC address configured for {node_name}")
-                report.nodes_failures.append(f"{node_name} (no MAC)")
-                continue
+        Dry runs get a SimulatedCluster seeded from the current inventory
+        (all nodes off for a startup), so nothing real is touched.
+        """
+        if not dry_run:
+            return self.ssh, self.bot.inventory
 
-            report.nodes_total += 1
-            embed.set_field_at(
-                0, name="Phase",
-                value=f":satellite: Sending WoL to {node_name}...",
-                inline=False
-            )
-            await message.edit(embed=embed)
-
-            logger.info(f"Sending WoL to {node_name} ({mac})")
-            result = await self.ssh.send_wol(mac, WOL_BROADCAST)
+        simulated = SimulatedCluster(await self.bot.inventory.get(), powered_off=powered_off)
+        return simulated, InventoryService(simulated, ttl=0)
 
-            if not result.success:
-                logger.error(f"Failed to send WoL to {node_name}: {result.stderr}")
-                # Don't count as failure yet - we'll check if it comes online
-
-            # Small delay between WoL packets
-            await asyncio.sleep(1)
-
-    async def _wait_for_nodes(
+    async def _execute(
         self,
+        plan: PowerPlan,
+        ssh,
+        phase: str,
         message: discord.Message,
         embed: discord.Embed,
         report: PowerOperationReport
-    ):
-        """Wait for all nodes to come online."""
-        for node_name in NODE_STARTUP_ORDER:
-            node_ip = PROXMOX_NODES.get(node_name)
-            if not node_ip:
-                continue
-
-            # Check if already online
-            if await self.ssh.pve_is_node_online(node_ip):
-                if report.nodes_total > 0:
-                    # Only count if we tried to wake it
-                    pass
-                else:
-                    report.nodes_total += 1
-                report.nodes_success += 1
-                logger.info(f"Node {node_name} is online")
-                continue
-
-            # Skip if we didn't try to wake it (no MAC)
-            mac = WOL_MAC_ADDRESSES.get(node_name)
-            if not mac or mac == 'TBD':
-                continue
-
+    ) -> PowerPlan:
+        """Run a power plan, recording each step and updating the progress embed."""
+        finished = 0
+        last_edit = 0.0
+
+        async def on_step(step: PowerStep):
+            nonlocal finished, last_edit
+            report.record(step)
+            finished += 1
+
+            # Throttle edits to stay clear of Discord rate limits
+            if finished < len(plan) and time.monotonic() - last_edit < PROGRESS_INTERVAL:
+                return
+            last_edit = time.monotonic()
             embed.set_field_at(
                 0, name="Phase",
-                value=f":hourglass: Waiting for {node_name} to come online...",
+                value=(
+                    f"{phase}\n{make_progress_bar(finished, len(plan))}\n"
+                    f"Last: {step.kind.upper()} {step.label} - {step.status}"
+                ),
                 inline=False
             )
             await message.edit(embed=embed)
 
-            is_online = await self.ssh.wait_for_node_online(node_ip, timeout=300)
-            if is_online:
-                report.nodes_success += 1
-            else:
-                report.nodes_failures.append(f"{node_name} (timeout)")
-
-    async def _start_lxcs(
-        self,
-        message: discord.Message,
-        embed: discord.Embed,
-        report: PowerOperationReport
-    ):
-        """Start LXC containers in priority order."""
-        embed.set_field_at(
-            0, name="Phase",
-            value=":package: Starting LXC containers...",
-            inline=False
-        )
-        await message.edit(embed=embed)
-
-        # Start in priority order
-        for name, node_ip, ctid in LXC_STARTUP_ORDER:
-            # Check if node is online
-            if not await self.ssh.pve_is_node_online(node_ip):
-                logger.warning(f"Node for LXC {name} is offline, skipping")
-                report.lxcs_failures.append(f"{name} (node offline)")
-                continue
-
-            # Check if already running
-            if await self.ssh.lxc_is_running(node_ip, ctid):
-                logger.info(f"LXC {name} is already running")
-                continue
-
-            report.lxcs_total += 1
-
-            logger.info(f"Starting LXC {name} ({ctid})")
-            result = await self.ssh.pve_start_lxc(node_ip, ctid)
-
-            if result.success:
-                report.lxcs_success += 1
-                logger.info(f"LXC {name} started successfully")
-            else:
-                report.lxcs_failures.append(f"{name} ({ctid})")
-                logger.error(f"Failed to start LXC {name}: {result.stderr}")
-
-            # Brief delay to allow service initialization
-            await asyncio.sleep(3)
-
-    async def _start_vms(
-        self,
-        message: discord.Message,
-        embed: discord.Embed,
-        report: PowerOperationReport
-    ):
-        """Start all VMs in proper order."""
-        for node_name in NODE_STARTUP_ORDER:
-            node_ip = PROXMOX_NODES.get(node_name)
-            if not node_ip:
-                continue
-
-            # Check if node is online
-            if not await self.ssh.pve_is_node_online(node_ip):
-                logger.warning(f"Node {node_name} is offline, skipping VM startup")
-                continue
-
-            embed.set_field_at(
-                0, name="Phase",
-                value=f":computer: Starting VMs on {node_name}...",
-                inline=False
-            )
-            await message.edit(embed=embed)
-
-            # Get all VMs (including stopped)
-            vms = await self.ssh.pve_get_all_vms(node_ip)
-
-            for vm in vms:
-                vmid = vm['vmid']
-                name = vm['name']
-                status = vm['status']
-
-                if status == 'running':
-                    logger.info(f"VM {name} is already running")
-                    continue
-
-                report.vms_total += 1
-
-                logger.info(f"Starting VM {name} ({vmid}) on {node_name}")
-                result = await self.ssh.pve_start_vm(node_ip, vmid)
-
-                if result.success:
-                    report.vms_success += 1
-                    logger.info(f"VM {name} started successfully")
-                else:
-                    report.vms_failures.append(f"{name} ({vmid})")
-                    logger.error(f"Failed to start VM {name}: {result.stderr}")
+        executor = PowerExecutor(ssh, on_step=on_step)
+        if isinstance(ssh, SimulatedCluster):
+            executor.poll_initial = executor.poll_max = ssh.latency
 
-                # Brief delay between VM starts
-                await asyncio.sleep(2)
+        logger.info(f"Running {plan.operation} plan with {len(plan)} steps")
+        return await executor.run(plan)
 
 
 async def setup(bot: 'SentinelBot'):
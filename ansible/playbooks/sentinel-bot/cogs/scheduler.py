@@ -8,15 +8,31 @@ import asyncio
 from datetime import datetime, time
 import discord
 from discord.ext import commands, tasks
-from typing import TYPE_CHECKING, List, Dict
+from typing import TYPE_CHECKING, List, Dict, Optional
 
 from config import CONTAINER_HOSTS
+from core.arr_events import ArrEvent
+from core.arr_queue import ARR_SERVICES, ArrQueueSnapshot, QueueDelta
+from core.download_tracker import DownloadTracker, MilestoneEvent, record_key, tracking_id
 
 if TYPE_CHECKING:
     from core import SentinelBot
 
 logger = logging.getLogger('sentinel.cogs.scheduler')
 
+# Retention windows
+TASK_LOG_RETENTION_DAYS = 30      # raw task_logs; older rows survive as daily aggregates
+UPDATE_HISTORY_RETENTION_DAYS = 180
+DOWNLOAD_RETENTION_HOURS = 24     # completed downloads
+ABANDONED_DOWNLOAD_DAYS = 7       # downloads that never completed
+
+# Radarr/Sonarr webhooks report grabs, imports and failures as they happen;
+# the queue poll is only a reconciliation sweep (progress milestones, missed events).
+# Webhooks carry no progress, so the sweep speeds up while anything is downloading
+# to keep the 50%/80% notices timely, and drops back once the queue is idle.
+ARR_SWEEP_MINUTES = 10
+ARR_ACTIVE_POLL_MINUTES = 1
+
 
 class SchedulerCog(commands.Cog, name="Scheduler"):
     """Scheduled tasks and background jobs."""
@@ -26,23 +42,33 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
         self._download_cache: Dict[str, Dict] = {}
         self._notified_failures: set = set()  # Track notified failed downloads
         self._failed_download_messages: Dict[int, Dict] = {}  # msg_id -> {queue_id, service}
+        self.tracker: Optional[DownloadTracker] = None
+        self.arr_events: Dict[str, int] = {}  # event type -> webhooks handled
+
+        # One shared queue poll feeds both the progress and failure handlers
+        self.arr_queue = ArrQueueSnapshot(bot)
+        self.arr_queue.subscribe(self._on_queue_progress)
+        self.arr_queue.subscribe(self._on_queue_failures)
+        self.arr_queue.subscribe(self._on_queue_library)
 
     async def cog_load(self):
         """Called when cog is loaded. Start scheduled tasks."""
         self.daily_update_report.start()
-        self.download_progress_check.start()
-        self.failed_download_check.start()
+        self.arr_queue_poll.start()
         self.stale_task_cleanup.start()
         self.daily_onboarding_report.start()
+        self.database_retention.start()
+        self.library_sync.start()
         logger.info("Scheduler tasks started")
 
     async def cog_unload(self):
         """Called when cog is unloaded. Stop scheduled tasks."""
         self.daily_update_report.cancel()
-        self.download_progress_check.cancel()
-        self.failed_download_check.cancel()
+        self.arr_queue_poll.cancel()
         self.stale_task_cleanup.cancel()
         self.daily_onboarding_report.cancel()
+        self.database_retention.cancel()
+        self.library_sync.cancel()
         logger.info("Scheduler tasks stopped")
 
     # ==================== Daily Update Report (7 PM) ====================
@@ -132,148 +158,141 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
         # 3. Compare and return True if different
         return False  # Placeholder
 
-    # ==================== Download Progress Check (Every 60s) ====================
+    # ==================== Radarr/Sonarr Queue Sweep (Every 10m, 1m while downloading) ====================
+
+    @tasks.loop(minutes=ARR_SWEEP_MINUTES)
+    async def arr_queue_poll(self):
+        """
+        Reconcile both download queues; handlers only see records that changed.
 
-    @tasks.loop(seconds=60)
-    async def download_progress_check(self):
-        """Check download progress and send milestone notifications."""
+        Milestone notices (50%/80%) only come from this poll, so it runs every
+        ARR_ACTIVE_POLL_MINUTES while a download is in progress and falls back
+        to the ARR_SWEEP_MINUTES sweep when nothing is downloading.
+        """
         try:
-            await self._check_radarr_progress()
-            await self._check_sonarr_progress()
+            await self.arr_queue.poll()
         except Exception as e:
-            logger.error(f"Download progress check failed: {e}")
+            logger.error(f"Download queue poll failed: {e}")
 
-    @download_progress_check.before_loop
-    async def before_download_progress_check(self):
-        """Wait for bot to be ready."""
+        downloading = any(
+            record.get('status', '').lower() == 'downloading'
+            for service in ARR_SERVICES
+            for record in self.arr_queue.records(service)
+        )
+        self._set_queue_poll_interval(ARR_ACTIVE_POLL_MINUTES if downloading else ARR_SWEEP_MINUTES)
+
+    def _set_queue_poll_interval(self, minutes: int):
+        """Change the queue poll cadence; the pending sleep is rescheduled."""
+        if self.arr_queue_poll.minutes != minutes:
+            self.arr_queue_poll.change_interval(minutes=minutes)
+
+    @arr_queue_poll.before_loop
+    async def before_arr_queue_poll(self):
+        """Wait for bot to be ready, then load tracked downloads."""
         await self.bot.wait_until_ready()
         # Wait a bit for other systems to initialize
         await asyncio.sleep(30)
 
-    async def _check_radarr_progress(self):
-        """Check Radarr download progress."""
-        url = f"{self.bot.config.api.radarr_url}/api/v3/queue"
-        data = await self.bot.api_get(url, 'radarr')
+        if self.bot.db:
+            try:
+                tracker = DownloadTracker(self.bot.db)
+                await tracker.load()
+                self.tracker = tracker
+            except Exception as e:
+                logger.error(f"Failed to load download tracking state: {e}")
 
-        if not data:
+    async def _on_queue_progress(self, deltas: Dict[str, QueueDelta]):
+        """Send milestone notifications for downloads whose progress changed."""
+        if not self.tracker:
             return
 
-        for item in data.get('records', []):
-            download_id = str(item.get('id'))
-            title = item.get('title', 'Unknown')
-            progress = item.get('sizeleft', 0)
-            size = item.get('size', 1)
-
-            if size > 0:
-                percent_complete = ((size - progress) / size) * 100
-            else:
-                percent_complete = 0
+        events: List[MilestoneEvent] = []
+        for delta in deltas.values():
+            events += self.tracker.update(delta.service, delta.media_type, delta.updated)
 
-            await self._notify_progress(download_id, title, 'movie', percent_complete)
+        # One transaction per tick, and only for downloads that changed
+        await self.tracker.flush()
+        self.tracker.prune(
+            record_key(service, record)
+            for service in ARR_SERVICES
+            for record in self.arr_queue.records(service)
+        )
 
-    async def _check_sonarr_progress(self):
-        """Check Sonarr download progress."""
-        url = f"{self.bot.config.api.sonarr_url}/api/v3/queue"
-        data = await self.bot.api_get(url, 'sonarr')
+        for event in events:
+            self._notify_progress(event)
 
-        if not data:
+    def _notify_progress(self, event: MilestoneEvent):
+        """Send a progress notification for a crossed milestone."""
+        if not self.bot.channel_router:
             return
 
-        for item in data.get('records', []):
-            download_id = str(item.get('id'))
-            title = item.get('title', 'Unknown')
-            progress = item.get('sizeleft', 0)
-            size = item.get('size', 1)
-
-            if size > 0:
-                percent_complete = ((size - progress) / size) * 100
+        emoji = ":clapper:" if event.media_type == 'movie' else ":tv:"
+        if event.milestone == 100:
+            msg = f"{emoji} **{event.title}** download complete!"
+        else:
+            msg = f"{emoji} **{event.title}** - {event.milestone}% complete"
+
+        self.bot.channel_router.enqueue('media', content=msg)
+
+    # ==================== Radarr/Sonarr Webhooks ====================
+
+    async def handle_arr_event(self, event: ArrEvent):
+        """
+        Apply a Radarr/Sonarr webhook to download state.
+
+        Grab starts tracking the download (and speeds up the queue poll for
+        its milestones), Download (imported) reports it
+        complete and re-indexes the title, and DownloadFailure triggers an
+        immediate queue poll: the failed record carries the queue ID the
+        removal reaction needs, which the webhook doesn't.
+        """
+        self.arr_events[event.event_type] = self.arr_events.get(event.event_type, 0) + 1
+
+        if event.event_type == 'Grab':
+            if self.tracker:
+                self.tracker.grabbed(event.service, event.media_type, event.download_id, event.title)
+                await self.tracker.flush()
+            # Follow its progress without waiting out the idle sweep
+            self._set_queue_poll_interval(ARR_ACTIVE_POLL_MINUTES)
+            logger.info(f"{event.service} grabbed: {event.title}")
+
+        elif event.event_type == 'Download':
+            if self.tracker:
+                milestone = self.tracker.completed(
+                    event.service, event.media_type, event.download_id, event.title
+                )
+                await self.tracker.flush()
             else:
-                percent_complete = 0
-
-            await self._notify_progress(download_id, title, 'episode', percent_complete)
-
-    async def _notify_progress(self, download_id: str, title: str, media_type: str, percent: float):
-        """Send progress notification at milestones."""
-        milestones = [50, 80, 100]
-
-        if not self.bot.db:
-            return
-
-        # Ensure download is being tracked (creates record if not exists)
-        await self.bot.db.start_download_tracking(download_id, media_type, title)
-
-        # Get already notified milestones
-        notified = await self.bot.db.get_download_milestones(download_id)
-
-        for milestone in milestones:
-            if percent >= milestone and milestone not in notified:
-                # Record milestone
-                await self.bot.db.add_download_milestone(download_id, milestone)
-
-                # Send notification
-                if self.bot.channel_router:
-                    emoji = ":clapper:" if media_type == 'movie' else ":tv:"
-                    if milestone == 100:
-                        msg = f"{emoji} **{title}** download complete!"
-                        await self.bot.db.complete_download(download_id)
-                    else:
-                        msg = f"{emoji} **{title}** - {milestone}% complete"
-
-                    await self.bot.channel_router.send('media', content=msg)
-                break
-
-    # ==================== Failed Download Check (Every 5 min) ====================
-
-    @tasks.loop(minutes=5)
-    async def failed_download_check(self):
-        """Check for failed downloads and notify with removal option."""
-        try:
-            await self._check_radarr_failures()
-            await self._check_sonarr_failures()
-        except Exception as e:
-            logger.error(f"Failed download check error: {e}")
-
-    @failed_download_check.before_loop
-    async def before_failed_download_check(self):
-        """Wait for bot to be ready."""
-        await self.bot.wait_until_ready()
-        await asyncio.sleep(60)  # Wait a bit after startup
-
-    async def _check_radarr_failures(self):
-        """Check Radarr queue for failed downloads."""
-        url = f"{self.bot.config.api.radarr_url}/api/v3/queue"
-        data = await self.bot.api_get(url, 'radarr')
-
-        if not data:
-            return
+                # State not loaded yet; report it anyway rather than drop it
+                milestone = MilestoneEvent(
+                    tracking_id(event.service, event.download_id), event.title, event.media_type, 100)
 
-        for item in data.get('records', []):
-            status = item.get('status', '').lower()
-            if status in ['failed', 'warning']:
-                queue_id = item.get('id')
-                failure_key = f"radarr_{queue_id}"
+            if milestone:
+                self._notify_progress(milestone)
+            if event.item_id and self.bot.library:
+                await self.bot.library.refresh(event.service, [event.item_id])
 
-                if failure_key not in self._notified_failures:
-                    await self._notify_failed_download(item, 'radarr')
-                    self._notified_failures.add(failure_key)
+        elif event.event_type == 'DownloadFailure':
+            logger.info(f"{event.service} download failed: {event.title} - {event.message}")
+            await self.arr_queue.poll()
 
-    async def _check_sonarr_failures(self):
-        """Check Sonarr queue for failed downloads."""
-        url = f"{self.bot.config.api.sonarr_url}/api/v3/queue"
-        data = await self.bot.api_get(url, 'sonarr')
+    # ==================== Failed Downloads ====================
 
-        if not data:
-            return
+    async def _on_queue_failures(self, deltas: Dict[str, QueueDelta]):
+        """Notify newly failed downloads, with a removal option."""
+        for service, delta in deltas.items():
+            for item in delta.updated:
+                status = item.get('status', '').lower()
+                if status in ['failed', 'warning']:
+                    failure_key = f"{service}_{item.get('id')}"
 
-        for item in data.get('records', []):
-            status = item.get('status', '').lower()
-            if status in ['failed', 'warning']:
-                queue_id = item.get('id')
-                failure_key = f"sonarr_{queue_id}"
+                    if failure_key not in self._notified_failures:
+                        await self._notify_failed_download(item, service)
+                        self._notified_failures.add(failure_key)
 
-                if failure_key not in self._notified_failures:
-                    await self._notify_failed_download(item, 'sonarr')
-                    self._notified_failures.add(failure_key)
+            # Forget failures that have left the queue
+            for item in delta.removed:
+                self._notified_failures.discard(f"{service}_{item.get('id')}")
 
     async def _notify_failed_download(self, item: Dict, service: str):
         """Send notification for failed download with removal option."""
@@ -374,20 +393,14 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
 
     async def _remove_from_queue(self, queue_id: int, service: str) -> bool:
         """Remove an item from Radarr/Sonarr queue."""
-        if service == 'radarr':
-            base_url = self.bot.config.api.radarr_url
-            api_key = self.bot.config.api.radarr_api_key
-        else:
-            base_url = self.bot.config.api.sonarr_url
-            api_key = self.bot.config.api.sonarr_api_key
+        client = self.bot.services.get(service)
+        if not client:
+            return False
 
-        url = f"{base_url}/api/v3/queue/{queue_id}?removeFromClient=true&blocklist=false&apikey={api_key}"
+        url = f"/api/v3/queue/{queue_id}?removeFromClient=true&blocklist=false"
 
         try:
-            if not self.bot.http_session:
-                return False
-
-            async with self.bot.http_session.delete(url) as resp:
+            async with client.request('DELETE', url) as resp:
                 if resp.status in [200, 204]:
                     logger.info(f"Removed queue item {queue_id} from {service}")
                     return True
@@ -407,12 +420,14 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
             if not self.bot.db:
                 return
 
-            count = await self.bot.db.reset_stale_tasks(hours=2)
+            async with self.bot.db.batch():
+                count = await self.bot.db.reset_stale_tasks(hours=2)
+                # Also cleanup old completed downloads
+                removed = await self.bot.db.cleanup_old_downloads(hours=24)
+
             if count > 0:
                 logger.info(f"Reset {count} stale tasks")
 
-            # Also cleanup old completed downloads
-            removed = await self.bot.db.cleanup_old_downloads(hours=24)
             if removed > 0:
                 logger.debug(f"Cleaned up {removed} old download records")
 
@@ -424,6 +439,59 @@ class SchedulerCog(commands.Cog, name="Scheduler"):
         """Wait for bot to be ready."""
         await self.bot.wait_until_ready()
 
+    # ==================== Database Retention (4 AM) ====================
+
+    @tasks.loop(time=time(hour=4, minute=0))  # 4:00 AM
+    async def database_retention(self):
+        """Roll up and expire old rows, then return freed pages to the filesystem."""
+        try:
+            if not self.bot.db:
+                return
+
+            started = asyncio.get_running_loop().time()
+            rolled_up = await self.bot.db.rollup_task_logs(days=TASK_LOG_RETENTION_DAYS)
+            updates = await self.bot.db.expire_update_history(days=UPDATE_HISTORY_RETENTION_DAYS)
+            downloads = await self.bot.db.expire_downloads(
+                completed_hours=DOWNLOAD_RETENTION_HOURS,
+                abandoned_days=ABANDONED_DOWNLOAD_DAYS
+            )
+            pages = await self.bot.db.incremental_vacuum()
+            elapsed = asyncio.get_running_loop().time() - started
+
+            logger.info(
+                f"Retention: rolled up {rolled_up} task logs, expired {updates} updates "
+                f"and {downloads} downloads, released {pages} pages in {elapsed:.1f}s"
+            )
+
+        except Exception as e:
+            logger.error(f"Database retention failed: {e}")
+
+    @database_retention.before_loop
+    async def before_database_retention(self):
+        """Wait for bot to be ready."""
+        await self.bot.wait_until_ready()
+
+    # ==================== Library Index Sync (Every 10 min) ====================
+
+    @tasks.loop(minutes=10)
+    async def library_sync(self):
+        """Pull library changes from *arr history (full listing on first run and daily)."""
+        try:
+            if self.bot.library:
+                await self.bot.library.sync()
+        except Exception as e:
+            logger.error(f"Library sync failed: {e}")
+
+    @library_sync.before_loop
+    async def before_library_sync(self):
+        """Wait for bot to be ready."""
+        await self.bot.wait_until_ready()
+
+    async def _on_queue_library(self, deltas: Dict[str, QueueDelta]) -> None:
+        """Re-index titles whose downloads just left the queue."""
+        if self.bot.library:
+            await self.bot.library.refresh_from_queue(deltas)
+
     # ==================== Daily Onboarding Report (9 AM) ====================
 
     @tasks.loop(time=time(hour=9, minute=0))  # 9:00 AM
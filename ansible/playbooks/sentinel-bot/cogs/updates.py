@@ -66,8 +66,8 @@ class UpdatesCog(commands.Cog, name="Updates"):
             progress.update(checked, f":hourglass: Checking **{host_ip}** ({len(containers)} containers)...")
             await status_msg.edit(embed=progress.embed)
 
-            result = await self.ssh.docker_ps_all(host_ip)
-            if not result.success:
+            probe = await self.ssh.probe(host_ip, ['containers'])
+            if not probe.success or probe.containers is None:
                 errors.append(f"**{host_ip}**: Connection failed")
             checked += 1
 
@@ -261,17 +261,18 @@ class UpdatesCog(commands.Cog, name="Updates"):
             progress.update(checked, f":hourglass: Checking **{name}** ({host_ip})...")
             await status_msg.edit(embed=progress.embed)
 
-            # Run apt update
-            update_result = await self.ssh.apt_update(host_ip)
-            if not update_result.success:
+            # Refresh apt cache and list upgradable packages in one exec
+            probe = await self.ssh.probe(host_ip, ['upgradable'], timeout=120)
+            if not probe.success:
                 errors.append(f"**{name}**: Connection failed")
                 checked += 1
                 continue
 
-            # Check for upgradable packages
-            result = await self.ssh.apt_upgradable(host_ip)
-            if result.success and result.output.strip():
-                count = len(result.output.strip().split('\n'))
+            if probe.upgradable is None:
+                rc = probe.exit_codes.get('upgradable')
+                errors.append(f"**{name}**: apt update failed" + (f" (exit {rc})" if rc is not None else ""))
+            elif probe.upgradable:
+                count = len(probe.upgradable)
                 updates_found.append(f"**{name}** ({host_ip}): {count} packages")
 
             checked += 1
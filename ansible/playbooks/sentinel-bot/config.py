@@ -242,3 +242,35 @@ PROXMOX_NODES = {
     'node02': '192.168.20.21',
     'node03': '192.168.20.22',
 }
+
+# LXC containers (for apt updates and power management)
+# Format: name -> (proxmox_node_ip, ctid)
+LXC_CONTAINERS = {
+    'pbs': ('192.168.20.22', 100),               # node03 - Proxmox Backup Server
+    'docker-lxc-glance': ('192.168.20.22', 200),  # node03 - Glance dashboard
+    'pi-hole': ('192.168.20.20', 202),           # node01 - DNS server
+    'homeassistant': ('192.168.20.22', 206),     # node03 - Home Assistant
+}
+
+# LXCs that must stay up for the network to work (kept by /shutdown-nodns)
+CRITICAL_LXCS = {
+    'pi-hole': LXC_CONTAINERS['pi-hole'],
+}
+
+# Wake-on-LAN
+WOL_MAC_ADDRESSES = {
+    'node01': '38:05:25:32:82:76',
+    'node02': '84:47:09:4d:7a:ca',
+    'node03': 'd8:43:ae:a8:4c:a7',
+}
+WOL_BROADCAST = '192.168.20.255'
+
+# Power management order
+NODE_SHUTDOWN_ORDER = ['node03', 'node02', 'node01']
+NODE_STARTUP_ORDER = ['node01', 'node02', 'node03']
+
+# LXC startup order: (name, proxmox_node_ip, ctid), Pi-hole first for DNS
+LXC_STARTUP_ORDER = [
+    (name, *LXC_CONTAINERS[name])
+    for name in ('pi-hole', 'pbs', 'docker-lxc-glance', 'homeassistant')
+]
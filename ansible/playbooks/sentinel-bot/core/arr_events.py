@@ -0,0 +1,81 @@
+"""
+Sentinel Bot *arr Webhook Events
+Parses Radarr/Sonarr Connect webhooks into download events.
+
+Configure in Radarr/Sonarr: Settings -> Connect -> Add -> Webhook
+    URL:     http://<sentinel>:5050/webhook/radarr   (or /webhook/sonarr)
+    Method:  POST
+    Events:  On Grab, On Import (Download), On Download Failure
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from .arr_queue import ARR_SERVICES
+
+logger = logging.getLogger('sentinel.arr_events')
+
+# Webhook eventType values that change download state
+ARR_EVENT_TYPES = {'Grab', 'Download', 'DownloadFailure'}
+
+# Library item in the payload, per service
+ITEM_KEYS = {'radarr': 'movie', 'sonarr': 'series'}
+
+
+@dataclass
+class ArrEvent:
+    """A Grab, Download (imported) or DownloadFailure webhook."""
+    service: str
+    media_type: str
+    event_type: str
+    download_id: str
+    title: str
+    item_id: Optional[int] = None
+    message: Optional[str] = None
+
+
+def _event_title(service: str, payload: Dict[str, Any]) -> str:
+    """Human-readable title: movie (year), or series with the episode when there is only one."""
+    item = payload.get(ITEM_KEYS[service]) or {}
+    title = item.get('title') or (payload.get('release') or {}).get('releaseTitle') or 'Unknown'
+
+    if service == 'radarr':
+        return f"{title} ({item['year']})" if item.get('year') else title
+
+    episodes = payload.get('episodes') or []
+    if len(episodes) == 1:
+        episode = episodes[0]
+        return f"{title} - S{episode.get('seasonNumber', 0):02d}E{episode.get('episodeNumber', 0):02d}"
+    return title
+
+
+def parse_arr_event(service: str, payload: Dict[str, Any]) -> Optional[ArrEvent]:
+    """
+    Parse a webhook payload.
+
+    Returns:
+        ArrEvent, or None for event types that don't affect downloads
+        (Test, Rename, Health, ...) and payloads without a downloadId
+    """
+    if service not in ARR_SERVICES:
+        raise ValueError(f"unknown service: {service}")
+
+    event_type = payload.get('eventType', '')
+    if event_type not in ARR_EVENT_TYPES:
+        return None
+
+    download_id = payload.get('downloadId')
+    if not download_id:
+        logger.debug(f"{service} {event_type} webhook without downloadId ignored")
+        return None
+
+    return ArrEvent(
+        service=service,
+        media_type=ARR_SERVICES[service],
+        event_type=event_type,
+        download_id=download_id,
+        title=_event_title(service, payload),
+        item_id=(payload.get(ITEM_KEYS[service]) or {}).get('id'),
+        message=payload.get('message'),
+    )
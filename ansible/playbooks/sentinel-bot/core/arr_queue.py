@@ -0,0 +1,169 @@
+"""
+Sentinel Bot Arr Queue Snapshot
+Shared Radarr/Sonarr queue poller that publishes only what changed.
+"""
+
+import logging
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bot import SentinelBot
+
+logger = logging.getLogger('sentinel.arr_queue')
+
+# Records per queue page; one page covers a typical queue
+QUEUE_PAGE_SIZE = 250
+
+# Safety cap on pages fetched per service per poll
+MAX_QUEUE_PAGES = 20
+
+# Queue services and the media type of their records
+ARR_SERVICES = {'radarr': 'movie', 'sonarr': 'episode'}
+
+# Record fields that matter to subscribers; other churn is ignored
+FINGERPRINT_FIELDS = (
+    'title', 'status', 'trackedDownloadStatus', 'trackedDownloadState',
+    'size', 'sizeleft', 'errorMessage', 'statusMessages',
+)
+
+
+def fingerprint(record: Dict[str, Any]) -> str:
+    """Stable hash of the subscriber-relevant fields of a queue record."""
+    relevant = {key: record.get(key) for key in FINGERPRINT_FIELDS}
+    return hashlib.blake2b(
+        json.dumps(relevant, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+
+
+@dataclass
+class QueueDelta:
+    """Changes to one service's queue since the previous poll."""
+    service: str
+    media_type: str
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def updated(self) -> List[Dict[str, Any]]:
+        """Added and changed records."""
+        return self.added + self.changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+Subscriber = Callable[[Dict[str, QueueDelta]], Awaitable[None]]
+
+
+class ArrQueueSnapshot:
+    """
+    Polls the Radarr and Sonarr queues concurrently and diffs them.
+
+    Subscribers receive {service: QueueDelta} for the services that changed;
+    a tick where nothing changed publishes nothing. A service whose fetch
+    fails keeps its previous snapshot, so an outage is never reported as
+    every record being removed.
+    """
+
+    def __init__(self, bot: 'SentinelBot', page_size: int = QUEUE_PAGE_SIZE):
+        self.bot = bot
+        self.page_size = page_size
+        self._records: Dict[str, Dict[Any, Dict[str, Any]]] = {service: {} for service in ARR_SERVICES}
+        self._fingerprints: Dict[str, Dict[Any, str]] = {service: {} for service in ARR_SERVICES}
+        self._subscribers: List[Subscriber] = []
+        self._lock = asyncio.Lock()
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Register an async callback for queue deltas."""
+        self._subscribers.append(callback)
+
+    def records(self, service: str) -> List[Dict[str, Any]]:
+        """Current snapshot of a service's queue."""
+        return list(self._records[service].values())
+
+    async def _fetch(self, service: str) -> Optional[List[Dict[str, Any]]]:
+        """Fetch every page of a service's queue, or None on failure."""
+        base_url = getattr(self.bot.config.api, f'{service}_url')
+        records: List[Dict[str, Any]] = []
+
+        for page in range(1, MAX_QUEUE_PAGES + 1):
+            data = await self.bot.api_get(
+                f"{base_url}/api/v3/queue", service,
+                params={'page': page, 'pageSize': self.page_size}
+            )
+            if not data:
+                return None
+
+            batch = data.get('records', [])
+            records.extend(batch)
+            if not batch or len(records) >= data.get('totalRecords', 0):
+                return records
+
+        logger.warning(f"{service} queue exceeds {MAX_QUEUE_PAGES} pages, snapshot truncated")
+        return records
+
+    def _diff(self, service: str, records: List[Dict[str, Any]]) -> QueueDelta:
+        """Replace a service's snapshot and return what changed."""
+        delta = QueueDelta(service=service, media_type=ARR_SERVICES[service])
+        previous = self._fingerprints[service]
+        current_records = {}
+        current_prints = {}
+
+        for record in records:
+            queue_id = record.get('id')
+            digest = fingerprint(record)
+            current_records[queue_id] = record
+            current_prints[queue_id] = digest
+
+            if queue_id not in previous:
+                delta.added.append(record)
+            elif previous[queue_id] != digest:
+                delta.changed.append(record)
+
+        delta.removed = [
+            record for queue_id, record in self._records[service].items()
+            if queue_id not in current_records
+        ]
+
+        self._records[service] = current_records
+        self._fingerprints[service] = current_prints
+        return delta
+
+    async def poll(self) -> Dict[str, QueueDelta]:
+        """
+        Fetch both queues concurrently and publish the changes.
+
+        Polls are serialized, so a webhook-triggered poll never races the
+        scheduled sweep.
+
+        Returns:
+            {service: QueueDelta} for services whose queue changed
+        """
+        async with self._lock:
+            return await self._poll()
+
+    async def _poll(self) -> Dict[str, QueueDelta]:
+        services = list(ARR_SERVICES)
+        results = await asyncio.gather(*(self._fetch(service) for service in services))
+
+        deltas = {}
+        for service, records in zip(services, results):
+            if records is None:
+                continue
+            delta = self._diff(service, records)
+            if delta:
+                deltas[service] = delta
+
+        if deltas:
+            for callback in self._subscribers:
+                try:
+                    await callback(deltas)
+                except Exception as e:
+                    logger.error(f"Queue subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+        return deltas
@@ -6,11 +6,17 @@ Consolidated Discord bot for homelab management.
 import logging
 import discord
 from discord.ext import commands
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, TYPE_CHECKING
 import aiohttp
 
 from config import Config
 
+if TYPE_CHECKING:
+    from .inventory import InventoryService
+    from .library_index import LibraryIndex
+    from .response_cache import ResponseCache
+    from .service_client import ServiceClient
+
 logger = logging.getLogger('sentinel')
 
 
@@ -44,6 +50,10 @@ class SentinelBot(commands.Bot):
 
         self.config = config
         self.http_session: Optional[aiohttp.ClientSession] = None
+        self.services: Dict[str, 'ServiceClient'] = {}
+        self.response_cache: Optional['ResponseCache'] = None
+        self.library: Optional['LibraryIndex'] = None
+        self.inventory: Optional['InventoryService'] = None
         self._channel_cache: Dict[str, discord.TextChannel] = {}
 
         # Database and SSH manager will be initialized in setup_hook
@@ -58,15 +68,31 @@ class SentinelBot(commands.Bot):
         # Create shared HTTP session
         self.http_session = aiohttp.ClientSession()
 
+        # Per-service API clients (own pool, timeouts, retries, circuit breaker)
+        self.services = self._build_service_clients()
+
+        # Shared cache for read-only API responses
+        from .response_cache import ResponseCache
+        self.response_cache = ResponseCache()
+
         # Initialize database
         from .database import Database
         self.db = Database(self.config.database.path)
         await self.db.initialize()
 
+        # Local media library index (synced by the scheduler)
+        from .library_index import LibraryIndex
+        self.library = LibraryIndex(self)
+        await self.library.load()
+
         # Initialize SSH manager
         from .ssh_manager import SSHManager
         self.ssh = SSHManager(self.config.ssh)
 
+        # Cached Proxmox cluster inventory (guest -> node lookups)
+        from .inventory import InventoryService
+        self.inventory = InventoryService(self.ssh)
+
         # Initialize channel router
         from .channel_router import ChannelRouter
         self.channel_router = ChannelRouter(self, self.config.discord)
@@ -141,12 +167,21 @@ class SentinelBot(commands.Bot):
         """Clean up resources when shutting down."""
         logger.info("Sentinel Bot shutting down...")
 
+        if self.channel_router:
+            await self.channel_router.close()
+
         if self.http_session:
             await self.http_session.close()
 
+        for client in self.services.values():
+            await client.close()
+
         if self.db:
             await self.db.close()
 
+        if self.ssh:
+            await self.ssh.close_all()
+
         await super().close()
 
     def get_api_headers(self, service: str) -> Dict[str, str]:
@@ -168,8 +203,32 @@ class SentinelBot(commands.Bot):
 
         return headers
 
+    def _build_service_clients(self) -> Dict[str, 'ServiceClient']:
+        """Create one ServiceClient per configured API service."""
+        from .service_client import ServiceClient
+
+        api = self.config.api
+        clients = {}
+        for service in ('radarr', 'sonarr', 'jellyseerr', 'jellyfin', 'gitlab', 'authentik', 'prometheus'):
+            base_url = getattr(api, f'{service}_url')
+            if base_url:
+                clients[service] = ServiceClient(service, base_url, headers=self.get_api_headers(service))
+
+        if api.opnsense_url:
+            # OPNsense uses key/secret basic auth and a self-signed certificate
+            clients['opnsense'] = ServiceClient(
+                'opnsense', api.opnsense_url,
+                auth=aiohttp.BasicAuth(api.opnsense_api_key, api.opnsense_api_secret),
+                verify_ssl=False
+            )
+        return clients
+
     async def api_get(self, url: str, service: str, **kwargs) -> Optional[Any]:
         """Make an authenticated GET request to a service API."""
+        client = self.services.get(service)
+        if client:
+            return await client.get_json(url, **kwargs)
+
         if not self.http_session:
             return None
 
@@ -185,8 +244,38 @@ class SentinelBot(commands.Bot):
             logger.error(f"API GET {url} error: {e}")
             return None
 
+    async def cached_api_get(
+        self,
+        service: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        ttl: Optional[float] = None
+    ) -> Optional[Any]:
+        """
+        GET a read-only service endpoint through the shared response cache.
+
+        Args:
+            service: Service name (radarr, sonarr, ...)
+            endpoint: Path relative to the service URL, e.g. /api/v3/movie
+            params: Query parameters (part of the cache key)
+            ttl: Seconds before the response is revalidated (default: cache default)
+        """
+        from .response_cache import make_key
+
+        url = f"{getattr(self.config.api, f'{service}_url')}{endpoint}"
+        key = make_key(service, endpoint, params)
+        fetch = lambda: self.api_get(url, service, params=params)
+
+        if ttl is None:
+            return await self.response_cache.get(key, fetch)
+        return await self.response_cache.get(key, fetch, ttl=ttl)
+
     async def api_post(self, url: str, service: str, data: Any = None, **kwargs) -> Optional[Any]:
         """Make an authenticated POST request to a service API."""
+        client = self.services.get(service)
+        if client:
+            return await client.post_json(url, data, **kwargs)
+
         if not self.http_session:
             return None
 
@@ -0,0 +1,89 @@
+"""
+Sentinel Bot Bulk Guest Power
+Shuts down many guests on a node in one remote script and parses the per-guest results.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+# Seconds a guest gets to shut down gracefully before it is stopped
+SHUTDOWN_TIMEOUT = 60
+
+# Proxmox CLI per guest type
+GUEST_TOOLS = {'qemu': 'qm', 'lxc': 'pct'}
+_TOOL_TYPES = {tool: guest_type for guest_type, tool in GUEST_TOOLS.items()}
+
+# One line per guest: tool, ID, method that finished, exit code, elapsed ms, last output line
+_RESULT_RE = re.compile(
+    r'^@@SENTINEL-GUEST (?P<tool>qm|pct) (?P<vmid>\d+) (?P<method>shutdown|stop) '
+    r'rc=(?P<rc>-?\d+) ms=(?P<ms>\d+)@@ ?(?P<message>.*)$',
+    re.MULTILINE
+)
+
+# Runs in a background subshell per guest: graceful shutdown, falling back to stop
+_GUEST_FUNCTION = '''sentinel_guest() {{
+  s=$(date +%s%N)
+  if out=$($1 shutdown $2 --timeout {timeout} 2>&1); then m=shutdown; rc=0
+  else m=stop; out=$($1 stop $2 2>&1); rc=$?; fi
+  echo "@@SENTINEL-GUEST $1 $2 $m rc=$rc ms=$(( ($(date +%s%N) - s) / 1000000 ))@@ $(echo "$out" | tail -n 1)"
+}}'''
+
+
+@dataclass
+class GuestPowerResult:
+    """Outcome of one guest in a bulk shutdown."""
+    guest_type: str  # 'qemu' or 'lxc'
+    vmid: int
+    success: bool
+    method: str = ''  # 'shutdown', or 'stop' after the graceful attempt failed
+    exit_code: int = -1  # -1: no result line (the command as a whole failed)
+    elapsed: float = 0.0
+    message: str = ''
+
+
+def build_bulk_shutdown_script(guests: Iterable[Tuple[str, int]], timeout: int = SHUTDOWN_TIMEOUT) -> str:
+    """
+    Build a remote script that shuts down every guest in parallel and waits.
+
+    Args:
+        guests: (guest_type, vmid) pairs, guest_type 'qemu' or 'lxc'
+        timeout: Graceful shutdown timeout per guest, in seconds
+
+    Raises:
+        ValueError: If a guest type is unknown
+    """
+    lines = [_GUEST_FUNCTION.format(timeout=int(timeout))]
+    for guest_type, vmid in guests:
+        if guest_type not in GUEST_TOOLS:
+            raise ValueError(f"Unknown guest type: {guest_type}")
+        lines.append(f"sentinel_guest {GUEST_TOOLS[guest_type]} {int(vmid)} &")
+    lines.append('wait')
+    return '\n'.join(lines)
+
+
+def parse_bulk_output(output: str) -> Dict[Tuple[str, int], GuestPowerResult]:
+    """Parse bulk shutdown output into {(guest_type, vmid): result}."""
+    results = {}
+    for match in _RESULT_RE.finditer(output.replace('\r\n', '\n')):
+        guest_type = _TOOL_TYPES[match.group('tool')]
+        vmid = int(match.group('vmid'))
+        rc = int(match.group('rc'))
+        results[(guest_type, vmid)] = GuestPowerResult(
+            guest_type=guest_type,
+            vmid=vmid,
+            success=rc == 0,
+            method=match.group('method'),
+            exit_code=rc,
+            elapsed=int(match.group('ms')) / 1000,
+            message=match.group('message').strip(),
+        )
+    return results
+
+
+def missing_results(guests: Iterable[Tuple[str, int]], error: str) -> List[GuestPowerResult]:
+    """Failure results for guests the output said nothing about."""
+    return [
+        GuestPowerResult(guest_type=guest_type, vmid=vmid, success=False, message=error)
+        for guest_type, vmid in guests
+    ]
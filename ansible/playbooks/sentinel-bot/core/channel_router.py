@@ -4,14 +4,20 @@ Routes notifications to appropriate Discord channels.
 """
 
 import logging
+import asyncio
 import discord
-from typing import Optional, Dict, TYPE_CHECKING
+from typing import Optional, Dict, List, Any, TYPE_CHECKING
+
+from .outbound import OutboundMessage, OutboundQueue, RateLimited
 
 if TYPE_CHECKING:
     from .bot import SentinelBot
 
 logger = logging.getLogger('sentinel.router')
 
+# Lines listed in a coalesced embed before "...and N more"
+COALESCED_MAX_LINES = 20
+
 
 class ChannelRouter:
     """Routes messages to appropriate Discord channels."""
@@ -33,10 +39,20 @@ class ChannelRouter:
         'announcements': 'channel_announcements',
     }
 
+    # Titles for coalesced notifications, by coalesce key then by kind
+    COALESCED_TITLES = {
+        'update:success': ':arrow_up: {count} containers updated',
+        'update:failed': ':x: {count} container updates failed',
+        'update': 'Container Updates: {count} {event}',
+        'media': '{count} titles {event}',
+        'task': '{count} tasks {event}',
+    }
+
     def __init__(self, bot: 'SentinelBot', discord_config):
         self.bot = bot
         self.config = discord_config
         self._channel_cache: Dict[str, discord.TextChannel] = {}
+        self._queues: Dict[int, OutboundQueue] = {}
 
     async def cache_channels(self) -> None:
         """Cache all configured channels for fast access."""
@@ -98,6 +114,85 @@ class ChannelRouter:
         logger.warning(f"Unknown channel type: {channel_type}")
         return None
 
+    # ==================== Outbound Queue ====================
+
+    def _queue_for(self, channel: discord.TextChannel) -> OutboundQueue:
+        """Get (or create) the outbound queue for a channel."""
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            async def deliver(batch: List[OutboundMessage]) -> Optional[discord.Message]:
+                return await self._deliver(channel, batch)
+
+            queue = OutboundQueue(channel.name, deliver)
+            self._queues[channel.id] = queue
+        return queue
+
+    async def _deliver(
+        self,
+        channel: discord.TextChannel,
+        batch: List[OutboundMessage]
+    ) -> Optional[discord.Message]:
+        """Send one queued message, or a group of coalesced ones as a single embed."""
+        kwargs = batch[0].kwargs if len(batch) == 1 else {'embed': self._coalesce(batch)}
+
+        try:
+            return await channel.send(**kwargs)
+        except discord.Forbidden:
+            logger.error(f"No permission to send to #{channel.name}")
+            return None
+        except discord.HTTPException as e:
+            if e.status == 429:
+                raise RateLimited(getattr(e, 'retry_after', None) or 1.0)
+            logger.error(f"Failed to send to #{channel.name}: {e}")
+            return None
+
+    def _coalesce(self, batch: List[OutboundMessage]) -> discord.Embed:
+        """Render several notifications of the same kind as one summary embed."""
+        key = batch[0].coalesce_key
+        kind, _, event = key.partition(':')
+        template = self.COALESCED_TITLES.get(key) or self.COALESCED_TITLES.get(kind, '{count} notifications')
+
+        lines = [item.summary for item in batch if item.summary]
+        if len(lines) > COALESCED_MAX_LINES:
+            lines = lines[:COALESCED_MAX_LINES] + [f"...and {len(lines) - COALESCED_MAX_LINES} more"]
+
+        first = batch[0].kwargs.get('embed')
+        return discord.Embed(
+            title=template.format(count=len(batch), event=event),
+            description="\n".join(lines),
+            color=first.color if first else discord.Color.greyple()
+        )
+
+    def enqueue(
+        self,
+        channel_type: str,
+        coalesce_key: str = None,
+        summary: str = None,
+        **kwargs
+    ) -> bool:
+        """
+        Queue a message without waiting for it to be sent.
+
+        Args:
+            channel_type: Channel identifier
+            coalesce_key: Messages sharing this key (e.g. 'update:success')
+                within the coalescing window are sent as one summary embed
+            summary: One-line description used in the summary embed
+            **kwargs: channel.send parameters (content, embed, ...)
+
+        Returns:
+            True if queued, False if the channel is unknown
+        """
+        channel = self.get_channel(channel_type)
+        if not channel:
+            logger.error(f"Cannot send to channel type: {channel_type}")
+            return False
+
+        self._queue_for(channel).put(
+            OutboundMessage(kwargs=kwargs, coalesce_key=coalesce_key, summary=summary)
+        )
+        return True
+
     async def send(
         self,
         channel_type: str,
@@ -109,6 +204,9 @@ class ChannelRouter:
         """
         Send a message to a specific channel type.
 
+        Goes through the channel's outbound queue (so ordering and rate
+        limits hold) and waits for delivery.
+
         Args:
             channel_type: Channel identifier
             content: Text content
@@ -124,14 +222,25 @@ class ChannelRouter:
             logger.error(f"Cannot send to channel type: {channel_type}")
             return None
 
-        try:
-            return await channel.send(content=content, embed=embed, view=view, **kwargs)
-        except discord.Forbidden:
-            logger.error(f"No permission to send to #{channel.name}")
-            return None
-        except discord.HTTPException as e:
-            logger.error(f"Failed to send to #{channel.name}: {e}")
-            return None
+        future = asyncio.get_running_loop().create_future()
+        self._queue_for(channel).put(OutboundMessage(
+            kwargs=dict(content=content, embed=embed, view=view, **kwargs),
+            future=future
+        ))
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Outbound queue metrics per channel."""
+        return {queue.name: queue.stats() for queue in self._queues.values()}
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Flush queued messages (up to `timeout` seconds) and stop the senders."""
+        if self._queues:
+            await asyncio.gather(*(queue.drain(timeout) for queue in self._queues.values()))
+        for queue in self._queues.values():
+            await queue.close()
+
+    # ==================== Notifications ====================
 
     async def send_update_notification(
         self,
@@ -139,8 +248,8 @@ class ChannelRouter:
         host_ip: str,
         status: str,
         details: str = None
-    ) -> Optional[discord.Message]:
-        """Send a container update notification."""
+    ) -> bool:
+        """Queue a container update notification (bursts are coalesced per status)."""
         color = {
             'pending': discord.Color.blue(),
             'in_progress': discord.Color.yellow(),
@@ -156,7 +265,12 @@ class ChannelRouter:
         embed.add_field(name="Host", value=host_ip, inline=True)
         embed.add_field(name="Status", value=status.upper(), inline=True)
 
-        return await self.send('updates', embed=embed)
+        return self.enqueue(
+            'updates',
+            embed=embed,
+            coalesce_key=f'update:{status}',
+            summary=f"`{container_name}` on {host_ip}"
+        )
 
     async def send_media_notification(
         self,
@@ -165,8 +279,8 @@ class ChannelRouter:
         event: str,
         poster_url: str = None,
         details: Dict = None
-    ) -> Optional[discord.Message]:
-        """Send a media download/add notification."""
+    ) -> bool:
+        """Queue a media download/add notification (bursts are coalesced per event)."""
         emoji = {
             'movie': ':movie_camera:',
             'series': ':tv:',
@@ -195,7 +309,12 @@ class ChannelRouter:
             for key, value in details.items():
                 embed.add_field(name=key, value=str(value), inline=True)
 
-        return await self.send('media', embed=embed)
+        return self.enqueue(
+            'media',
+            embed=embed,
+            coalesce_key=f'media:{event.lower()}',
+            summary=f"{emoji} {title}"
+        )
 
     async def send_task_notification(
         self,
@@ -203,8 +322,8 @@ class ChannelRouter:
         description: str,
         event: str,
         instance_name: str = None
-    ) -> Optional[discord.Message]:
-        """Send a Claude task notification."""
+    ) -> bool:
+        """Queue a Claude task notification (bursts are coalesced per event)."""
         color = {
             'created': discord.Color.blue(),
             'claimed': discord.Color.yellow(),
@@ -222,7 +341,12 @@ class ChannelRouter:
         if instance_name:
             embed.add_field(name="Instance", value=instance_name, inline=True)
 
-        return await self.send('tasks', embed=embed)
+        return self.enqueue(
+            'tasks',
+            embed=embed,
+            coalesce_key=f'task:{event.lower()}',
+            summary=f"#{task_id} {description[:80]}"
+        )
 
     async def send_homelab_alert(
         self,
@@ -4,13 +4,53 @@ Async SQLite database for task queue, update history, and download tracking.
 """
 
 import logging
+import asyncio
+import os
 import aiosqlite
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 import json
+import time
+
+from .migrations import migrate
+from .notifier import TaskNotifier
 
 logger = logging.getLogger('sentinel.database')
 
+# Prepared statement cache size (sqlite3 reuses statements by SQL text)
+STATEMENT_CACHE_SIZE = 256
+
+# Numeric priority rank stored with each task (unknown priorities sort as medium)
+PRIORITY_RANKS = {'high': 1, 'medium': 2, 'low': 3}
+DEFAULT_PRIORITY_RANK = PRIORITY_RANKS['medium']
+
+# Pending task ordering: highest priority, then oldest first.
+# Pending-queue queries are pinned to this partial index: without ANALYZE
+# statistics the planner prefers idx_tasks_status and sorts the whole set.
+PENDING_ORDER = 'priority_rank, created_at, id'
+PENDING_INDEX = 'idx_tasks_pending'
+
+# Rows deleted per retention transaction, keeping write-lock hold times short
+RETENTION_BATCH_SIZE = 500
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Library index columns written by sync, and the sort keys commands may use
+LIBRARY_COLUMNS = (
+    'service', 'item_id', 'title', 'sort_title', 'year', 'quality', 'added', 'has_file',
+    'monitored', 'status', 'episode_file_count', 'episode_count', 'season_count',
+    'size_on_disk', 'external_id',
+)
+LIBRARY_SORTS = {'title': 'sort_title', 'year': 'year', 'quality': 'quality', 'added': 'added'}
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"*' for term in terms)
+
 
 class Database:
     """Async SQLite database manager."""
@@ -19,99 +59,108 @@ class Database:
         self.db_path = db_path
         self._connection: Optional[aiosqlite.Connection] = None
 
+        # One transaction at a time on the shared connection: batch() holds the
+        # write lock for its whole duration, and only the owning task nests
+        self._write_lock = asyncio.Lock()
+        self._batch_owner: Optional[asyncio.Task] = None
+        self._batch_depth = 0
+        self._pending_notify: List[int] = []
+        self.notifier = TaskNotifier()
+
     async def initialize(self) -> None:
-        """Initialize database and create tables."""
-        self._connection = await aiosqlite.connect(self.db_path)
+        """Open the database and bring the schema up to date."""
+        self._connection = await aiosqlite.connect(
+            self.db_path,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
         self._connection.row_factory = aiosqlite.Row
-        await self._create_tables()
-        logger.info(f"Database initialized at {self.db_path}")
-
-    async def _create_tables(self) -> None:
-        """Create all required tables."""
-        await self._connection.executescript('''
-            -- Claude Tasks (from Athena)
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                description TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                priority TEXT DEFAULT 'medium',
-                instance_id TEXT,
-                instance_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                claimed_at TIMESTAMP,
-                completed_at TIMESTAMP,
-                notes TEXT,
-                submitted_by TEXT
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
-            CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
-
-            -- Task Audit Log
-            CREATE TABLE IF NOT EXISTS task_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER REFERENCES tasks(id),
-                action TEXT NOT NULL,
-                details TEXT,
-                instance_id TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            -- Claude Instance Registry
-            CREATE TABLE IF NOT EXISTS instances (
-                id TEXT PRIMARY KEY,
-                name TEXT,
-                last_seen TIMESTAMP,
-                current_task_id INTEGER,
-                status TEXT DEFAULT 'idle'
-            );
-
-            -- Container Update History
-            CREATE TABLE IF NOT EXISTS update_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                container_name TEXT NOT NULL,
-                host_ip TEXT NOT NULL,
-                old_image TEXT,
-                new_image TEXT,
-                update_status TEXT,
-                updated_by TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_updates_container ON update_history(container_name);
-            CREATE INDEX IF NOT EXISTS idx_updates_status ON update_history(update_status);
-
-            -- Download Tracking
-            CREATE TABLE IF NOT EXISTS download_tracking (
-                id TEXT PRIMARY KEY,
-                media_type TEXT NOT NULL,
-                title TEXT NOT NULL,
-                poster_url TEXT,
-                size_bytes INTEGER,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notified_milestones TEXT DEFAULT '[]',
-                completed_at TIMESTAMP
-            );
-
-            -- Service Onboarding Status Cache
-            CREATE TABLE IF NOT EXISTS onboarding_cache (
-                service_name TEXT PRIMARY KEY,
-                terraform_ok INTEGER DEFAULT 0,
-                ansible_ok INTEGER DEFAULT 0,
-                dns_ok INTEGER DEFAULT 0,
-                traefik_ok INTEGER DEFAULT 0,
-                ssl_ok INTEGER DEFAULT 0,
-                authentik_ok INTEGER,
-                docs_ok INTEGER DEFAULT 0,
-                last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        ''')
-        await self._connection.commit()
+
+        # WAL lets readers run alongside the writer; NORMAL sync is durable in WAL mode
+        await self._connection.execute('PRAGMA journal_mode=WAL')
+        await self._connection.execute('PRAGMA synchronous=NORMAL')
+        await self._connection.execute('PRAGMA busy_timeout=5000')
+
+        started = time.perf_counter()
+        await self._enable_incremental_vacuum()
+        report = await migrate(self._connection)
+
+        # Refresh planner statistics for tables that changed a lot since the last ANALYZE
+        await self._connection.execute('PRAGMA optimize')
+        logger.info(
+            f"Database initialized at {self.db_path} (schema v{report.to_version}, "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms)"
+        )
+
+    async def _enable_incremental_vacuum(self) -> None:
+        """Switch to incremental auto-vacuum so freed pages can be returned without a full VACUUM."""
+        cursor = await self._connection.execute('PRAGMA auto_vacuum')
+        if (await cursor.fetchone())[0] == AUTO_VACUUM_INCREMENTAL:
+            return
+
+        await self._connection.execute('PRAGMA auto_vacuum=INCREMENTAL')
+
+        # On an existing database the new mode only takes effect after a full VACUUM (one-off)
+        cursor = await self._connection.execute('SELECT COUNT(*) FROM sqlite_master')
+        if (await cursor.fetchone())[0]:
+            started = time.perf_counter()
+            await self._connection.execute('VACUUM')
+            logger.info(f"Enabled incremental auto-vacuum ({(time.perf_counter() - started) * 1000:.1f}ms)")
+
+    def _in_batch(self) -> bool:
+        """True if the current task has a batch() open."""
+        return self._batch_depth > 0 and self._batch_owner is asyncio.current_task()
+
+    @asynccontextmanager
+    async def batch(self):
+        """
+        Group several writes into a single transaction.
+
+        Usage:
+            async with db.batch():
+                for update_id in update_ids:
+                    await db.update_update_status(update_id, 'success')
+
+        Every write goes through a batch. The outermost batch holds the write
+        lock until it commits (or rolls back on error), so other tasks' writes
+        wait instead of joining its transaction. Batches nest within a task.
+        """
+        if self._in_batch():
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+            return
+
+        async with self._write_lock:
+            self._batch_owner = asyncio.current_task()
+            self._batch_depth = 1
+            try:
+                yield self
+            except BaseException:
+                await self._connection.rollback()
+                raise
+            else:
+                await self._connection.commit()
+                # Wake waiters only for tasks that were actually committed
+                for task_id in self._pending_notify:
+                    self.notifier.notify(task_id)
+            finally:
+                self._pending_notify = []
+                self._batch_depth = 0
+                self._batch_owner = None
+
+    def _notify(self, task_id: int) -> None:
+        """Notify task waiters once the current batch commits."""
+        self._pending_notify.append(task_id)
 
     async def close(self) -> None:
         """Close database connection."""
         if self._connection:
+            try:
+                await self._connection.execute('PRAGMA optimize')
+            except Exception as e:
+                logger.warning(f"PRAGMA optimize on close failed: {e}")
             await self._connection.close()
             logger.info("Database connection closed")
 
@@ -121,36 +170,116 @@ class Database:
         self,
         description: str,
         priority: str = 'medium',
-        submitted_by: str = None
+        submitted_by: str = None,
+        tag: str = None
     ) -> int:
         """Create a new task and return its ID."""
-        cursor = await self._connection.execute(
-            '''INSERT INTO tasks (description, priority, submitted_by, status)
-               VALUES (?, ?, ?, 'pending')''',
-            (description, priority, submitted_by)
-        )
-        await self._connection.commit()
-        task_id = cursor.lastrowid
-
-        await self._log_task_action(task_id, 'created', f'Priority: {priority}')
+        async with self.batch():
+            cursor = await self._connection.execute(
+                '''INSERT INTO tasks (description, priority, priority_rank, submitted_by, tag, status)
+                   VALUES (?, ?, ?, ?, ?, 'pending')''',
+                (description, priority, PRIORITY_RANKS.get(priority, DEFAULT_PRIORITY_RANK), submitted_by, tag)
+            )
+            task_id = cursor.lastrowid
+            await self._log_task_action(task_id, 'created', f'Priority: {priority}')
+            self._notify(task_id)
         return task_id
 
-    async def get_pending_tasks(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get pending tasks ordered by priority."""
-        priority_order = "CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END"
-        cursor = await self._connection.execute(
-            f'''SELECT * FROM tasks WHERE status = 'pending'
-                ORDER BY {priority_order}, created_at ASC LIMIT ?''',
-            (limit,)
-        )
+    async def get_pending_tasks(
+        self,
+        limit: int = 10,
+        after: Optional[Tuple[int, str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get pending tasks ordered by priority.
+
+        Args:
+            limit: Maximum number of tasks to return
+            after: Keyset cursor (priority_rank, created_at, id) of the last
+                task on the previous page; see pending_cursor()
+        """
+        if after:
+            cursor = await self._connection.execute(
+                f'''SELECT * FROM tasks INDEXED BY {PENDING_INDEX} WHERE status = 'pending'
+                    AND ({PENDING_ORDER}) > (?, ?, ?)
+                    ORDER BY {PENDING_ORDER} LIMIT ?''',
+                (*after, limit)
+            )
+        else:
+            cursor = await self._connection.execute(
+                f'''SELECT * FROM tasks INDEXED BY {PENDING_INDEX} WHERE status = 'pending'
+                    ORDER BY {PENDING_ORDER} LIMIT ?''',
+                (limit,)
+            )
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
+    @staticmethod
+    def pending_cursor(task: Dict[str, Any]) -> Tuple[int, str, int]:
+        """Keyset cursor for paging pending tasks after `task`."""
+        return (task['priority_rank'], task['created_at'], task['id'])
+
     async def get_next_task(self) -> Optional[Dict[str, Any]]:
         """Get the next available task (highest priority, oldest first)."""
         tasks = await self.get_pending_tasks(limit=1)
         return tasks[0] if tasks else None
 
+    async def get_task(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single task by ID."""
+        cursor = await self._connection.execute(
+            '''SELECT * FROM tasks WHERE id = ?''',
+            (task_id,)
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+    async def claim_next_task(
+        self,
+        instance_id: str,
+        instance_name: str = None,
+        tag: str = None,
+        priority: str = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the highest-priority, oldest pending task.
+
+        Selection and claim happen in a single UPDATE ... RETURNING, so
+        concurrent workers can never claim the same task.
+
+        Args:
+            instance_id: Claiming instance ID
+            instance_name: Claiming instance display name
+            tag: Only consider tasks with this tag
+            priority: Only consider tasks with this priority
+
+        Returns:
+            The claimed task row, or None if no pending task matched
+        """
+        filters = ["status = 'pending'"]
+        params: List[Any] = [instance_id, instance_name]
+        if tag:
+            filters.append('tag = ?')
+            params.append(tag)
+        if priority:
+            filters.append('priority = ?')
+            params.append(priority)
+
+        async with self.batch():
+            cursor = await self._connection.execute(
+                f'''UPDATE tasks SET status = 'in_progress', instance_id = ?,
+                   instance_name = ?, claimed_at = CURRENT_TIMESTAMP
+                   WHERE id = (
+                       SELECT id FROM tasks INDEXED BY {PENDING_INDEX} WHERE {' AND '.join(filters)}
+                       ORDER BY {PENDING_ORDER} LIMIT 1
+                   )
+                   RETURNING *''',
+                params
+            )
+            row = await cursor.fetchone()
+            if row:
+                await self._log_task_action(row['id'], 'claimed', f'Instance: {instance_name}', instance_id)
+        return dict(row) if row else None
+
     async def claim_task(
         self,
         task_id: int,
@@ -158,18 +287,16 @@ class Database:
         instance_name: str = None
     ) -> bool:
         """Claim a task for processing. Returns True if successful."""
-        cursor = await self._connection.execute(
-            '''UPDATE tasks SET status = 'in_progress', instance_id = ?,
-               instance_name = ?, claimed_at = CURRENT_TIMESTAMP
-               WHERE id = ? AND status = 'pending' ''',
-            (instance_id, instance_name, task_id)
-        )
-        await self._connection.commit()
-
-        if cursor.rowcount > 0:
-            await self._log_task_action(task_id, 'claimed', f'Instance: {instance_name}', instance_id)
-            return True
-        return False
+        async with self.batch():
+            cursor = await self._connection.execute(
+                '''UPDATE tasks SET status = 'in_progress', instance_id = ?,
+                   instance_name = ?, claimed_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND status = 'pending' ''',
+                (instance_id, instance_name, task_id)
+            )
+            if cursor.rowcount > 0:
+                await self._log_task_action(task_id, 'claimed', f'Instance: {instance_name}', instance_id)
+        return cursor.rowcount > 0
 
     async def complete_task(
         self,
@@ -178,32 +305,28 @@ class Database:
         notes: str = None
     ) -> bool:
         """Mark a task as completed."""
-        cursor = await self._connection.execute(
-            '''UPDATE tasks SET status = 'completed', notes = ?,
-               completed_at = CURRENT_TIMESTAMP
-               WHERE id = ? AND instance_id = ?''',
-            (notes, task_id, instance_id)
-        )
-        await self._connection.commit()
-
-        if cursor.rowcount > 0:
-            await self._log_task_action(task_id, 'completed', notes, instance_id)
-            return True
-        return False
+        async with self.batch():
+            cursor = await self._connection.execute(
+                '''UPDATE tasks SET status = 'completed', notes = ?,
+                   completed_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND instance_id = ?''',
+                (notes, task_id, instance_id)
+            )
+            if cursor.rowcount > 0:
+                await self._log_task_action(task_id, 'completed', notes, instance_id)
+        return cursor.rowcount > 0
 
     async def cancel_task(self, task_id: int) -> bool:
         """Cancel a pending task."""
-        cursor = await self._connection.execute(
-            '''UPDATE tasks SET status = 'cancelled'
-               WHERE id = ? AND status = 'pending' ''',
-            (task_id,)
-        )
-        await self._connection.commit()
-
-        if cursor.rowcount > 0:
-            await self._log_task_action(task_id, 'cancelled')
-            return True
-        return False
+        async with self.batch():
+            cursor = await self._connection.execute(
+                '''UPDATE tasks SET status = 'cancelled'
+                   WHERE id = ? AND status = 'pending' ''',
+                (task_id,)
+            )
+            if cursor.rowcount > 0:
+                await self._log_task_action(task_id, 'cancelled')
+        return cursor.rowcount > 0
 
     async def get_completed_tasks(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recently completed tasks."""
@@ -225,15 +348,19 @@ class Database:
 
     async def reset_stale_tasks(self, hours: int = 2) -> int:
         """Reset tasks stuck in_progress for more than X hours."""
-        cursor = await self._connection.execute(
-            '''UPDATE tasks SET status = 'pending', instance_id = NULL,
-               instance_name = NULL, claimed_at = NULL
-               WHERE status = 'in_progress'
-               AND claimed_at < datetime('now', ? || ' hours')''',
-            (f'-{hours}',)
-        )
-        await self._connection.commit()
-        return cursor.rowcount
+        async with self.batch():
+            cursor = await self._connection.execute(
+                '''UPDATE tasks SET status = 'pending', instance_id = NULL,
+                   instance_name = NULL, claimed_at = NULL
+                   WHERE status = 'in_progress'
+                   AND claimed_at < datetime('now', ? || ' hours')
+                   RETURNING id''',
+                (f'-{hours}',)
+            )
+            rows = await cursor.fetchall()
+            for row in rows:
+                self._notify(row['id'])
+        return len(rows)
 
     async def _log_task_action(
         self,
@@ -242,13 +369,12 @@ class Database:
         details: str = None,
         instance_id: str = None
     ) -> None:
-        """Log a task action."""
+        """Log a task action (committed by the caller's transaction)."""
         await self._connection.execute(
             '''INSERT INTO task_logs (task_id, action, details, instance_id)
                VALUES (?, ?, ?, ?)''',
             (task_id, action, details, instance_id)
         )
-        await self._connection.commit()
 
     # ==================== Instance Registry Methods ====================
 
@@ -259,12 +385,12 @@ class Database:
         status: str = 'idle'
     ) -> None:
         """Update or create instance heartbeat."""
-        await self._connection.execute(
-            '''INSERT OR REPLACE INTO instances (id, name, last_seen, status)
-               VALUES (?, ?, CURRENT_TIMESTAMP, ?)''',
-            (instance_id, instance_name, status)
-        )
-        await self._connection.commit()
+        async with self.batch():
+            await self._connection.execute(
+                '''INSERT OR REPLACE INTO instances (id, name, last_seen, status)
+                   VALUES (?, ?, CURRENT_TIMESTAMP, ?)''',
+                (instance_id, instance_name, status)
+            )
 
     async def get_active_instances(self, minutes: int = 5) -> List[Dict[str, Any]]:
         """Get instances active in the last X minutes."""
@@ -286,12 +412,12 @@ class Database:
         updated_by: str = None
     ) -> int:
         """Record a container update."""
-        cursor = await self._connection.execute(
-            '''INSERT INTO update_history (container_name, host_ip, update_status, updated_by)
-               VALUES (?, ?, ?, ?)''',
-            (container_name, host_ip, status, updated_by)
-        )
-        await self._connection.commit()
+        async with self.batch():
+            cursor = await self._connection.execute(
+                '''INSERT INTO update_history (container_name, host_ip, update_status, updated_by)
+                   VALUES (?, ?, ?, ?)''',
+                (container_name, host_ip, status, updated_by)
+            )
         return cursor.lastrowid
 
     async def update_update_status(
@@ -301,18 +427,18 @@ class Database:
         completed: bool = False
     ) -> None:
         """Update the status of an update record."""
-        if completed:
-            await self._connection.execute(
-                '''UPDATE update_history SET update_status = ?, completed_at = CURRENT_TIMESTAMP
-                   WHERE id = ?''',
-                (status, update_id)
-            )
-        else:
-            await self._connection.execute(
-                '''UPDATE update_history SET update_status = ? WHERE id = ?''',
-                (status, update_id)
-            )
-        await self._connection.commit()
+        async with self.batch():
+            if completed:
+                await self._connection.execute(
+                    '''UPDATE update_history SET update_status = ?, completed_at = CURRENT_TIMESTAMP
+                       WHERE id = ?''',
+                    (status, update_id)
+                )
+            else:
+                await self._connection.execute(
+                    '''UPDATE update_history SET update_status = ? WHERE id = ?''',
+                    (status, update_id)
+                )
 
     async def get_recent_updates(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get recent update history."""
@@ -325,60 +451,316 @@ class Database:
 
     # ==================== Download Tracking Methods ====================
 
-    async def start_download_tracking(
+    async def get_download_tracking(self) -> List[Dict[str, Any]]:
+        """Get all tracked downloads (milestones decoded)."""
+        cursor = await self._connection.execute(
+            '''SELECT id, media_type, title, notified_milestones, completed_at FROM download_tracking'''
+        )
+        rows = []
+        for row in await cursor.fetchall():
+            row = dict(row)
+            row['notified_milestones'] = json.loads(row['notified_milestones'] or '[]')
+            rows.append(row)
+        return rows
+
+    async def save_download_tracking(self, downloads: List[Dict[str, Any]]) -> None:
+        """
+        Upsert tracked downloads in one transaction.
+
+        Args:
+            downloads: Dicts with id, media_type, title, milestones (list)
+                and completed (bool)
+        """
+        async with self.batch():
+            await self._connection.executemany(
+                '''INSERT INTO download_tracking
+                   (id, media_type, title, notified_milestones, completed_at)
+                   VALUES (?, ?, ?, ?, CASE WHEN ? THEN CURRENT_TIMESTAMP END)
+                   ON CONFLICT (id) DO UPDATE SET
+                       notified_milestones = excluded.notified_milestones,
+                       completed_at = COALESCE(download_tracking.completed_at, excluded.completed_at)''',
+                [
+                    (d['id'], d['media_type'], d['title'], json.dumps(d['milestones']), d['completed'])
+                    for d in downloads
+                ]
+            )
+
+    async def cleanup_old_downloads(self, hours: int = 24) -> int:
+        """Remove completed downloads older than X hours."""
+        async with self.batch():
+            cursor = await self._connection.execute(
+                '''DELETE FROM download_tracking
+                   WHERE completed_at IS NOT NULL
+                   AND completed_at < datetime('now', ? || ' hours')''',
+                (f'-{hours}',)
+            )
+        return cursor.rowcount
+
+    # ==================== Media Library Methods ====================
+
+    async def upsert_library_items(self, items: List[Dict[str, Any]]) -> None:
+        """Insert or update library rows (dicts keyed by LIBRARY_COLUMNS) in one transaction."""
+        if not items:
+            return
+        columns = ', '.join(LIBRARY_COLUMNS)
+        placeholders = ', '.join('?' for _ in LIBRARY_COLUMNS)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in LIBRARY_COLUMNS[2:])
+        async with self.batch():
+            await self._connection.executemany(
+                f'''INSERT INTO library_items ({columns}) VALUES ({placeholders})
+                    ON CONFLICT (service, item_id) DO UPDATE SET
+                        {updates}, synced_at = CURRENT_TIMESTAMP''',
+                [tuple(item[c] for c in LIBRARY_COLUMNS) for item in items]
+            )
+
+    async def delete_library_items(self, service: str, item_ids: List[int]) -> int:
+        """Remove library rows that no longer exist upstream."""
+        if not item_ids:
+            return 0
+        async with self.batch():
+            cursor = await self._connection.executemany(
+                'DELETE FROM library_items WHERE service = ? AND item_id = ?',
+                [(service, item_id) for item_id in item_ids]
+            )
+        return cursor.rowcount
+
+    async def replace_library(self, service: str, items: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Make the index for a service match a full library listing.
+
+        Returns:
+            (rows written, rows removed)
+        """
+        async with self.batch():
+            cursor = await self._connection.execute(
+                'SELECT item_id FROM library_items WHERE service = ?', (service,)
+            )
+            existing = {row['item_id'] for row in await cursor.fetchall()}
+            gone = list(existing - {item['item_id'] for item in items})
+
+            await self.upsert_library_items(items)
+            await self.delete_library_items(service, gone)
+            await self.set_library_sync(service, full_sync=True)
+        return len(items), len(gone)
+
+    async def query_library(
         self,
-        download_id: str,
-        media_type: str,
-        title: str,
-        poster_url: str = None,
-        size_bytes: int = None
-    ) -> None:
-        """Start tracking a download (preserves existing milestones)."""
-        await self._connection.execute(
-            '''INSERT OR IGNORE INTO download_tracking
-               (id, media_type, title, poster_url, size_bytes, notified_milestones)
-               VALUES (?, ?, ?, ?, ?, '[]')''',
-            (download_id, media_type, title, poster_url, size_bytes)
+        service: str,
+        available_only: bool = True,
+        search: Optional[str] = None,
+        sort: str = 'title',
+        descending: bool = False,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Page through the library index.
+
+        Args:
+            service: 'radarr' or 'sonarr'
+            available_only: Only movies with a file / series with episode files
+            search: Free-text title search (word prefixes, accent-insensitive)
+            sort: One of LIBRARY_SORTS (title, year, quality, added)
+            descending: Reverse the sort order
+            limit: Page size
+            offset: Rows to skip
+
+        Returns:
+            (rows for the page, total matching rows)
+        """
+        where = ['service = ?']
+        params: List[Any] = [service]
+        if available_only:
+            where.append('has_file = 1')
+        if search and fts_query(search):
+            where.append('id IN (SELECT rowid FROM library_fts WHERE library_fts MATCH ?)')
+            params.append(fts_query(search))
+        where_sql = ' AND '.join(where)
+
+        cursor = await self._connection.execute(
+            f'SELECT COUNT(*) FROM library_items WHERE {where_sql}', params
+        )
+        total = (await cursor.fetchone())[0]
+
+        column = LIBRARY_SORTS.get(sort, 'sort_title')
+        direction = 'DESC' if descending else 'ASC'
+        cursor = await self._connection.execute(
+            f'''SELECT * FROM library_items WHERE {where_sql}
+                ORDER BY {column} {direction}, sort_title LIMIT ? OFFSET ?''',
+            params + [limit, offset]
+        )
+        return [dict(row) for row in await cursor.fetchall()], total
+
+    async def get_library_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-service totals from the library index."""
+        cursor = await self._connection.execute(
+            '''SELECT service,
+                      COUNT(*) AS total,
+                      SUM(has_file) AS available,
+                      SUM(monitored) AS monitored,
+                      SUM(IFNULL(status = 'continuing', 0)) AS continuing,
+                      SUM(IFNULL(status = 'ended', 0)) AS ended,
+                      SUM(episode_file_count) AS episode_files,
+                      SUM(size_on_disk) AS size_on_disk
+               FROM library_items GROUP BY service'''
         )
-        await self._connection.commit()
+        return {row['service']: dict(row) for row in await cursor.fetchall()}
 
-    async def get_download_milestones(self, download_id: str) -> List[int]:
-        """Get notified milestones for a download."""
+    async def get_library_sync(self, service: str) -> Optional[Dict[str, Any]]:
+        """Incremental sync position for a service (None before its first full sync)."""
         cursor = await self._connection.execute(
-            '''SELECT notified_milestones FROM download_tracking WHERE id = ?''',
-            (download_id,)
+            'SELECT * FROM library_sync WHERE service = ?', (service,)
         )
         row = await cursor.fetchone()
-        if row:
-            return json.loads(row['notified_milestones'])
-        return []
-
-    async def add_download_milestone(self, download_id: str, milestone: int) -> None:
-        """Add a milestone to the notified list."""
-        milestones = await self.get_download_milestones(download_id)
-        if milestone not in milestones:
-            milestones.append(milestone)
+        return dict(row) if row else None
+
+    async def set_library_sync(
+        self,
+        service: str,
+        history_cursor: Optional[str] = None,
+        full_sync: bool = False
+    ) -> None:
+        """Advance the history cursor and/or record a completed full sync."""
+        async with self.batch():
             await self._connection.execute(
-                '''UPDATE download_tracking SET notified_milestones = ? WHERE id = ?''',
-                (json.dumps(milestones), download_id)
+                '''INSERT INTO library_sync (service, history_cursor, full_sync_at)
+                   VALUES (?, ?, CASE WHEN ? THEN CURRENT_TIMESTAMP END)
+                   ON CONFLICT (service) DO UPDATE SET
+                       history_cursor = COALESCE(excluded.history_cursor, library_sync.history_cursor),
+                       full_sync_at = COALESCE(excluded.full_sync_at, library_sync.full_sync_at)''',
+                (service, history_cursor, full_sync)
             )
-            await self._connection.commit()
 
-    async def complete_download(self, download_id: str) -> None:
-        """Mark a download as completed."""
-        await self._connection.execute(
-            '''UPDATE download_tracking SET completed_at = CURRENT_TIMESTAMP WHERE id = ?''',
-            (download_id,)
+    # ==================== Retention Methods ====================
+
+    async def rollup_task_logs(self, days: int = 30, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+        """
+        Fold task_logs rows older than X days into task_log_daily and delete them.
+
+        Each batch is aggregated and deleted in its own short transaction, so
+        the write lock is never held for long and a partial run loses nothing.
+
+        Returns:
+            Number of raw rows rolled up
+        """
+        cutoff = (f'-{days} days',)
+        total = 0
+
+        while True:
+            async with self.batch():
+                cursor = await self._connection.execute(
+                    '''SELECT MAX(id) FROM (
+                           SELECT id FROM task_logs WHERE timestamp < datetime('now', ?)
+                           ORDER BY id LIMIT ?
+                       )''',
+                    (*cutoff, batch_size)
+                )
+                upper = (await cursor.fetchone())[0]
+                if upper is None:
+                    return total
+
+                await self._connection.execute(
+                    '''INSERT INTO task_log_daily (day, action, instance_id, count)
+                       SELECT date(timestamp), action, COALESCE(instance_id, ''), COUNT(*)
+                       FROM task_logs WHERE id <= ? AND timestamp < datetime('now', ?)
+                       GROUP BY 1, 2, 3
+                       ON CONFLICT (day, action, instance_id)
+                       DO UPDATE SET count = count + excluded.count''',
+                    (upper, *cutoff)
+                )
+                cursor = await self._connection.execute(
+                    '''DELETE FROM task_logs WHERE id <= ? AND timestamp < datetime('now', ?)''',
+                    (upper, *cutoff)
+                )
+                total += cursor.rowcount
+
+            # Let queued queries through between batches
+            await asyncio.sleep(0)
+
+    async def _delete_in_batches(
+        self,
+        table: str,
+        where: str,
+        params: tuple,
+        batch_size: int = RETENTION_BATCH_SIZE
+    ) -> int:
+        """Delete matching rows `batch_size` at a time, committing between batches."""
+        total = 0
+        while True:
+            async with self.batch():
+                cursor = await self._connection.execute(
+                    f'''DELETE FROM {table} WHERE rowid IN (
+                           SELECT rowid FROM {table} WHERE {where} LIMIT ?
+                       )''',
+                    (*params, batch_size)
+                )
+            total += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                return total
+            await asyncio.sleep(0)
+
+    async def expire_update_history(self, days: int = 180) -> int:
+        """Delete container update records older than X days."""
+        return await self._delete_in_batches(
+            'update_history',
+            "created_at < datetime('now', ?)",
+            (f'-{days} days',)
         )
-        await self._connection.commit()
 
-    async def cleanup_old_downloads(self, hours: int = 24) -> int:
-        """Remove completed downloads older than X hours."""
+    async def expire_downloads(self, completed_hours: int = 24, abandoned_days: int = 7) -> int:
+        """Delete completed downloads older than X hours and downloads that never completed."""
+        return await self._delete_in_batches(
+            'download_tracking',
+            '''(completed_at IS NOT NULL AND completed_at < datetime('now', ?))
+               OR (completed_at IS NULL AND started_at < datetime('now', ?))''',
+            (f'-{completed_hours} hours', f'-{abandoned_days} days')
+        )
+
+    async def incremental_vacuum(self, max_pages: int = 0) -> int:
+        """
+        Return free pages to the filesystem and checkpoint the WAL.
+
+        Args:
+            max_pages: Maximum pages to release (0 releases all free pages)
+
+        Returns:
+            Number of pages released
+        """
+        if self._in_batch():
+            raise RuntimeError("incremental_vacuum() can't run inside batch()")
+
+        # executescript() commits whatever is open, so wait out other transactions
+        async with self._write_lock:
+            before = await self._pragma_value('freelist_count')
+            # The pragma frees one page per step; execute() would only step it once
+            await self._connection.executescript(f'PRAGMA incremental_vacuum({int(max_pages)})')
+            # Checkpoint so the truncation reaches the main file and the WAL is reset
+            await self._connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            return before - await self._pragma_value('freelist_count')
+
+    async def _pragma_value(self, name: str) -> int:
+        cursor = await self._connection.execute(f'PRAGMA {name}')
+        return (await cursor.fetchone())[0]
+
+    async def get_storage_stats(self) -> Dict[str, Any]:
+        """Per-table row counts and database file sizes."""
         cursor = await self._connection.execute(
-            '''DELETE FROM download_tracking
-               WHERE completed_at IS NOT NULL
-               AND completed_at < datetime('now', ? || ' hours')''',
-            (f'-{hours}',)
+            '''SELECT name FROM sqlite_master
+               WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name'''
         )
-        await self._connection.commit()
-        return cursor.rowcount
+        tables = [row['name'] for row in await cursor.fetchall()]
+
+        row_counts = {}
+        for table in tables:
+            cursor = await self._connection.execute(f'SELECT COUNT(*) FROM "{table}"')
+            row_counts[table] = (await cursor.fetchone())[0]
+
+        page_size = await self._pragma_value('page_size')
+        wal_path = f'{self.db_path}-wal'
+        return {
+            'row_counts': row_counts,
+            'file_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            'wal_bytes': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+            'free_bytes': await self._pragma_value('freelist_count') * page_size,
+            'schema_version': await self._pragma_value('user_version'),
+        }
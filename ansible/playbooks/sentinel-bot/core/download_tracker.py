@@ -0,0 +1,184 @@
+"""
+Sentinel Bot Download Tracker
+In-memory download milestone state with write-behind to the database.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .database import Database
+
+logger = logging.getLogger('sentinel.downloads')
+
+# Progress milestones (percent) that trigger a notification
+MILESTONES = (50, 80, 100)
+
+
+def tracking_id(service: str, download_id: Any) -> str:
+    """Namespaced download_tracking ID, so Radarr and Sonarr IDs can't collide."""
+    return f"{service}:{download_id}"
+
+
+def record_key(service: str, record: Dict) -> str:
+    """
+    Tracking ID for a queue record.
+
+    Keyed by the download client's ID, which webhooks carry too, so queue
+    polls and webhook events update the same state. Falls back to the
+    queue ID for records the client hasn't assigned one yet.
+    """
+    return tracking_id(service, record.get('downloadId') or record.get('id'))
+
+
+@dataclass
+class DownloadState:
+    """Tracked state for one queue item."""
+    id: str
+    media_type: str
+    title: str
+    milestones: Set[int] = field(default_factory=set)
+    completed: bool = False
+    dirty: bool = False
+
+
+@dataclass
+class MilestoneEvent:
+    """A milestone newly crossed by a download."""
+    id: str
+    title: str
+    media_type: str
+    milestone: int
+
+
+class DownloadTracker:
+    """
+    Milestone bookkeeping for downloads.
+
+    State is loaded once at startup. Webhooks report grabs and completions
+    as they happen (grabbed()/completed()); the queue sweep's update()
+    computes milestone crossings for a whole queue in memory. flush()
+    writes only the rows that changed, in a single transaction.
+    """
+
+    def __init__(self, db: 'Database'):
+        self.db = db
+        self._state: Dict[str, DownloadState] = {}
+        self.loaded = False
+
+    async def load(self) -> None:
+        """Load tracked downloads from the database."""
+        for row in await self.db.get_download_tracking():
+            self._state[row['id']] = DownloadState(
+                id=row['id'],
+                media_type=row['media_type'],
+                title=row['title'],
+                milestones=set(row['notified_milestones']),
+                completed=row['completed_at'] is not None,
+            )
+        self.loaded = True
+        logger.info(f"Loaded {len(self._state)} tracked downloads")
+
+    def update(self, service: str, media_type: str, records: Iterable[Dict]) -> List[MilestoneEvent]:
+        """
+        Apply new or changed queue records for one service.
+
+        Every milestone a download has passed is recorded, but only the
+        highest new one is reported, so a download that jumps from 40% to
+        100% produces a single "complete" event.
+
+        Returns:
+            Newly crossed milestones
+        """
+        events = []
+
+        for item in records:
+            key = record_key(service, item)
+            state = self._track(key, media_type, item.get('title', 'Unknown'))
+
+            crossed = [m for m in MILESTONES if percent_complete(item) >= m and m not in state.milestones]
+            if not crossed:
+                continue
+
+            state.milestones.update(crossed)
+            state.completed = state.completed or 100 in crossed
+            state.dirty = True
+            events.append(MilestoneEvent(key, state.title, media_type, max(crossed)))
+
+        return events
+
+    def _track(self, key: str, media_type: str, title: str) -> DownloadState:
+        """Existing state for a download, or new (unflushed) state."""
+        state = self._state.get(key)
+        if state is None:
+            state = DownloadState(id=key, media_type=media_type, title=title, dirty=True)
+            self._state[key] = state
+        return state
+
+    def grabbed(self, service: str, media_type: str, download_id: str, title: str) -> None:
+        """Start tracking a download reported by a Grab webhook."""
+        self._track(tracking_id(service, download_id), media_type, title)
+
+    def completed(self, service: str, media_type: str, download_id: str, title: str) -> Optional[MilestoneEvent]:
+        """
+        Mark a download complete from an import (Download) webhook.
+
+        Returns:
+            The completion event, or None if it was already reported
+            (by the queue sweep, or an earlier import of the same download)
+        """
+        key = tracking_id(service, download_id)
+        state = self._track(key, media_type, title)
+        if 100 in state.milestones:
+            return None
+
+        state.milestones.update(MILESTONES)
+        state.completed = True
+        state.dirty = True
+        return MilestoneEvent(key, state.title, media_type, 100)
+
+    async def flush(self) -> int:
+        """Persist changed downloads in one transaction. Returns the number written."""
+        dirty = [state for state in self._state.values() if state.dirty]
+        if not dirty:
+            return 0
+
+        await self.db.save_download_tracking([
+            {
+                'id': state.id,
+                'media_type': state.media_type,
+                'title': state.title,
+                'milestones': sorted(state.milestones),
+                'completed': state.completed,
+            }
+            for state in dirty
+        ])
+        for state in dirty:
+            state.dirty = False
+        return len(dirty)
+
+    def prune(self, live_keys: Iterable[str]) -> None:
+        """
+        Forget downloads that are no longer queued.
+
+        Their rows stay in the database until retention removes them.
+        Unflushed entries are kept until the next flush().
+        """
+        live = set(live_keys)
+        for key in [k for k, state in self._state.items() if k not in live and not state.dirty]:
+            del self._state[key]
+
+    def get(self, key: str) -> Optional[DownloadState]:
+        return self._state.get(key)
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+def percent_complete(item: Dict) -> float:
+    """Download progress of an *arr queue record, in percent."""
+    size = item.get('size', 1)
+    if not size or size <= 0:
+        return 0
+    return ((size - item.get('sizeleft', 0)) / size) * 100
@@ -0,0 +1,98 @@
+"""
+Sentinel Bot Fan-Out Executor
+Runs per-host probes concurrently with per-host and global deadlines.
+"""
+
+import logging
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger('sentinel.fanout')
+
+# Default deadlines (seconds)
+HOST_TIMEOUT = 15
+TOTAL_TIMEOUT = 25
+
+
+@dataclass
+class FanOutResult:
+    """Outcome of a single probe in a fan-out."""
+    key: str
+    value: Any = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True if the probe finished in time without raising."""
+        return not self.timed_out and self.error is None
+
+
+ResultCallback = Callable[[FanOutResult, int, int], Awaitable[None]]
+
+
+async def fan_out(
+    probes: Dict[str, Awaitable[Any]],
+    host_timeout: float = HOST_TIMEOUT,
+    total_timeout: float = TOTAL_TIMEOUT,
+    on_result: Optional[ResultCallback] = None
+) -> Dict[str, FanOutResult]:
+    """
+    Run all probes at once and collect their results.
+
+    Args:
+        probes: Mapping of key (usually host name) to an awaitable probe
+        host_timeout: Deadline for each individual probe in seconds
+        total_timeout: Deadline for the whole fan-out in seconds
+        on_result: Optional async callback(result, done, total) invoked as
+            each probe finishes, used to stream partial progress
+
+    Returns:
+        Mapping of key to FanOutResult, in the same order as `probes`.
+        Probes still running at the global deadline are cancelled and
+        reported as timed out instead of blocking the caller.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def _run(key: str, probe: Awaitable[Any]) -> FanOutResult:
+        try:
+            value = await asyncio.wait_for(probe, timeout=host_timeout)
+            return FanOutResult(key=key, value=value, elapsed=loop.time() - started)
+        except asyncio.TimeoutError:
+            return FanOutResult(key=key, timed_out=True, elapsed=loop.time() - started)
+        except Exception as e:
+            return FanOutResult(key=key, error=str(e), elapsed=loop.time() - started)
+
+    tasks = {asyncio.ensure_future(_run(key, probe)): key for key, probe in probes.items()}
+    results: Dict[str, FanOutResult] = {}
+    pending = set(tasks)
+    deadline = started + total_timeout
+
+    while pending:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+
+        done, pending = await asyncio.wait(
+            pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            result = task.result()
+            results[result.key] = result
+            if on_result:
+                try:
+                    await on_result(result, len(results), len(tasks))
+                except Exception as e:
+                    logger.warning(f"Fan-out progress callback failed: {e}")
+
+    # Stragglers past the global deadline
+    for task in pending:
+        task.cancel()
+        key = tasks[task]
+        results[key] = FanOutResult(key=key, timed_out=True, elapsed=loop.time() - started)
+        logger.warning(f"Fan-out probe timed out: {key}")
+
+    return {key: results[key] for key in probes}
@@ -0,0 +1,248 @@
+"""
+Sentinel Bot Inventory
+Cluster-wide Proxmox inventory from a single /cluster/resources call.
+"""
+
+import logging
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from config import PROXMOX_NODES
+
+if TYPE_CHECKING:
+    from .ssh_manager import SSHManager
+
+logger = logging.getLogger('sentinel.inventory')
+
+# Seconds a snapshot is served before the next lookup refreshes it
+INVENTORY_TTL = 30
+
+# Guest resource types
+GUEST_TYPES = ('qemu', 'lxc')
+
+
+@dataclass
+class Guest:
+    """A VM (qemu) or LXC container."""
+    vmid: int
+    name: str
+    type: str
+    node: str
+    status: str
+    cpu: float = 0.0
+    mem: int = 0
+    maxmem: int = 0
+    uptime: int = 0
+    template: bool = False
+
+    @property
+    def running(self) -> bool:
+        return self.status == 'running'
+
+    @property
+    def node_ip(self) -> Optional[str]:
+        return PROXMOX_NODES.get(self.node)
+
+
+@dataclass
+class ClusterNode:
+    """A Proxmox node."""
+    name: str
+    status: str
+    cpu: float = 0.0
+    mem: int = 0
+    maxmem: int = 0
+    uptime: int = 0
+
+    @property
+    def online(self) -> bool:
+        return self.status == 'online'
+
+    @property
+    def ip(self) -> Optional[str]:
+        return PROXMOX_NODES.get(self.name)
+
+
+@dataclass
+class Inventory:
+    """One /cluster/resources snapshot with lookup indexes."""
+    nodes: Dict[str, ClusterNode] = field(default_factory=dict)
+    guests: Dict[int, Guest] = field(default_factory=dict)
+    by_name: Dict[str, int] = field(default_factory=dict)
+    by_node: Dict[str, List[Guest]] = field(default_factory=dict)
+    fetched_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_resources(cls, resources: List[Dict[str, Any]]) -> 'Inventory':
+        """Build the indexes from pvesh /cluster/resources output."""
+        inventory = cls()
+
+        for res in resources:
+            if res.get('type') == 'node':
+                inventory.nodes[res['node']] = ClusterNode(
+                    name=res['node'],
+                    status=res.get('status', 'unknown'),
+                    cpu=res.get('cpu') or 0.0,
+                    mem=res.get('mem') or 0,
+                    maxmem=res.get('maxmem') or 0,
+                    uptime=res.get('uptime') or 0,
+                )
+
+        for res in resources:
+            if res.get('type') not in GUEST_TYPES:
+                continue
+            guest = Guest(
+                vmid=int(res['vmid']),
+                name=res.get('name') or f"{res['type']}{res['vmid']}",
+                type=res['type'],
+                node=res.get('node', ''),
+                status=res.get('status', 'unknown'),
+                cpu=res.get('cpu') or 0.0,
+                mem=res.get('mem') or 0,
+                maxmem=res.get('maxmem') or 0,
+                uptime=res.get('uptime') or 0,
+                template=bool(res.get('template')),
+            )
+            inventory.guests[guest.vmid] = guest
+            inventory.by_name.setdefault(guest.name.lower(), guest.vmid)
+            inventory.by_node.setdefault(guest.node, []).append(guest)
+
+        for guests in inventory.by_node.values():
+            guests.sort(key=lambda g: g.vmid)
+        return inventory
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def guest(self, vmid: int, guest_type: Optional[str] = None) -> Optional[Guest]:
+        """Look up a guest by ID, optionally requiring a type ('qemu' or 'lxc')."""
+        guest = self.guests.get(vmid)
+        if guest and guest_type and guest.type != guest_type:
+            return None
+        return guest
+
+    def find(self, name: str) -> Optional[Guest]:
+        """Look up a guest by name (case-insensitive)."""
+        vmid = self.by_name.get(name.lower())
+        return self.guests.get(vmid) if vmid is not None else None
+
+    def on_node(self, node: str, guest_type: Optional[str] = None, running: Optional[bool] = None) -> List[Guest]:
+        """Guests on a node, optionally filtered by type and running state (templates excluded)."""
+        return [
+            g for g in self.by_node.get(node, [])
+            if not g.template
+            and (guest_type is None or g.type == guest_type)
+            and (running is None or g.running == running)
+        ]
+
+
+class InventoryService:
+    """
+    Cached cluster inventory.
+
+    Any online node answers /cluster/resources for the whole cluster, so
+    one SSH exec replaces per-node list calls and per-node guest probing.
+    Snapshots are reused for INVENTORY_TTL seconds; power actions call
+    invalidate() so the next lookup sees their effect. Concurrent
+    refreshes share one fetch.
+    """
+
+    def __init__(self, ssh: 'SSHManager', ttl: float = INVENTORY_TTL):
+        self.ssh = ssh
+        self.ttl = ttl
+        self._inventory: Optional[Inventory] = None
+        self._lock = asyncio.Lock()
+        self._preferred_node: Optional[str] = None
+
+        # invalidate() bumps the generation; the inventory is stale unless it
+        # was fetched from a start at the current generation
+        self._generation = 0
+        self._fetched_generation = 0
+
+        # Metrics
+        self.refreshes = 0
+        self.failures = 0
+
+    async def get(self, refresh: bool = False) -> Optional[Inventory]:
+        """
+        Return the inventory, refreshing it if stale or requested.
+
+        Returns:
+            The inventory, or the last one if no node answered (None if
+            there has never been one)
+        """
+        inventory = self._inventory
+        if inventory and not refresh and self._is_current() and inventory.age < self.ttl:
+            return inventory
+
+        requested_at = time.monotonic()
+        async with self._lock:
+            # Another caller refreshed while we waited (and nothing was invalidated since)
+            if self._inventory and self._inventory.fetched_at >= requested_at and self._is_current():
+                return self._inventory
+
+            # An invalidate() during the fetch leaves the result stale
+            generation = self._generation
+            fresh = await self._fetch()
+            if fresh:
+                self._inventory = fresh
+                self._fetched_generation = generation
+            return self._inventory
+
+    def invalidate(self) -> None:
+        """Force the next lookup to refresh (after start/stop/shutdown actions)."""
+        self._generation += 1
+
+    def _is_current(self) -> bool:
+        return self._fetched_generation == self._generation
+
+    async def _fetch(self) -> Optional[Inventory]:
+        """Fetch /cluster/resources from the first node that answers."""
+        nodes = sorted(PROXMOX_NODES.items(), key=lambda item: item[0] != self._preferred_node)
+        # One concurrent TCP probe rather than an SSH connect timeout per down node
+        online = await self.ssh.pve_nodes_online()
+
+        for node_name, node_ip in nodes:
+            if not online.get(node_name):
+                continue
+            result = await self.ssh.pve_cluster_resources(node_ip)
+            if not result.success:
+                continue
+            try:
+                inventory = Inventory.from_resources(json.loads(result.stdout))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Could not parse cluster resources from {node_name}: {e}")
+                continue
+
+            self._preferred_node = node_name
+            self.refreshes += 1
+            return inventory
+
+        self.failures += 1
+        logger.error("Cluster inventory unavailable: no Proxmox node answered")
+        return None
+
+    async def guest(self, vmid: int, guest_type: Optional[str] = None) -> Optional[Guest]:
+        """
+        Look up a guest, refreshing once on a miss in case it was just created.
+        """
+        inventory = await self.get()
+        guest = inventory.guest(vmid, guest_type) if inventory else None
+        if guest is None:
+            inventory = await self.get(refresh=True)
+            guest = inventory.guest(vmid, guest_type) if inventory else None
+        return guest
+
+    def stats(self) -> Dict[str, Any]:
+        inventory = self._inventory
+        return {
+            'guests': len(inventory.guests) if inventory else 0,
+            'nodes': len(inventory.nodes) if inventory else 0,
+            'age': round(inventory.age, 1) if inventory else None,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+        }
@@ -0,0 +1,265 @@
+"""
+Sentinel Bot Library Index
+Keeps the local media library index in step with Radarr and Sonarr.
+"""
+
+import logging
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .arr_queue import QueueDelta
+    from .bot import SentinelBot
+
+logger = logging.getLogger('sentinel.library')
+
+# Library endpoint per service
+LIBRARY_ENDPOINTS = {'radarr': '/api/v3/movie', 'sonarr': '/api/v3/series'}
+
+# Field linking history and queue records to a library item
+ITEM_ID_FIELDS = {'radarr': 'movieId', 'sonarr': 'seriesId'}
+
+# Full listings reconcile anything incremental sync can't see (e.g. deletions)
+FULL_SYNC_INTERVAL = timedelta(hours=24)
+
+# Concurrent single-item fetches during an incremental refresh
+REFRESH_CONCURRENCY = 4
+
+
+def normalize_movie(movie: Dict[str, Any]) -> Dict[str, Any]:
+    """Library index row for a Radarr movie (added = file import date when it has one)."""
+    movie_file = movie.get('movieFile') or {}
+    return {
+        'service': 'radarr',
+        'item_id': movie['id'],
+        'title': movie.get('title') or 'Unknown',
+        'sort_title': (movie.get('sortTitle') or movie.get('title') or '').lower(),
+        'year': movie.get('year') or None,
+        'quality': movie_file.get('quality', {}).get('quality', {}).get('name'),
+        'added': movie_file.get('dateAdded') or movie.get('added'),
+        'has_file': int(bool(movie.get('hasFile'))),
+        'monitored': int(bool(movie.get('monitored'))),
+        'status': movie.get('status'),
+        'episode_file_count': 0,
+        'episode_count': 0,
+        'season_count': 0,
+        'size_on_disk': movie.get('sizeOnDisk') or 0,
+        'external_id': movie.get('tmdbId'),
+    }
+
+
+def normalize_series(series: Dict[str, Any]) -> Dict[str, Any]:
+    """Library index row for a Sonarr series."""
+    stats = series.get('statistics') or {}
+    return {
+        'service': 'sonarr',
+        'item_id': series['id'],
+        'title': series.get('title') or 'Unknown',
+        'sort_title': (series.get('sortTitle') or series.get('title') or '').lower(),
+        'year': series.get('year') or None,
+        'quality': None,
+        'added': series.get('added'),
+        'has_file': int(stats.get('episodeFileCount', 0) > 0),
+        'monitored': int(bool(series.get('monitored'))),
+        'status': series.get('status'),
+        'episode_file_count': stats.get('episodeFileCount', 0),
+        'episode_count': stats.get('totalEpisodeCount', 0),
+        'season_count': stats.get('seasonCount', series.get('seasonCount', 0)),
+        'size_on_disk': stats.get('sizeOnDisk', 0),
+        'external_id': series.get('tvdbId'),
+    }
+
+
+NORMALIZERS = {'radarr': normalize_movie, 'sonarr': normalize_series}
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class LibraryIndex:
+    """
+    Incremental sync for the library_items table.
+
+    One full listing per service seeds the index (and reconciles it daily);
+    after that only items touched by *arr history, by downloads leaving the
+    queue, or by a Jellyseerr MEDIA_AVAILABLE webhook are re-fetched, one
+    small request each.
+    """
+
+    def __init__(self, bot: 'SentinelBot'):
+        self.bot = bot
+        self.ready = False
+        self._lock = asyncio.Lock()
+
+        # Metrics
+        self.full_syncs = 0
+        self.items_refreshed = 0
+        self.last_sync: Optional[str] = None
+
+    @property
+    def db(self):
+        return self.bot.db
+
+    def _url(self, service: str, endpoint: str) -> str:
+        return f"{getattr(self.bot.config.api, f'{service}_url')}{endpoint}"
+
+    async def load(self) -> None:
+        """Mark the index ready if every service has completed a full sync before."""
+        states = [await self.db.get_library_sync(service) for service in LIBRARY_ENDPOINTS]
+        self.ready = all(state and state['full_sync_at'] for state in states)
+
+    async def sync(self) -> None:
+        """Run a full sync where one is due, otherwise an incremental one."""
+        async with self._lock:
+            for service in LIBRARY_ENDPOINTS:
+                state = await self.db.get_library_sync(service)
+                try:
+                    if self._full_sync_due(state):
+                        await self._full_sync(service)
+                    else:
+                        await self._sync_history(service, state['history_cursor'])
+                except Exception as e:
+                    logger.error(f"{service} library sync failed: {e}")
+
+            await self.load()
+            self.last_sync = _utc_now()
+
+    @staticmethod
+    def _full_sync_due(state: Optional[Dict[str, Any]]) -> bool:
+        if not state or not state['full_sync_at'] or not state['history_cursor']:
+            return True
+        last = datetime.strptime(state['full_sync_at'], '%Y-%m-%d %H:%M:%S')
+        return datetime.utcnow() - last >= FULL_SYNC_INTERVAL
+
+    async def _full_sync(self, service: str) -> None:
+        """Replace a service's index with its full library listing."""
+        started = _utc_now()
+        items = await self.bot.api_get(self._url(service, LIBRARY_ENDPOINTS[service]), service)
+        if items is None:
+            logger.warning(f"{service} library listing unavailable, full sync skipped")
+            return
+
+        rows = [NORMALIZERS[service](item) for item in items]
+        written, removed = await self.db.replace_library(service, rows)
+        # History from before the listing is already reflected in it
+        await self.db.set_library_sync(service, history_cursor=started)
+        self.full_syncs += 1
+        self._invalidate(service)
+        logger.info(f"{service} library full sync: {written} items, {removed} removed")
+
+    async def _sync_history(self, service: str, cursor: str) -> None:
+        """Re-fetch items with history events since the cursor, then advance it."""
+        records = await self.bot.api_get(
+            self._url(service, '/api/v3/history/since'), service, params={'date': cursor}
+        )
+        if records is None:
+            return
+
+        # history/since includes records at the cursor itself, which the last sync already applied
+        since = datetime.fromisoformat(cursor)
+        records = [r for r in records if r.get('date') and datetime.fromisoformat(r['date']) > since]
+        if not records:
+            return
+
+        item_ids = {r[ITEM_ID_FIELDS[service]] for r in records if r.get(ITEM_ID_FIELDS[service])}
+        if item_ids:
+            await self.refresh(service, item_ids)
+
+        latest = max(records, key=lambda r: datetime.fromisoformat(r['date']))
+        await self.db.set_library_sync(service, history_cursor=latest['date'])
+
+    async def _fetch_item(self, service: str, item_id: int) -> Tuple[int, Optional[Dict[str, Any]], bool]:
+        """Fetch one library item. Returns (item_id, item, gone); gone means a 404."""
+        client = self.bot.services.get(service)
+        if not client:
+            return item_id, None, False
+        try:
+            async with client.request('GET', f"{LIBRARY_ENDPOINTS[service]}/{item_id}") as resp:
+                if resp.status == 404:
+                    return item_id, None, True
+                if resp.status == 200:
+                    return item_id, await resp.json(), False
+                logger.warning(f"{service} item {item_id} fetch failed: {resp.status}")
+        except Exception as e:
+            logger.warning(f"{service} item {item_id} fetch error: {e}")
+        return item_id, None, False
+
+    async def refresh(self, service: str, item_ids: Iterable[int]) -> int:
+        """
+        Re-fetch specific items and update the index.
+
+        Items that no longer exist upstream are removed.
+
+        Returns:
+            Number of items updated or removed
+        """
+        semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+
+        async def fetch(item_id: int):
+            async with semaphore:
+                return await self._fetch_item(service, item_id)
+
+        results = await asyncio.gather(*(fetch(item_id) for item_id in set(item_ids)))
+        rows = [NORMALIZERS[service](item) for _, item, _ in results if item]
+        gone = [item_id for item_id, _, is_gone in results if is_gone]
+
+        async with self.db.batch():
+            await self.db.upsert_library_items(rows)
+            await self.db.delete_library_items(service, gone)
+
+        changed = len(rows) + len(gone)
+        if changed:
+            self.items_refreshed += changed
+            self._invalidate(service)
+            logger.debug(f"{service} library refresh: {len(rows)} updated, {len(gone)} removed")
+        return changed
+
+    async def refresh_from_queue(self, deltas: Dict[str, 'QueueDelta']) -> None:
+        """Queue subscriber: re-index items whose download just left the queue (imported or failed)."""
+        for service, delta in deltas.items():
+            field = ITEM_ID_FIELDS.get(service)
+            item_ids = {r[field] for r in delta.removed if field and r.get(field)}
+            if item_ids:
+                await self.refresh(service, item_ids)
+
+    async def on_media_available(self, media_type: str, tmdb_id: Optional[int], tvdb_id: Optional[int]) -> int:
+        """
+        Re-index a title Jellyseerr reports as available.
+
+        Args:
+            media_type: Jellyseerr media type ('movie' or 'tv')
+            tmdb_id: TMDB ID (movies)
+            tvdb_id: TVDB ID (series)
+
+        Returns:
+            Number of items updated
+        """
+        if media_type == 'movie' and tmdb_id:
+            service, params = 'radarr', {'tmdbId': tmdb_id}
+        elif media_type == 'tv' and tvdb_id:
+            service, params = 'sonarr', {'tvdbId': tvdb_id}
+        else:
+            return 0
+
+        items = await self.bot.api_get(self._url(service, LIBRARY_ENDPOINTS[service]), service, params=params)
+        rows = [NORMALIZERS[service](item) for item in items or []]
+        await self.db.upsert_library_items(rows)
+        if rows:
+            self.items_refreshed += len(rows)
+            self._invalidate(service)
+        return len(rows)
+
+    def _invalidate(self, service: str) -> None:
+        """Drop cached API listings the index just superseded."""
+        if self.bot.response_cache:
+            self.bot.response_cache.invalidate(service)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'full_syncs': self.full_syncs,
+            'items_refreshed': self.items_refreshed,
+            'last_sync': self.last_sync,
+        }
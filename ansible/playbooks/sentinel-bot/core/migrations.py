@@ -0,0 +1,340 @@
+"""
+Sentinel Bot Schema Migrations
+Ordered, versioned schema changes keyed on SQLite's PRAGMA user_version.
+"""
+
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List
+
+import aiosqlite
+
+logger = logging.getLogger('sentinel.migrations')
+
+
+@dataclass
+class Migration:
+    """A single schema step; `version` is the user_version after it runs."""
+    version: int
+    description: str
+    apply: Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+@dataclass
+class MigrationReport:
+    """Outcome of a migration run."""
+    from_version: int
+    to_version: int
+    dry_run: bool = False
+    applied: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register a migration step. Versions must be added in increasing order."""
+    def decorator(func):
+        if MIGRATIONS and version != MIGRATIONS[-1].version + 1:
+            raise ValueError(f"Migration {version} registered out of order")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return decorator
+
+
+async def _execute_script(connection: aiosqlite.Connection, script: str) -> None:
+    """
+    Run a multi-statement script one statement at a time.
+
+    executescript() commits first, which would break the per-migration
+    transaction (and dry runs).
+    """
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            await connection.execute(statement)
+            statement = ''
+
+
+async def _columns(connection: aiosqlite.Connection, table: str) -> set:
+    cursor = await connection.execute(f'PRAGMA table_info({table})')
+    return {row[1] for row in await cursor.fetchall()}
+
+
+# ==================== Migrations ====================
+# Never edit a released migration; add a new one. Steps must be safe on
+# databases that predate versioning (user_version 0 with tables present).
+
+BASELINE_SCHEMA = '''
+    -- Claude Tasks (from Athena)
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        priority TEXT DEFAULT 'medium',
+        instance_id TEXT,
+        instance_name TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        claimed_at TIMESTAMP,
+        completed_at TIMESTAMP,
+        notes TEXT,
+        submitted_by TEXT
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+    CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+
+    -- Task Audit Log
+    CREATE TABLE IF NOT EXISTS task_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER REFERENCES tasks(id),
+        action TEXT NOT NULL,
+        details TEXT,
+        instance_id TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Claude Instance Registry
+    CREATE TABLE IF NOT EXISTS instances (
+        id TEXT PRIMARY KEY,
+        name TEXT,
+        last_seen TIMESTAMP,
+        current_task_id INTEGER,
+        status TEXT DEFAULT 'idle'
+    );
+
+    -- Container Update History
+    CREATE TABLE IF NOT EXISTS update_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        container_name TEXT NOT NULL,
+        host_ip TEXT NOT NULL,
+        old_image TEXT,
+        new_image TEXT,
+        update_status TEXT,
+        updated_by TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_updates_container ON update_history(container_name);
+    CREATE INDEX IF NOT EXISTS idx_updates_status ON update_history(update_status);
+
+    -- Download Tracking
+    CREATE TABLE IF NOT EXISTS download_tracking (
+        id TEXT PRIMARY KEY,
+        media_type TEXT NOT NULL,
+        title TEXT NOT NULL,
+        poster_url TEXT,
+        size_bytes INTEGER,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        notified_milestones TEXT DEFAULT '[]',
+        completed_at TIMESTAMP
+    );
+
+    -- Service Onboarding Status Cache
+    CREATE TABLE IF NOT EXISTS onboarding_cache (
+        service_name TEXT PRIMARY KEY,
+        terraform_ok INTEGER DEFAULT 0,
+        ansible_ok INTEGER DEFAULT 0,
+        dns_ok INTEGER DEFAULT 0,
+        traefik_ok INTEGER DEFAULT 0,
+        ssl_ok INTEGER DEFAULT 0,
+        authentik_ok INTEGER,
+        docs_ok INTEGER DEFAULT 0,
+        last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+'''
+
+
+@migration(1, 'baseline schema')
+async def _baseline(connection: aiosqlite.Connection) -> None:
+    await _execute_script(connection, BASELINE_SCHEMA)
+
+
+@migration(2, 'task tags')
+async def _task_tags(connection: aiosqlite.Connection) -> None:
+    if 'tag' not in await _columns(connection, 'tasks'):
+        await connection.execute('ALTER TABLE tasks ADD COLUMN tag TEXT')
+
+
+@migration(3, 'pending queue priority rank index')
+async def _priority_rank(connection: aiosqlite.Connection) -> None:
+    if 'priority_rank' not in await _columns(connection, 'tasks'):
+        await connection.execute('ALTER TABLE tasks ADD COLUMN priority_rank INTEGER DEFAULT 2')
+    await connection.execute(
+        '''UPDATE tasks SET priority_rank =
+           CASE priority WHEN 'high' THEN 1 WHEN 'low' THEN 3 ELSE 2 END'''
+    )
+    await connection.execute(
+        """CREATE INDEX IF NOT EXISTS idx_tasks_pending
+           ON tasks(priority_rank, created_at, id) WHERE status = 'pending'"""
+    )
+
+
+@migration(4, 'query planner statistics')
+async def _analyze(connection: aiosqlite.Connection) -> None:
+    await connection.execute('ANALYZE')
+
+
+@migration(5, 'retention rollups and indexes')
+async def _retention(connection: aiosqlite.Connection) -> None:
+    await _execute_script(connection, '''
+        -- Daily task_logs aggregates kept after raw rows expire
+        CREATE TABLE IF NOT EXISTS task_log_daily (
+            day TEXT NOT NULL,
+            action TEXT NOT NULL,
+            instance_id TEXT NOT NULL DEFAULT '',
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, action, instance_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_task_logs_timestamp ON task_logs(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_updates_created ON update_history(created_at);
+        CREATE INDEX IF NOT EXISTS idx_downloads_started ON download_tracking(started_at);
+    ''')
+
+
+@migration(6, 'namespaced download tracking IDs')
+async def _download_namespaces(connection: aiosqlite.Connection) -> None:
+    # Radarr and Sonarr queue IDs were stored bare and could collide
+    await connection.execute(
+        """UPDATE OR IGNORE download_tracking
+           SET id = CASE media_type WHEN 'movie' THEN 'radarr:' ELSE 'sonarr:' END || id
+           WHERE id NOT LIKE '%:%'"""
+    )
+    await connection.execute("DELETE FROM download_tracking WHERE id NOT LIKE '%:%'")
+
+
+@migration(7, 'media library index')
+async def _library_index(connection: aiosqlite.Connection) -> None:
+    await _execute_script(connection, '''
+        -- Local copy of the Radarr/Sonarr libraries (one row per movie or series).
+        -- The explicit id keeps rowids stable across VACUUM for the FTS index.
+        CREATE TABLE IF NOT EXISTS library_items (
+            id INTEGER PRIMARY KEY,
+            service TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            sort_title TEXT NOT NULL,
+            year INTEGER,
+            quality TEXT,
+            added TEXT,
+            has_file INTEGER NOT NULL DEFAULT 0,
+            monitored INTEGER NOT NULL DEFAULT 0,
+            status TEXT,
+            episode_file_count INTEGER NOT NULL DEFAULT 0,
+            episode_count INTEGER NOT NULL DEFAULT 0,
+            season_count INTEGER NOT NULL DEFAULT 0,
+            size_on_disk INTEGER NOT NULL DEFAULT 0,
+            external_id INTEGER,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (service, item_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_library_title ON library_items(service, has_file, sort_title);
+        CREATE INDEX IF NOT EXISTS idx_library_year ON library_items(service, has_file, year);
+        CREATE INDEX IF NOT EXISTS idx_library_quality ON library_items(service, has_file, quality);
+        CREATE INDEX IF NOT EXISTS idx_library_added ON library_items(service, has_file, added);
+        CREATE INDEX IF NOT EXISTS idx_library_external ON library_items(service, external_id);
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS library_fts USING fts5(
+            title, content='library_items', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS library_items_ai AFTER INSERT ON library_items BEGIN
+            INSERT INTO library_fts(rowid, title) VALUES (new.id, new.title);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS library_items_ad AFTER DELETE ON library_items BEGIN
+            INSERT INTO library_fts(library_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS library_items_au AFTER UPDATE OF title ON library_items BEGIN
+            INSERT INTO library_fts(library_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO library_fts(rowid, title) VALUES (new.id, new.title);
+        END;
+
+        -- Incremental sync position per service
+        CREATE TABLE IF NOT EXISTS library_sync (
+            service TEXT PRIMARY KEY,
+            history_cursor TEXT,
+            full_sync_at TIMESTAMP
+        );
+    ''')
+
+
+# ==================== Runner ====================
+
+async def get_schema_version(connection: aiosqlite.Connection) -> int:
+    """Current schema version (PRAGMA user_version)."""
+    cursor = await connection.execute('PRAGMA user_version')
+    row = await cursor.fetchone()
+    return row[0]
+
+
+async def migrate(connection: aiosqlite.Connection, dry_run: bool = False) -> MigrationReport:
+    """
+    Bring the schema up to the latest version.
+
+    Each migration runs in its own transaction together with the
+    user_version bump, so a failed step leaves the database at the previous
+    version. A dry run applies every pending step in one transaction and
+    rolls it back, which validates and times the migrations without
+    changing the database.
+
+    Args:
+        connection: Open database connection (no transaction in progress)
+        dry_run: Roll back instead of committing
+
+    Returns:
+        MigrationReport with the versions before and after and the steps run
+    """
+    current = await get_schema_version(connection)
+    pending = [m for m in MIGRATIONS if m.version > current]
+    report = MigrationReport(from_version=current, to_version=current, dry_run=dry_run)
+    started = time.perf_counter()
+
+    if pending and dry_run:
+        await connection.execute('BEGIN')
+
+    try:
+        for step in pending:
+            step_started = time.perf_counter()
+            if not dry_run:
+                await connection.execute('BEGIN')
+            try:
+                await step.apply(connection)
+                await connection.execute(f'PRAGMA user_version = {step.version}')
+                if not dry_run:
+                    await connection.commit()
+            except Exception:
+                if not dry_run:
+                    await connection.rollback()
+                logger.error(f"Migration {step.version} ({step.description}) failed")
+                raise
+
+            step_ms = (time.perf_counter() - step_started) * 1000
+            report.applied.append(step.description)
+            report.to_version = step.version
+            logger.info(
+                f"{'Dry-run' if dry_run else 'Applied'} migration {step.version} "
+                f"({step.description}) in {step_ms:.1f}ms"
+            )
+    finally:
+        if pending and dry_run:
+            await connection.rollback()
+
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    if pending:
+        logger.info(
+            f"Schema {'would move' if dry_run else 'migrated'} from version "
+            f"{report.from_version} to {report.to_version} in {report.elapsed_ms:.1f}ms"
+        )
+    else:
+        logger.info(f"Schema up to date at version {current}")
+
+    return report
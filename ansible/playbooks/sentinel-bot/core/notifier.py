@@ -0,0 +1,89 @@
+"""
+Sentinel Bot Task Notifier
+In-process wake-up signal for workers waiting on the task queue.
+"""
+
+import logging
+import asyncio
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set
+
+logger = logging.getLogger('sentinel.notifier')
+
+# Per-subscriber backlog before new task IDs are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class TaskNotifier:
+    """
+    Wakes long-poll waiters and stream subscribers when tasks become pending.
+
+    Long-poll handlers snapshot `version`, check the queue, then call
+    wait(version) so a task created in between is never missed. Stream
+    handlers subscribe() to receive the IDs of tasks as they become pending.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._event: Optional[asyncio.Event] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._waiters = 0
+
+    def notify(self, task_id: int) -> None:
+        """Signal that a task became pending."""
+        self.version += 1
+
+        if self._event:
+            self._event.set()
+            self._event = None
+
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(task_id)
+            except asyncio.QueueFull:
+                logger.warning(f"Task stream subscriber backlog full, dropped task #{task_id}")
+
+    async def wait(self, since: int, timeout: float) -> bool:
+        """
+        Wait until the notifier moves past `since`.
+
+        Args:
+            since: The `version` observed before checking the queue
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if a task was signalled, False on timeout
+        """
+        if self.version != since:
+            return True
+
+        if self._event is None:
+            self._event = asyncio.Event()
+        event = self._event
+
+        self._waiters += 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters -= 1
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        """Receive the ID of every task signalled while the context is open."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> dict:
+        """Current waiter and subscriber counts."""
+        return {
+            'version': self.version,
+            'waiters': self._waiters,
+            'subscribers': len(self._subscribers),
+        }
@@ -0,0 +1,227 @@
+"""
+Sentinel Bot Outbound Queue
+Per-channel message queue with coalescing and rate limiting.
+"""
+
+import logging
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger('sentinel.outbound')
+
+# Notifications with the same coalesce key arriving within this window become one message
+COALESCE_WINDOW = 2.0
+
+# Discord allows 5 messages per 5 seconds per channel
+CHANNEL_RATE_LIMIT = 5
+CHANNEL_RATE_PERIOD = 5.0
+
+# Oldest messages are dropped beyond this backlog
+MAX_QUEUE_DEPTH = 500
+
+# Retries for a send that hits a 429 despite the limiter
+MAX_SEND_ATTEMPTS = 3
+
+
+@dataclass
+class OutboundMessage:
+    """A queued message (channel.send kwargs) and its coalescing metadata."""
+    kwargs: Dict[str, Any]
+    coalesce_key: Optional[str] = None
+    summary: Optional[str] = None
+    future: Optional[asyncio.Future] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class RateLimited(Exception):
+    """Raised by a deliver callback when Discord answers 429."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited for {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Sliding-window limiter for one Discord rate-limit bucket."""
+
+    def __init__(self, limit: int = CHANNEL_RATE_LIMIT, period: float = CHANNEL_RATE_PERIOD):
+        self.limit = limit
+        self.period = period
+        self._sent: Deque[float] = deque()
+        self._blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until another message may be sent."""
+        while True:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] >= self.period:
+                self._sent.popleft()
+
+            wait = self._blocked_until - now
+            if len(self._sent) >= self.limit:
+                wait = max(wait, self._sent[0] + self.period - now)
+            if wait <= 0:
+                self._sent.append(now)
+                return
+            await asyncio.sleep(wait)
+
+    def block(self, retry_after: float) -> None:
+        """Hold off all sends for `retry_after` seconds (after a 429)."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+
+Deliver = Callable[[List[OutboundMessage]], Awaitable[Any]]
+
+
+class OutboundQueue:
+    """
+    Queue and background sender for a single channel.
+
+    Messages go out in order. A message with a coalesce key waits up to
+    COALESCE_WINDOW for others with the same key, and `deliver` is handed
+    the whole group to render as one message.
+    """
+
+    def __init__(self, name: str, deliver: Deliver, window: float = COALESCE_WINDOW):
+        self.name = name
+        self._deliver = deliver
+        self._window = window
+        self._items: Deque[OutboundMessage] = deque()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._limiter = RateLimiter()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.enqueued = 0
+        self.delivered = 0
+        self.messages_sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._latency_last = 0.0
+
+    def put(self, message: OutboundMessage) -> None:
+        """Queue a message without waiting for it to be sent."""
+        if len(self._items) >= MAX_QUEUE_DEPTH:
+            dropped = self._items.popleft()
+            self.dropped += 1
+            if dropped.future and not dropped.future.done():
+                dropped.future.set_result(None)
+            logger.warning(f"Outbound queue for #{self.name} full, dropped oldest message")
+
+        self._items.append(message)
+        self.enqueued += 1
+        self._idle.clear()
+        self._wakeup.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f'outbound-{self.name}')
+
+    async def _run(self) -> None:
+        while True:
+            if not self._items:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            head = self._items[0]
+            if head.coalesce_key:
+                # Hold the head until its window closes so a burst can join it
+                remaining = head.enqueued_at + self._window - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+
+            batch = self._take_batch()
+            await self._limiter.acquire()
+            await self._send(batch)
+
+    def _take_batch(self) -> List[OutboundMessage]:
+        """Pop the head plus every queued message sharing its coalesce key."""
+        head = self._items.popleft()
+        if not head.coalesce_key:
+            return [head]
+
+        batch = [head]
+        remaining: Deque[OutboundMessage] = deque()
+        for item in self._items:
+            if item.coalesce_key == head.coalesce_key:
+                batch.append(item)
+            else:
+                remaining.append(item)
+        self._items = remaining
+        return batch
+
+    async def _send(self, batch: List[OutboundMessage]) -> None:
+        result = None
+        for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+            try:
+                result = await self._deliver(batch)
+                break
+            except RateLimited as e:
+                logger.warning(f"Rate limited on #{self.name}, retrying in {e.retry_after:.1f}s")
+                self._limiter.block(e.retry_after)
+                if attempt < MAX_SEND_ATTEMPTS:
+                    await self._limiter.acquire()
+            except Exception as e:
+                logger.error(f"Outbound send to #{self.name} failed: {e}")
+                break
+
+        now = time.monotonic()
+        if result is None:
+            self.failed += len(batch)
+        else:
+            self.messages_sent += 1
+            self.delivered += len(batch)
+
+        for item in batch:
+            latency = now - item.enqueued_at
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+            self._latency_last = latency
+            if item.future and not item.future.done():
+                item.future.set_result(result)
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait for the queue to empty. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self) -> None:
+        """Stop the sender, resolving anything still queued as unsent."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for item in self._items:
+            if item.future and not item.future.done():
+                item.future.set_result(None)
+        self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, coalescing and latency metrics."""
+        completed = self.delivered + self.failed
+        return {
+            'depth': len(self._items),
+            'enqueued': self.enqueued,
+            'messages_sent': self.messages_sent,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'coalescing_ratio': round(self.delivered / self.messages_sent, 2) if self.messages_sent else None,
+            'send_latency_ms': {
+                'last': round(self._latency_last * 1000, 1),
+                'avg': round(self._latency_total / completed * 1000, 1) if completed else 0.0,
+                'max': round(self._latency_max * 1000, 1),
+            },
+        }
@@ -0,0 +1,614 @@
+"""
+Sentinel Bot Power Plans
+Cluster power sequences as dependency graphs, run by a parallel executor.
+"""
+
+import logging
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import (
+    PROXMOX_NODES, WOL_MAC_ADDRESSES, WOL_BROADCAST,
+    NODE_SHUTDOWN_ORDER, NODE_STARTUP_ORDER,
+    LXC_STARTUP_ORDER, CRITICAL_LXCS
+)
+from .bulk_power import SHUTDOWN_TIMEOUT, GuestPowerResult
+from .inventory import Inventory
+from .ssh_manager import SSHResult
+
+logger = logging.getLogger('sentinel.power')
+
+# Guest steps run in parallel per node, up to this many at once
+GUEST_CONCURRENCY = 4
+
+# Seconds to wait for a guest to reach its target state after the command
+GUEST_READY_TIMEOUT = 180
+
+# Seconds to wait for a woken node to come online
+NODE_BOOT_TIMEOUT = 300
+
+# Guest status polling backoff (seconds)
+POLL_INITIAL = 1
+POLL_MAX = 5
+
+# Guest stops becoming ready on a node within this window go out as one bulk exec
+BATCH_WINDOW = 0.2
+
+# Step kinds -> Proxmox guest types
+GUEST_KINDS = {'vm': 'qemu', 'lxc': 'lxc'}
+
+# Guest status each action waits for
+TARGET_STATUS = {'start': 'running', 'stop': 'stopped'}
+
+
+@dataclass
+class PowerStep:
+    """One action in a power plan."""
+    key: str  # 'vm:101', 'lxc:202' or 'node:node01'
+    kind: str  # 'vm', 'lxc' or 'node'
+    action: str  # 'start', 'stop' or 'shutdown'
+    name: str
+    node: str
+    node_ip: str
+    vmid: Optional[int] = None
+
+    # Steps that must finish first; a failed `requires` step blocks this one
+    after: Set[str] = field(default_factory=set)
+    requires: Set[str] = field(default_factory=set)
+
+    # Outcome
+    status: str = 'pending'  # pending, running, done, failed, blocked
+    changed: bool = False  # False if the target was already in the wanted state
+    error: str = ''
+    started_at: float = 0.0
+    duration: float = 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.vmid})" if self.vmid is not None else self.name
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'done'
+
+
+@dataclass
+class PowerPlan:
+    """A set of power steps and the ordering between them."""
+    operation: str  # 'shutdown' or 'startup'
+    steps: Dict[str, PowerStep] = field(default_factory=dict)
+
+    def add(self, step: PowerStep) -> PowerStep:
+        self.steps[step.key] = step
+        return step
+
+    def keys(self, kind: str, node: Optional[str] = None) -> Set[str]:
+        """Keys of the steps of one kind, optionally on one node."""
+        return {
+            key for key, step in self.steps.items()
+            if step.kind == kind and (node is None or step.node == node)
+        }
+
+    def validate(self) -> None:
+        """
+        Check that every dependency exists and the graph has no cycles.
+
+        Raises:
+            ValueError: If the plan can't be executed
+        """
+        for step in self.steps.values():
+            missing = (step.after | step.requires) - self.steps.keys()
+            if missing:
+                raise ValueError(f"{step.key} depends on unknown steps: {', '.join(sorted(missing))}")
+
+        # Kahn's algorithm: anything left unvisited is on a cycle
+        waiting = {key: len(step.after | step.requires) for key, step in self.steps.items()}
+        dependents: Dict[str, List[str]] = {}
+        for step in self.steps.values():
+            for dep in step.after | step.requires:
+                dependents.setdefault(dep, []).append(step.key)
+
+        ready = [key for key, count in waiting.items() if count == 0]
+        visited = 0
+        while ready:
+            key = ready.pop()
+            visited += 1
+            for dependent in dependents.get(key, []):
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+
+        if visited != len(self.steps):
+            cycle = sorted(key for key, count in waiting.items() if count > 0)
+            raise ValueError(f"Power plan has a dependency cycle through: {', '.join(cycle)}")
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+
+# ==================== Plan Builders ====================
+
+def _node_names() -> Dict[str, str]:
+    """Node IP -> node name."""
+    return {ip: name for name, ip in PROXMOX_NODES.items()}
+
+
+def build_shutdown_plan(
+    inventory: Optional[Inventory],
+    keep_ctids: Iterable[int] = (),
+    keep_nodes: Iterable[str] = ()
+) -> PowerPlan:
+    """
+    Shutdown plan from the running guests in an inventory.
+
+    VMs stop first, all in parallel. LXCs stop once every VM has (VMs may
+    depend on them, e.g. for DNS), with CRITICAL_LXCS last. Each node
+    shuts down after its own guests, in NODE_SHUTDOWN_ORDER.
+
+    Args:
+        inventory: Cluster inventory (None if no node answered)
+        keep_ctids: LXCs to leave running
+        keep_nodes: Nodes to leave running (their guests are still stopped)
+    """
+    plan = PowerPlan(operation='shutdown')
+    keep_ctids = set(keep_ctids)
+    keep_nodes = set(keep_nodes)
+    critical = {ctid for _, ctid in CRITICAL_LXCS.values()}
+
+    nodes = [name for name in NODE_SHUTDOWN_ORDER if name in PROXMOX_NODES]
+    if inventory:
+        for node in nodes:
+            for vm in inventory.on_node(node, 'qemu', running=True):
+                plan.add(PowerStep(
+                    key=f"vm:{vm.vmid}", kind='vm', action='stop', name=vm.name,
+                    node=node, node_ip=PROXMOX_NODES[node], vmid=vm.vmid,
+                ))
+
+        vm_keys = plan.keys('vm')
+        lxcs = [
+            (node, lxc) for node in nodes
+            for lxc in inventory.on_node(node, 'lxc', running=True)
+            if lxc.vmid not in keep_ctids
+        ]
+        for node, lxc in lxcs:
+            plan.add(PowerStep(
+                key=f"lxc:{lxc.vmid}", kind='lxc', action='stop', name=lxc.name,
+                node=node, node_ip=PROXMOX_NODES[node], vmid=lxc.vmid,
+                after=set(vm_keys),
+            ))
+
+        others = {f"lxc:{lxc.vmid}" for _, lxc in lxcs if lxc.vmid not in critical}
+        for _, lxc in lxcs:
+            if lxc.vmid in critical:
+                plan.steps[f"lxc:{lxc.vmid}"].after |= others
+
+    previous = None
+    for node in nodes:
+        if node in keep_nodes:
+            continue
+        step = plan.add(PowerStep(
+            key=f"node:{node}", kind='node', action='shutdown', name=node,
+            node=node, node_ip=PROXMOX_NODES[node],
+            after=plan.keys('vm', node) | plan.keys('lxc', node),
+        ))
+        if previous:
+            step.after.add(previous)
+        previous = step.key
+
+    return plan
+
+
+def build_wake_plan() -> PowerPlan:
+    """Startup stage 1: wake every node (in parallel) and wait for it to boot."""
+    plan = PowerPlan(operation='startup')
+    for node in NODE_STARTUP_ORDER:
+        if node in PROXMOX_NODES:
+            plan.add(PowerStep(
+                key=f"node:{node}", kind='node', action='start', name=node,
+                node=node, node_ip=PROXMOX_NODES[node],
+            ))
+    return plan
+
+
+def build_startup_plan(inventory: Optional[Inventory], online_nodes: Iterable[str]) -> PowerPlan:
+    """
+    Startup stage 2: start guests once their nodes are up.
+
+    LXCs come from LXC_STARTUP_ORDER; CRITICAL_LXCS (Pi-hole, for DNS)
+    start first and everything else waits for them to be running. VMs
+    are every stopped VM in the inventory. Guests on nodes that didn't
+    come online are reported as blocked.
+
+    Args:
+        inventory: Cluster inventory fetched after the nodes came up
+        online_nodes: Names of the nodes that are up
+    """
+    plan = PowerPlan(operation='startup')
+    online = set(online_nodes)
+    names = _node_names()
+    critical = {ctid for _, ctid in CRITICAL_LXCS.values()}
+
+    for name, node_ip, ctid in LXC_STARTUP_ORDER:
+        node = names.get(node_ip, node_ip)
+        step = plan.add(PowerStep(
+            key=f"lxc:{ctid}", kind='lxc', action='start', name=name,
+            node=node, node_ip=node_ip, vmid=ctid,
+        ))
+        if node not in online:
+            step.status, step.error = 'blocked', 'node offline'
+
+    critical_keys = {f"lxc:{ctid}" for ctid in critical if f"lxc:{ctid}" in plan.steps}
+    for key in plan.keys('lxc') - critical_keys:
+        plan.steps[key].after |= critical_keys
+
+    if inventory:
+        for node in NODE_STARTUP_ORDER:
+            if node not in online or node not in PROXMOX_NODES:
+                continue
+            for vm in inventory.on_node(node, 'qemu', running=False):
+                plan.add(PowerStep(
+                    key=f"vm:{vm.vmid}", kind='vm', action='start', name=vm.name,
+                    node=node, node_ip=PROXMOX_NODES[node], vmid=vm.vmid,
+                    after=set(critical_keys),
+                ))
+
+    return plan
+
+
+# ==================== Executor ====================
+
+class PowerExecutor:
+    """
+    Runs a PowerPlan with as much parallelism as its dependencies allow.
+
+    Each step waits for the steps it depends on, then runs. Guest steps
+    on the same node share a GUEST_CONCURRENCY cap; node steps don't
+    count against it. A guest step is finished when polling shows the
+    guest in its target state, not after a fixed delay.
+
+    With bulk enabled, guest stops that become ready together on a node
+    are sent as one pve_shutdown_guests() exec (graceful shutdown, then
+    stop) instead of one exec per guest. Those commands block until the
+    guest is down, so their per-guest exit status is the confirmation.
+
+    The backend is anything with SSHManager's power methods, so a
+    SimulatedCluster can stand in for a dry run.
+    """
+
+    def __init__(
+        self,
+        ssh,
+        concurrency: int = GUEST_CONCURRENCY,
+        ready_timeout: float = GUEST_READY_TIMEOUT,
+        boot_timeout: float = NODE_BOOT_TIMEOUT,
+        poll_initial: float = POLL_INITIAL,
+        poll_max: float = POLL_MAX,
+        bulk: bool = True,
+        shutdown_timeout: int = SHUTDOWN_TIMEOUT,
+        on_step: Optional[Callable[[PowerStep], Awaitable[None]]] = None
+    ):
+        self.ssh = ssh
+        self.concurrency = concurrency
+        self.ready_timeout = ready_timeout
+        self.boot_timeout = boot_timeout
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.bulk = bulk
+        self.shutdown_timeout = shutdown_timeout
+        self.batch_window = BATCH_WINDOW
+        self.on_step = on_step
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._batches: Dict[str, List[Tuple[PowerStep, asyncio.Future]]] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def run(self, plan: PowerPlan) -> PowerPlan:
+        """Execute every step of a plan. Returns the plan with outcomes filled in."""
+        plan.validate()
+        finished = {key: asyncio.Event() for key in plan.steps}
+
+        async def run_step(step: PowerStep) -> None:
+            for dep in step.after | step.requires:
+                await finished[dep].wait()
+
+            failed = [dep for dep in step.requires if not plan.steps[dep].ok]
+            if step.status == 'pending' and failed:
+                step.status, step.error = 'blocked', f"{', '.join(failed)} failed"
+
+            if step.status == 'pending':
+                step.status = 'running'
+                step.started_at = time.monotonic()
+                try:
+                    await self._execute(step)
+                except Exception as e:
+                    logger.exception(f"Power step {step.key} crashed")
+                    step.status, step.error = 'failed', str(e)
+                # Bulk stops already carry the guest's own elapsed time
+                step.duration = step.duration or time.monotonic() - step.started_at
+
+            if step.status != 'done':
+                logger.warning(f"Power step {step.key} {step.status}: {step.error}")
+            finished[step.key].set()
+
+            if self.on_step:
+                try:
+                    await self.on_step(step)
+                except Exception as e:
+                    logger.error(f"Power step callback failed: {e}")
+
+        await asyncio.gather(*(run_step(step) for step in plan.steps.values()))
+        return plan
+
+    def _slot(self, node: str) -> asyncio.Semaphore:
+        if node not in self._slots:
+            self._slots[node] = asyncio.Semaphore(self.concurrency)
+        return self._slots[node]
+
+    async def _execute(self, step: PowerStep) -> None:
+        if step.kind == 'node':
+            if step.action == 'shutdown':
+                await self._shutdown_node(step)
+            else:
+                await self._wake_node(step)
+        elif self.bulk and step.action == 'stop':
+            await self._stop_batched(step)
+        else:
+            async with self._slot(step.node):
+                await self._power_guest(step)
+
+    async def _stop_batched(self, step: PowerStep) -> None:
+        """Queue a guest stop for the node's next bulk exec and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        batch = self._batches.setdefault(step.node, [])
+        batch.append((step, future))
+        if len(batch) == 1:
+            task = asyncio.create_task(self._flush_batch(step.node, step.node_ip))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        await future
+
+    async def _flush_batch(self, node: str, node_ip: str) -> None:
+        """Shut down every queued guest on a node in one exec."""
+        await asyncio.sleep(self.batch_window)
+        batch = self._batches.pop(node, [])
+        steps = [step for step, _ in batch]
+        try:
+            logger.info(f"Shutting down {len(steps)} guests on {node} in one exec")
+            results = await self.ssh.pve_shutdown_guests(
+                node_ip,
+                [(GUEST_KINDS[step.kind], step.vmid) for step in steps],
+                timeout=self.shutdown_timeout
+            )
+            for step in steps:
+                await self._apply_bulk_result(step, results[(GUEST_KINDS[step.kind], step.vmid)])
+        except Exception as e:
+            logger.exception(f"Bulk shutdown on {node} crashed")
+            for step in steps:
+                if step.status == 'running':
+                    step.status, step.error = 'failed', str(e)
+        finally:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    async def _apply_bulk_result(self, step: PowerStep, result: GuestPowerResult) -> None:
+        step.changed = True
+        step.duration = result.elapsed
+        if result.success:
+            step.status = 'done'
+            return
+
+        # No result line (e.g. the exec timed out): the guest may still have stopped
+        if result.exit_code == -1:
+            status = await self.ssh.pve_guest_status(step.node_ip, GUEST_KINDS[step.kind], step.vmid)
+            if status == 'stopped':
+                step.status = 'done'
+                return
+        step.status, step.error = 'failed', result.message or f"{result.method} exit {result.exit_code}"
+
+    async def _power_guest(self, step: PowerStep) -> None:
+        """Start or stop a guest and wait until it reports the target status."""
+        guest_type = GUEST_KINDS[step.kind]
+        target = TARGET_STATUS[step.action]
+
+        # Starting a running guest is an error in Proxmox; stopping a stopped one isn't
+        if step.action == 'start':
+            if await self.ssh.pve_guest_status(step.node_ip, guest_type, step.vmid) == target:
+                step.status = 'done'
+                return
+
+        commands = {
+            ('vm', 'start'): self.ssh.pve_start_vm,
+            ('vm', 'stop'): self.ssh.pve_stop_vm,
+            ('lxc', 'start'): self.ssh.pve_start_lxc,
+            ('lxc', 'stop'): self.ssh.pve_stop_lxc,
+        }
+        logger.info(f"{step.action.title()}ing {step.kind.upper()} {step.label} on {step.node}")
+        result = await commands[(step.kind, step.action)](step.node_ip, step.vmid)
+        step.changed = True
+        if not result.success:
+            step.status, step.error = 'failed', result.output or f"exit {result.exit_code}"
+            return
+
+        if await self._poll_status(step, guest_type, target):
+            step.status = 'done'
+        else:
+            step.status, step.error = 'failed', f"not {target} after {self.ready_timeout}s"
+
+    async def _poll_status(self, step: PowerStep, guest_type: str, target: str) -> bool:
+        """Poll a guest's status with exponential backoff until it reaches target."""
+        deadline = time.monotonic() + self.ready_timeout
+        delay = self.poll_initial
+
+        while True:
+            if await self.ssh.pve_guest_status(step.node_ip, guest_type, step.vmid) == target:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.poll_max)
+
+    async def _shutdown_node(self, step: PowerStep) -> None:
+        if not await self.ssh.pve_is_node_online(step.node_ip):
+            step.status = 'done'
+            return
+
+        logger.info(f"Shutting down node {step.node} ({step.node_ip})")
+        result = await self.ssh.pve_shutdown_node(step.node_ip)
+        step.changed = True
+
+        # Connection reset is expected during shutdown
+        if result.success or 'Connection reset' in result.stderr or 'closed' in result.stderr.lower():
+            step.status = 'done'
+        else:
+            step.status, step.error = 'failed', result.output or f"exit {result.exit_code}"
+
+    async def _wake_node(self, step: PowerStep) -> None:
+        if await self.ssh.pve_is_node_online(step.node_ip):
+            step.status = 'done'
+            return
+
+        mac = WOL_MAC_ADDRESSES.get(step.node)
+        if not mac or mac == 'TBD':
+            step.status, step.error = 'failed', 'no MAC'
+            return
+
+        logger.info(f"Sending WoL to {step.node} ({mac})")
+        step.changed = True
+        result = await self.ssh.send_wol(mac, WOL_BROADCAST)
+        if not result.success:
+            # Don't fail yet - the node may still come up
+            logger.error(f"Failed to send WoL to {step.node}: {result.stderr}")
+
+        if await self.ssh.wait_for_node_online(step.node_ip, timeout=self.boot_timeout):
+            step.status = 'done'
+        else:
+            step.status, step.error = 'failed', 'timeout'
+
+
+# ==================== Dry Run ====================
+
+class SimulatedCluster:
+    """
+    In-memory stand-in for SSHManager's power methods.
+
+    Seeded from an inventory; commands change the simulated state after
+    `latency` seconds, so executor polling is exercised as it would be
+    against real nodes. Every command is recorded in `commands`.
+    """
+
+    def __init__(self, inventory: Optional[Inventory], powered_off: bool = False, latency: float = 0.05):
+        self.latency = latency
+        self.commands: List[str] = []
+        self.names = _node_names()
+
+        self.online = {name: not powered_off for name in PROXMOX_NODES}
+        self.resources: Dict[int, Dict[str, Any]] = {}
+        if inventory:
+            for guest in inventory.guests.values():
+                if guest.template:
+                    continue
+                self.resources[guest.vmid] = {
+                    'type': guest.type, 'vmid': guest.vmid, 'name': guest.name,
+                    'node': guest.node, 'status': 'stopped' if powered_off else guest.status,
+                }
+        for name, node_ip, ctid in LXC_STARTUP_ORDER:
+            self.resources.setdefault(ctid, {
+                'type': 'lxc', 'vmid': ctid, 'name': name,
+                'node': self.names.get(node_ip, node_ip), 'status': 'stopped' if powered_off else 'running',
+            })
+
+    def _later(self, callback: Callable[[], None]) -> None:
+        asyncio.get_running_loop().call_later(self.latency, callback)
+
+    def _set_status(self, node_ip: str, vmid: int, status: str) -> SSHResult:
+        guest = self.resources.get(vmid)
+        if not guest or guest['node'] != self.names.get(node_ip) or not self.online.get(guest['node']):
+            return SSHResult(False, '', f'guest {vmid} not found on {node_ip}', 2)
+        self._later(lambda: guest.update(status=status))
+        return SSHResult(True, '', '', 0)
+
+    async def _command(self, text: str) -> None:
+        self.commands.append(text)
+        await asyncio.sleep(self.latency)
+
+    async def pve_start_vm(self, node_ip: str, vmid: int) -> SSHResult:
+        await self._command(f'{node_ip}: qm start {vmid}')
+        return self._set_status(node_ip, vmid, 'running')
+
+    async def pve_stop_vm(self, node_ip: str, vmid: int) -> SSHResult:
+        await self._command(f'{node_ip}: qm stop {vmid}')
+        return self._set_status(node_ip, vmid, 'stopped')
+
+    async def pve_start_lxc(self, node_ip: str, ctid: int) -> SSHResult:
+        await self._command(f'{node_ip}: pct start {ctid}')
+        return self._set_status(node_ip, ctid, 'running')
+
+    async def pve_stop_lxc(self, node_ip: str, ctid: int) -> SSHResult:
+        await self._command(f'{node_ip}: pct stop {ctid}')
+        return self._set_status(node_ip, ctid, 'stopped')
+
+    async def pve_shutdown_guests(
+        self,
+        node_ip: str,
+        guests: List[Tuple[str, int]],
+        timeout: int = SHUTDOWN_TIMEOUT
+    ) -> Dict[Tuple[str, int], GuestPowerResult]:
+        command = ' '.join(f"{'qm' if t == 'qemu' else 'pct'}:{vmid}" for t, vmid in guests)
+        await self._command(f'{node_ip}: bulk shutdown {command}')
+
+        results = {}
+        for guest_type, vmid in guests:
+            result = self._set_status(node_ip, vmid, 'stopped')
+            results[(guest_type, vmid)] = GuestPowerResult(
+                guest_type=guest_type, vmid=vmid, success=result.success, method='shutdown',
+                exit_code=result.exit_code, elapsed=self.latency, message=result.stderr,
+            )
+        # Shutdowns run in parallel and return once the guests are down
+        await asyncio.sleep(self.latency)
+        return results
+
+    async def pve_guest_status(self, node_ip: str, guest_type: str, vmid: int) -> Optional[str]:
+        await asyncio.sleep(self.latency / 5)
+        guest = self.resources.get(vmid)
+        return guest['status'] if guest and self.online.get(guest['node']) else None
+
+    async def pve_is_node_online(self, node_ip: str) -> bool:
+        return self.online.get(self.names.get(node_ip), False)
+
+    async def pve_nodes_online(self, nodes: Dict[str, str] = None) -> Dict[str, bool]:
+        return {name: self.online.get(name, False) for name in (nodes or PROXMOX_NODES)}
+
+    async def wait_for_node_online(self, node_ip: str, timeout: float = 300) -> bool:
+        deadline = time.monotonic() + timeout
+        while not await self.pve_is_node_online(node_ip):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self.latency)
+        return True
+
+    async def pve_shutdown_node(self, node_ip: str) -> SSHResult:
+        node = self.names.get(node_ip)
+        await self._command(f'{node_ip}: shutdown -h now')
+        self._later(lambda: self.online.update({node: False}))
+        return SSHResult(True, '', '', 0)
+
+    async def send_wol(self, mac: str, broadcast: str) -> SSHResult:
+        await self._command(f'wol {mac} via {broadcast}')
+        node = next((name for name, m in WOL_MAC_ADDRESSES.items() if m == mac), None)
+        if node in self.online:
+            self._later(lambda: self.online.update({node: True}))
+        return SSHResult(True, '', '', 0)
+
+    async def pve_cluster_resources(self, node_ip: str) -> SSHResult:
+        if not await self.pve_is_node_online(node_ip):
+            return SSHResult(False, '', f'{node_ip} is offline', 255)
+        resources = [
+            {'type': 'node', 'node': name, 'status': 'online' if up else 'offline'}
+            for name, up in self.online.items()
+        ]
+        resources += [dict(guest) for guest in self.resources.values() if self.online.get(guest['node'])]
+        return SSHResult(True, json.dumps(resources), '', 0)
@@ -0,0 +1,211 @@
+"""
+Sentinel Bot Host Probe
+Composes several health probes into one remote script and parses the result.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# Section markers emitted around each probe's output
+SECTION_START = '@@SENTINEL-BEGIN {name}@@'
+SECTION_END = '@@SENTINEL-END {name} rc=$?@@'
+_SECTION_RE = re.compile(
+    r'^@@SENTINEL-BEGIN (?P<name>[\w-]+)@@\n(?P<body>.*?)^@@SENTINEL-END (?P=name) rc=(?P<rc>-?\d+)@@$',
+    re.MULTILINE | re.DOTALL
+)
+
+# Available probe fields and the command for each
+PROBE_COMMANDS = {
+    'uptime': 'uptime -p',
+    'disk': 'df -Pk / | tail -1',
+    'memory': 'free -b | grep Mem',
+    'containers': 'docker ps -a --format "{{.Names}}\t{{.Status}}\t{{.Image}}"',
+    'stats': 'docker stats --no-stream --format "{{.Name}}\t{{.CPUPerc}}\t{{.MemPerc}}"',
+    # A failed cache refresh fails the section (rc is apt-get's) instead of listing stale data
+    'upgradable': (
+        'sudo DEBIAN_FRONTEND=noninteractive apt-get update -qq >/dev/null 2>&1 && '
+        'apt list --upgradable 2>/dev/null | tail -n +2'
+    ),
+}
+
+
+@dataclass
+class DiskUsage:
+    """Root filesystem usage (sizes in KiB)."""
+    total_kb: int
+    used_kb: int
+    available_kb: int
+    percent: int
+
+
+@dataclass
+class MemoryUsage:
+    """System memory usage (sizes in bytes)."""
+    total: int
+    used: int
+    available: int
+
+    @property
+    def percent(self) -> float:
+        return (self.used / self.total) * 100 if self.total else 0.0
+
+
+@dataclass
+class ContainerStatus:
+    """A row of `docker ps -a`."""
+    name: str
+    status: str
+    image: str = ''
+
+    @property
+    def problem(self) -> Optional[str]:
+        """Short problem label, or None if the container looks healthy."""
+        status_lower = self.status.lower()
+        if 'restarting' in status_lower:
+            return 'restarting'
+        if 'unhealthy' in status_lower:
+            return 'unhealthy'
+        if 'exited' in status_lower and 'exited (0)' not in status_lower:
+            return 'crashed'
+        return None
+
+
+@dataclass
+class ContainerStats:
+    """A row of `docker stats --no-stream`."""
+    name: str
+    cpu_percent: float
+    mem_percent: float
+
+
+@dataclass
+class HostProbe:
+    """Typed result of a batched host probe."""
+    host: str
+    success: bool
+    error: str = ''
+    exit_codes: Dict[str, int] = field(default_factory=dict)
+
+    uptime: Optional[str] = None
+    disk: Optional[DiskUsage] = None
+    memory: Optional[MemoryUsage] = None
+    # None when the section is missing (output truncated) or its command failed
+    containers: Optional[List[ContainerStatus]] = None
+    stats: Optional[List[ContainerStats]] = None
+    upgradable: Optional[List[str]] = None
+
+
+def build_probe_script(fields: Iterable[str]) -> str:
+    """
+    Build a single remote script that runs each probe and delimits its output.
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    lines = []
+    for name in fields:
+        if name not in PROBE_COMMANDS:
+            raise ValueError(f"Unknown probe field: {name}")
+        lines.append(f"echo '{SECTION_START.format(name=name)}'")
+        lines.append(f"{PROBE_COMMANDS[name]} 2>/dev/null")
+        lines.append(f'echo "{SECTION_END.format(name=name)}"')
+    return '\n'.join(lines)
+
+
+def split_sections(output: str) -> Dict[str, tuple]:
+    """Split probe output into {field: (body, exit_code)}."""
+    sections = {}
+    for match in _SECTION_RE.finditer(output.replace('\r\n', '\n')):
+        sections[match.group('name')] = (match.group('body').strip(), int(match.group('rc')))
+    return sections
+
+
+def _percent(value: str) -> float:
+    return float(value.replace('%', '').strip() or 0)
+
+
+def parse_disk(body: str) -> Optional[DiskUsage]:
+    """Parse `df -Pk / | tail -1`."""
+    parts = body.split()
+    if len(parts) < 5:
+        return None
+    try:
+        return DiskUsage(
+            total_kb=int(parts[1]),
+            used_kb=int(parts[2]),
+            available_kb=int(parts[3]),
+            percent=int(parts[4].rstrip('%')),
+        )
+    except ValueError:
+        return None
+
+
+def parse_memory(body: str) -> Optional[MemoryUsage]:
+    """Parse `free -b | grep Mem`."""
+    parts = body.split()
+    if len(parts) < 7:
+        return None
+    try:
+        return MemoryUsage(total=int(parts[1]), used=int(parts[2]), available=int(parts[6]))
+    except ValueError:
+        return None
+
+
+def parse_containers(body: str) -> List[ContainerStatus]:
+    """Parse tab-separated `docker ps -a` rows."""
+    containers = []
+    for line in body.splitlines():
+        parts = line.split('\t')
+        if len(parts) >= 2 and parts[0]:
+            containers.append(ContainerStatus(
+                name=parts[0],
+                status=parts[1],
+                image=parts[2] if len(parts) > 2 else '',
+            ))
+    return containers
+
+
+def parse_stats(body: str) -> List[ContainerStats]:
+    """Parse tab-separated `docker stats --no-stream` rows."""
+    stats = []
+    for line in body.splitlines():
+        parts = line.split('\t')
+        if len(parts) < 3:
+            continue
+        try:
+            stats.append(ContainerStats(
+                name=parts[0],
+                cpu_percent=_percent(parts[1]),
+                mem_percent=_percent(parts[2]),
+            ))
+        except ValueError:
+            continue
+    return stats
+
+
+def parse_probe_output(host: str, fields: Iterable[str], output: str) -> HostProbe:
+    """Parse delimited probe output into a HostProbe."""
+    sections = split_sections(output)
+    probe = HostProbe(host=host, success=True)
+
+    for name in fields:
+        if name not in sections:
+            continue
+        body, rc = sections[name]
+        probe.exit_codes[name] = rc
+
+        if name == 'uptime':
+            probe.uptime = body or None
+        elif name == 'disk':
+            probe.disk = parse_disk(body)
+        elif name == 'memory':
+            probe.memory = parse_memory(body)
+        elif name == 'containers':
+            probe.containers = parse_containers(body) if rc == 0 else None
+        elif name == 'stats':
+            probe.stats = parse_stats(body) if rc == 0 else None
+        elif name == 'upgradable':
+            probe.upgradable = [line for line in body.splitlines() if line.strip()] if rc == 0 else None
+
+    return probe
@@ -0,0 +1,189 @@
+"""
+Sentinel Bot Response Cache
+Shared async cache for read-only API responses.
+"""
+
+import logging
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger('sentinel.cache')
+
+# Entries are served as-is for TTL seconds, then served stale while a
+# background refresh runs, until STALE_TTL seconds after they were fetched
+DEFAULT_TTL = 300
+DEFAULT_STALE_TTL = 3600
+
+# Least recently used entries are evicted beyond this (approximate JSON size)
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+
+CacheKey = Tuple[Hashable, ...]
+Fetch = Callable[[], Awaitable[Any]]
+
+
+def make_key(service: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> CacheKey:
+    """Cache key for a (service, endpoint, params) request."""
+    return (service, endpoint, tuple(sorted((params or {}).items())))
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory cost of a decoded JSON value (its encoded length)."""
+    try:
+        return len(json.dumps(value, separators=(',', ':'), default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    fetched_at: float
+    ttl: float
+    stale_ttl: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.age < self.ttl
+
+    @property
+    def usable(self) -> bool:
+        return self.age < self.stale_ttl
+
+
+class ResponseCache:
+    """
+    TTL cache with stale-while-revalidate and single-flight fetches.
+
+    Concurrent requests for the same key share one fetch. A stale entry is
+    returned immediately while one background refresh replaces it; if that
+    refresh fails the stale entry keeps being served until it expires.
+    Failed fetches (None) are never cached.
+    """
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[CacheKey, CacheEntry]' = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self._bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    async def get(
+        self,
+        key: CacheKey,
+        fetch: Fetch,
+        ttl: float = DEFAULT_TTL,
+        stale_ttl: float = DEFAULT_STALE_TTL
+    ) -> Optional[Any]:
+        """
+        Return the cached value for key, fetching it if needed.
+
+        Args:
+            key: Cache key (see make_key)
+            fetch: Coroutine factory returning the value, or None on failure
+            ttl: Seconds the value is served without revalidation
+            stale_ttl: Seconds the value may be served at all
+
+        Returns:
+            The value, or None if it isn't cached and the fetch failed
+        """
+        entry = self._entries.get(key)
+        if entry and entry.usable:
+            self._entries.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._revalidate(key, fetch, ttl, stale_ttl)
+            return entry.value
+
+        self.misses += 1
+        if key in self._inflight:
+            self.coalesced += 1
+        # Shielded so a cancelled caller doesn't cancel the fetch others are waiting on
+        return await asyncio.shield(self._start_fetch(key, fetch, ttl, stale_ttl))
+
+    def _start_fetch(self, key: CacheKey, fetch: Fetch, ttl: float, stale_ttl: float) -> asyncio.Task:
+        """Return the in-flight fetch for key, starting one if there is none (single-flight)."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_fetch(key, fetch, ttl, stale_ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _run_fetch(self, key: CacheKey, fetch: Fetch, ttl: float, stale_ttl: float) -> Optional[Any]:
+        try:
+            value = await fetch()
+        except Exception as e:
+            logger.error(f"Cache fetch for {key[:2]} failed: {e}")
+            return None
+
+        if value is not None:
+            self._store(key, value, ttl, stale_ttl)
+        return value
+
+    def _revalidate(self, key: CacheKey, fetch: Fetch, ttl: float, stale_ttl: float) -> None:
+        """Refresh a stale entry in the background, once."""
+        if key not in self._inflight:
+            self.refreshes += 1
+            self._start_fetch(key, fetch, ttl, stale_ttl)
+
+    def _store(self, key: CacheKey, value: Any, ttl: float, stale_ttl: float) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Response for {key[:2]} ({size} bytes) exceeds cache size, not cached")
+            self._drop(key)
+            return
+
+        self._drop(key)
+        self._entries[key] = CacheEntry(value, size, time.monotonic(), ttl, max(ttl, stale_ttl))
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry.size
+
+    def invalidate(self, service: Optional[str] = None) -> int:
+        """Drop every entry, or only those for one service. Returns the number dropped."""
+        keys = [key for key in self._entries if service is None or key[0] == service]
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory use."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'refreshes': self.refreshes,
+            'evictions': self.evictions,
+            'hit_ratio': round((self.hits + self.stale_hits) / lookups, 3) if lookups else None,
+        }
@@ -0,0 +1,289 @@
+"""
+Sentinel Bot Service Client
+Per-service HTTP client with timeouts, retries and a circuit breaker.
+"""
+
+import logging
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger('sentinel.http')
+
+# Defaults per service (overridable per client)
+CONNECTION_LIMIT = 8
+TOTAL_TIMEOUT = 15
+CONNECT_TIMEOUT = 5
+
+# Retries apply to idempotent methods only, with full-jitter exponential backoff
+GET_RETRIES = 2
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4.0
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Circuit breaker: open after N consecutive failures, probe again after the cooldown
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30
+
+# Latency histogram bucket upper bounds (ms)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+    def __init__(self, service: str, retry_in: float):
+        super().__init__(f"{service} circuit open, retry in {retry_in:.0f}s")
+        self.service = service
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed: requests flow; open: requests fail fast until the cooldown
+    passes; half_open: one trial request decides whether to close again.
+    """
+
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half_open'
+        return 'open'
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a request may go out now."""
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.threshold:
+            if self.opened_at is None or self._trial_in_flight:
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Let another request be the half-open trial (the last one was cancelled)."""
+        self._trial_in_flight = False
+
+
+class LatencyHistogram:
+    """Cumulative request latency histogram."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Cumulative, Prometheus-style: le_N counts requests that took <= N ms
+        buckets = {}
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            buckets[f'le_{bound}'] = running
+        buckets['le_inf'] = self.count
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 1) if self.count else 0.0,
+            'buckets': buckets,
+        }
+
+
+class ServiceClient:
+    """
+    HTTP client for one upstream service.
+
+    Each client owns its connection pool, so a hung service can only tie
+    up its own connections, and its own timeouts and breaker, so callers
+    fail fast while it is down.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        headers: Dict[str, str] = None,
+        limit: int = CONNECTION_LIMIT,
+        total_timeout: float = TOTAL_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        retries: int = GET_RETRIES,
+        verify_ssl: bool = True,
+        **session_kwargs
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers or {}
+        self.limit = limit
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self.retries = retries
+        self._connector_kwargs = {} if verify_ssl else {'ssl': False}
+        self._session_kwargs = session_kwargs
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.failures = 0
+        self.retried = 0
+        self.short_circuited = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit, ttl_dns_cache=300, **self._connector_kwargs),
+                timeout=self.timeout,
+                headers=self.headers,
+                **self._session_kwargs
+            )
+        return self._session
+
+    def _url(self, url: str) -> str:
+        """Accept absolute URLs (existing callers) or paths relative to base_url."""
+        return url if url.startswith(('http://', 'https://')) else f"{self.base_url}/{url.lstrip('/')}"
+
+    async def _backoff(self, attempt: int) -> None:
+        await asyncio.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)))
+
+    def _record(self, started: float, failed: bool) -> None:
+        self.requests += 1
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        if failed:
+            self.failures += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Send a request and yield the response.
+
+        Idempotent methods are retried on connection errors, timeouts and
+        429/5xx gateway statuses. Connection errors, timeouts and 5xx count
+        against the circuit breaker; other statuses mean the service is up.
+
+        Raises:
+            CircuitOpenError: The service is failing and the cooldown hasn't passed
+            aiohttp.ClientError / asyncio.TimeoutError: After the last attempt
+        """
+        method = method.upper()
+        retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        session = self._get_session()
+        url = self._url(url)
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.short_circuited += 1
+                raise CircuitOpenError(self.name, self.breaker.retry_in())
+
+            started = time.perf_counter()
+            try:
+                resp = await session.request(method, url, **kwargs)
+            except asyncio.CancelledError:
+                self.breaker.release_trial()
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self._record(started, failed=True)
+                if attempt >= retries:
+                    raise
+            else:
+                if resp.status not in RETRY_STATUSES or attempt >= retries:
+                    self._record(started, failed=resp.status >= 500)
+                    break
+                resp.release()
+                # 429 means the service is up, just busy
+                self._record(started, failed=resp.status >= 500)
+
+            attempt += 1
+            self.retried += 1
+            await self._backoff(attempt)
+
+        try:
+            yield resp
+        finally:
+            resp.release()
+
+    async def get_json(self, url: str, **kwargs) -> Optional[Any]:
+        """GET and decode JSON, or None on any failure (logged)."""
+        try:
+            async with self.request('GET', url, **kwargs) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+                logger.error(f"API GET {url} failed: {resp.status}")
+        except CircuitOpenError as e:
+            logger.debug(str(e))
+        except Exception as e:
+            logger.error(f"API GET {url} error: {e!r}")
+        return None
+
+    async def post_json(self, url: str, data: Any = None, **kwargs) -> Optional[Any]:
+        """POST JSON and decode the reply, or None on any failure (logged)."""
+        try:
+            async with self.request('POST', url, json=data, **kwargs) as resp:
+                if resp.status in (200, 201):
+                    return await resp.json()
+                logger.error(f"API POST {url} failed: {resp.status}")
+        except CircuitOpenError as e:
+            logger.debug(str(e))
+        except Exception as e:
+            logger.error(f"API POST {url} error: {e!r}")
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state, counters and latency histogram."""
+        return {
+            'circuit': self.breaker.state,
+            'requests': self.requests,
+            'failures': self.failures,
+            'retried': self.retried,
+            'short_circuited': self.short_circuited,
+            'latency': self.latency.snapshot(),
+        }
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
@@ -5,12 +5,41 @@ Async SSH client for infrastructure management.
 
 import logging
 import asyncio
+import json
+import socket
+import time
 import asyncssh
-from typing import Optional, Tuple, Dict, Any
-from dataclasses import dataclass
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple, Dict, Any, List
+from dataclasses import dataclass, field
+
+from config import PROXMOX_NODES
+from .bulk_power import (
+    SHUTDOWN_TIMEOUT, GuestPowerResult,
+    build_bulk_shutdown_script, parse_bulk_output, missing_results
+)
+from .probe import HostProbe, build_probe_script, parse_probe_output
 
 logger = logging.getLogger('sentinel.ssh')
 
+# Connection pool tuning
+MAX_CONNECTIONS_PER_HOST = 2
+MAX_CHANNELS_PER_CONNECTION = 8  # Stay below OpenSSH's default MaxSessions (10)
+IDLE_TIMEOUT = 300  # Close connections unused for this many seconds
+REAP_INTERVAL = 60
+KEEPALIVE_INTERVAL = 15
+KEEPALIVE_COUNT_MAX = 3
+CONNECT_TIMEOUT = 10
+
+# Reachability probing (TCP connect, no SSH handshake)
+PROBE_PORTS = (22, 8006)  # SSH, Proxmox API
+PROBE_TIMEOUT = 0.5
+WAIT_BACKOFF_INITIAL = 1
+WAIT_BACKOFF_MAX = 10
+
+# Wake-on-LAN
+WOL_PORT = 9
+
 
 @dataclass
 class SSHResult:
@@ -26,12 +55,266 @@ class SSHResult:
         return self.stdout.strip() or self.stderr.strip()
 
 
+async def _tcp_connect(host: str, port: int, timeout: float) -> bool:
+    """True if host accepts a TCP connection on port within timeout."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def tcp_reachable(host: str, ports=PROBE_PORTS, timeout: float = PROBE_TIMEOUT) -> bool:
+    """
+    Check whether a host is up by connecting to any of several TCP ports.
+
+    Ports are tried concurrently and the first successful connect wins, so
+    an offline host costs at most `timeout` seconds instead of a full SSH
+    connect timeout.
+    """
+    tasks = [asyncio.ensure_future(_tcp_connect(host, port, timeout)) for port in ports]
+    try:
+        for done in asyncio.as_completed(tasks):
+            if await done:
+                return True
+        return False
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def magic_packet(mac: str) -> bytes:
+    """Build a Wake-on-LAN magic packet for a MAC address."""
+    mac_bytes = bytes.fromhex(mac.replace(':', '').replace('-', ''))
+    if len(mac_bytes) != 6:
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return b'\xff' * 6 + mac_bytes * 16
+
+
+@dataclass
+class PooledConnection:
+    """A pooled SSH connection and its channel accounting."""
+    conn: asyncssh.SSHClientConnection
+    channels: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    closed: bool = False
+
+
+class _PoolClient(asyncssh.SSHClient):
+    """asyncssh client callbacks that drop lost connections from the pool."""
+
+    def __init__(self, pool: 'SSHConnectionPool', key: str):
+        self._pool = pool
+        self._key = key
+        self._conn: Optional[asyncssh.SSHClientConnection] = None
+
+    def connection_made(self, conn: asyncssh.SSHClientConnection) -> None:
+        self._conn = conn
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if self._conn is not None:
+            self._pool.discard(self._key, self._conn, exc)
+
+
+class SSHConnectionPool:
+    """
+    Per-host SSH connection pool.
+
+    Commands are multiplexed as channels over a small number of long-lived
+    connections per host. Liveness is passive: asyncssh keepalives detect
+    dead peers and the connection_lost callback removes them, so reuse
+    costs no extra round trip. Connects are single-flight per host and
+    idle connections are evicted by a background reaper.
+    """
+
+    def __init__(
+        self,
+        key_path: str,
+        max_connections: int = MAX_CONNECTIONS_PER_HOST,
+        max_channels: int = MAX_CHANNELS_PER_CONNECTION,
+        idle_timeout: float = IDLE_TIMEOUT
+    ):
+        self.key_path = key_path
+        self.max_connections = max_connections
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+
+        self._entries: Dict[str, List[PooledConnection]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.connect_failures = 0
+        self._connect_count = 0
+        self._connect_total = 0.0
+        self._connect_last = 0.0
+        self._connect_max = 0.0
+
+    def _lock(self, key: str) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def _slot(self, key: str) -> asyncio.Semaphore:
+        if key not in self._slots:
+            self._slots[key] = asyncio.Semaphore(self.max_connections * self.max_channels)
+        return self._slots[key]
+
+    def _live(self, key: str) -> List[PooledConnection]:
+        live = [e for e in self._entries.get(key, []) if not e.closed]
+        self._entries[key] = live
+        return live
+
+    async def _open(self, key: str, host: str, user: str) -> PooledConnection:
+        """Open a new connection to a host and add it to the pool."""
+        started = time.monotonic()
+        try:
+            conn = await asyncssh.connect(
+                host,
+                username=user,
+                client_keys=[self.key_path],
+                known_hosts=None,  # Accept all host keys
+                connect_timeout=CONNECT_TIMEOUT,
+                keepalive_interval=KEEPALIVE_INTERVAL,
+                keepalive_count_max=KEEPALIVE_COUNT_MAX,
+                client_factory=lambda: _PoolClient(self, key),
+            )
+        except (asyncssh.Error, OSError) as e:
+            self.connect_failures += 1
+            logger.error(f"SSH connection failed to {key}: {e}")
+            raise
+
+        elapsed = time.monotonic() - started
+        self._connect_count += 1
+        self._connect_total += elapsed
+        self._connect_last = elapsed
+        self._connect_max = max(self._connect_max, elapsed)
+
+        entry = PooledConnection(conn=conn)
+        self._entries.setdefault(key, []).append(entry)
+        logger.debug(f"SSH connected to {key} in {elapsed * 1000:.0f}ms")
+        return entry
+
+    async def acquire(self, host: str, user: str) -> PooledConnection:
+        """Reserve a channel slot on a pooled connection, connecting if needed."""
+        key = f"{user}@{host}"
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+        slot = self._slot(key)
+        await slot.acquire()
+        try:
+            # Single-flight: concurrent callers for a new host wait for one connect
+            async with self._lock(key):
+                candidates = [e for e in self._live(key) if e.channels < self.max_channels]
+                if candidates:
+                    entry = min(candidates, key=lambda e: e.channels)
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    entry = await self._open(key, host, user)
+                entry.channels += 1
+                return entry
+        except BaseException:
+            slot.release()
+            raise
+
+    def release(self, host: str, user: str, entry: PooledConnection) -> None:
+        """Return a channel slot to the pool."""
+        entry.channels -= 1
+        entry.last_used = time.monotonic()
+        self._slot(f"{user}@{host}").release()
+
+    @asynccontextmanager
+    async def connection(self, host: str, user: str):
+        """Context manager yielding a connection with a reserved channel slot."""
+        entry = await self.acquire(host, user)
+        try:
+            yield entry.conn
+        finally:
+            self.release(host, user, entry)
+
+    def discard(self, key: str, conn: asyncssh.SSHClientConnection, exc: Optional[Exception] = None) -> None:
+        """Drop a connection from the pool (called when it is lost)."""
+        for entry in self._entries.get(key, []):
+            if entry.conn is conn and not entry.closed:
+                entry.closed = True
+                if exc:
+                    logger.info(f"SSH connection to {key} lost: {exc}")
+                else:
+                    logger.debug(f"SSH connection to {key} closed")
+
+    async def _reap_idle(self) -> None:
+        """Close connections that have had no open channels for idle_timeout."""
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            now = time.monotonic()
+            for key in list(self._entries):
+                for entry in self._live(key):
+                    if entry.channels == 0 and now - entry.last_used > self.idle_timeout:
+                        entry.closed = True
+                        entry.conn.close()
+                        self.evictions += 1
+                        logger.debug(f"Evicted idle SSH connection to {key}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool metrics for the /health endpoint."""
+        hosts = {}
+        for key in list(self._entries):
+            live = self._live(key)
+            if live:
+                hosts[key] = {
+                    'connections': len(live),
+                    'open_channels': sum(e.channels for e in live),
+                }
+
+        avg = self._connect_total / self._connect_count if self._connect_count else 0.0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'connect_failures': self.connect_failures,
+            'connections': sum(h['connections'] for h in hosts.values()),
+            'open_channels': sum(h['open_channels'] for h in hosts.values()),
+            'connect_latency_ms': {
+                'last': round(self._connect_last * 1000, 1),
+                'avg': round(avg * 1000, 1),
+                'max': round(self._connect_max * 1000, 1),
+            },
+            'hosts': hosts,
+        }
+
+    async def close(self) -> None:
+        """Close all pooled connections and stop the reaper."""
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+
+        for key, entries in self._entries.items():
+            for entry in entries:
+                if entry.closed:
+                    continue
+                entry.closed = True
+                try:
+                    entry.conn.close()
+                    logger.debug(f"Closed SSH connection: {key}")
+                except Exception as e:
+                    logger.warning(f"Error closing connection {key}: {e}")
+
+        self._entries.clear()
+
+
 class SSHManager:
     """Async SSH manager for infrastructure commands."""
 
     def __init__(self, ssh_config):
         self.config = ssh_config
-        self._connections: Dict[str, asyncssh.SSHClientConnection] = {}
+        self._pool = SSHConnectionPool(ssh_config.key_path)
 
     @property
     def key_path(self) -> str:
@@ -45,43 +328,9 @@ class SSHManager:
     def proxmox_user(self) -> str:
         return self.config.proxmox_user
 
-    async def _get_connection(
-        self,
-        host: str,
-        user: str = None,
-        force_new: bool = False
-    ) -> asyncssh.SSHClientConnection:
-        """Get or create an SSH connection to a host."""
-        user = user or self.user
-        cache_key = f"{user}@{host}"
-
-        # Check for existing connection
-        if not force_new and cache_key in self._connections:
-            conn = self._connections[cache_key]
-            # Verify connection is still alive
-            try:
-                # Quick test
-                await asyncio.wait_for(conn.run('echo ok', check=False), timeout=5)
-                return conn
-            except Exception:
-                # Connection dead, remove from cache
-                del self._connections[cache_key]
-
-        # Create new connection
-        try:
-            conn = await asyncssh.connect(
-                host,
-                username=user,
-                client_keys=[self.key_path],
-                known_hosts=None,  # Accept all host keys
-                connect_timeout=10,
-            )
-            self._connections[cache_key] = conn
-            logger.debug(f"SSH connected to {cache_key}")
-            return conn
-        except asyncssh.Error as e:
-            logger.error(f"SSH connection failed to {cache_key}: {e}")
-            raise
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool metrics."""
+        return self._pool.stats()
 
     async def run(
         self,
@@ -105,11 +354,11 @@ class SSHManager:
         user = user or self.user
 
         try:
-            conn = await self._get_connection(host, user)
-            result = await asyncio.wait_for(
-                conn.run(command, check=False),
-                timeout=timeout
-            )
+            async with self._pool.connection(host, user) as conn:
+                result = await asyncio.wait_for(
+                    conn.run(command, check=False),
+                    timeout=timeout
+                )
 
             return SSHResult(
                 success=result.exit_status == 0,
@@ -152,15 +401,8 @@ class SSHManager:
         return await self.run(node_ip, command, user=self.proxmox_user, timeout=timeout)
 
     async def close_all(self) -> None:
-        """Close all cached SSH connections."""
-        for key, conn in self._connections.items():
-            try:
-                conn.close()
-                logger.debug(f"Closed SSH connection: {key}")
-            except Exception as e:
-                logger.warning(f"Error closing connection {key}: {e}")
-
-        self._connections.clear()
+        """Close all pooled SSH connections."""
+        await self._pool.close()
         logger.info("All SSH connections closed")
 
     # ==================== Docker Commands ====================
@@ -263,10 +505,182 @@ class SSHManager:
         """Restart an LXC container."""
         return await self.run_proxmox(node_ip, f'pct reboot {ctid}')
 
+    async def pve_cluster_resources(self, node_ip: str) -> SSHResult:
+        """List every node, VM and LXC in the cluster (answered by any node)."""
+        return await self.run_proxmox(node_ip, 'pvesh get /cluster/resources --output-format json')
+
     async def pve_cluster_status(self, node_ip: str) -> SSHResult:
         """Get Proxmox cluster status."""
         return await self.run_proxmox(node_ip, 'pvecm status')
 
+    # ==================== Power Commands ====================
+
+    async def pve_is_node_online(self, node_ip: str) -> bool:
+        """Check whether a Proxmox node answers on SSH or the API port."""
+        return await tcp_reachable(node_ip)
+
+    async def pve_nodes_online(self, nodes: Dict[str, str] = None) -> Dict[str, bool]:
+        """
+        Probe several Proxmox nodes concurrently.
+
+        Args:
+            nodes: Node name -> IP (defaults to PROXMOX_NODES)
+
+        Returns:
+            Node name -> online
+        """
+        nodes = nodes if nodes is not None else PROXMOX_NODES
+        results = await asyncio.gather(*(tcp_reachable(ip) for ip in nodes.values()))
+        return dict(zip(nodes, results))
+
+    async def wait_for_node_online(self, node_ip: str, timeout: float = 300) -> bool:
+        """
+        Wait for a node to come up, polling with exponential backoff.
+
+        Cancelling the calling task stops the wait.
+
+        Returns:
+            True once the node is reachable, False if timeout expired first
+        """
+        deadline = time.monotonic() + timeout
+        delay = WAIT_BACKOFF_INITIAL
+
+        while True:
+            if await self.pve_is_node_online(node_ip):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Node {node_ip} not online after {timeout}s")
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, WAIT_BACKOFF_MAX)
+
+    async def _pve_guests(self, node_ip: str, guest_type: str) -> List[Dict[str, Any]]:
+        """
+        List a node's VMs ('qemu') or LXCs ('lxc'), templates excluded.
+
+        Returns:
+            Dicts with vmid, name and status, sorted by vmid (empty on failure)
+        """
+        result = await self.run_proxmox(
+            node_ip,
+            f'pvesh get /nodes/$(hostname)/{guest_type} --output-format json'
+        )
+        if not result.success:
+            logger.error(f"Could not list {guest_type} guests on {node_ip}: {result.stderr.strip()}")
+            return []
+
+        try:
+            guests = [
+                {
+                    'vmid': int(g['vmid']),
+                    'name': g.get('name') or f"{guest_type}{g['vmid']}",
+                    'status': g.get('status', 'unknown'),
+                }
+                for g in json.loads(result.stdout)
+                if not g.get('template')
+            ]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Could not parse {guest_type} list from {node_ip}: {e}")
+            return []
+        return sorted(guests, key=lambda g: g['vmid'])
+
+    async def pve_get_all_vms(self, node_ip: str) -> List[Dict[str, Any]]:
+        """All VMs on a node: dicts with vmid, name and status."""
+        return await self._pve_guests(node_ip, 'qemu')
+
+    async def pve_get_running_vms(self, node_ip: str) -> List[Dict[str, Any]]:
+        """Running VMs on a node: dicts with vmid, name and status."""
+        return [vm for vm in await self._pve_guests(node_ip, 'qemu') if vm['status'] == 'running']
+
+    async def pve_get_running_lxcs(self, node_ip: str) -> List[Dict[str, Any]]:
+        """Running LXCs on a node: dicts with ctid, name and status."""
+        return [
+            {'ctid': ct['vmid'], 'name': ct['name'], 'status': ct['status']}
+            for ct in await self._pve_guests(node_ip, 'lxc')
+            if ct['status'] == 'running'
+        ]
+
+    async def pve_guest_status(self, node_ip: str, guest_type: str, vmid: int) -> Optional[str]:
+        """
+        Current status of a VM ('qemu') or LXC ('lxc').
+
+        Returns:
+            'running', 'stopped', etc., or None if the status couldn't be read
+        """
+        result = await self.run_proxmox(
+            node_ip,
+            f'pvesh get /nodes/$(hostname)/{guest_type}/{vmid}/status/current --output-format json'
+        )
+        if not result.success:
+            return None
+        try:
+            return json.loads(result.stdout).get('status')
+        except (ValueError, AttributeError):
+            return None
+
+    async def lxc_is_running(self, node_ip: str, ctid: int) -> bool:
+        """Check whether an LXC container is running."""
+        return await self.pve_guest_status(node_ip, 'lxc', ctid) == 'running'
+
+    async def pve_shutdown_guests(
+        self,
+        node_ip: str,
+        guests: List[Tuple[str, int]],
+        timeout: int = SHUTDOWN_TIMEOUT
+    ) -> Dict[Tuple[str, int], GuestPowerResult]:
+        """
+        Shut down several guests on a node with one exec.
+
+        Guests shut down in parallel on the node, each gracefully with a
+        timeout and then by force, so the call takes as long as the slowest
+        guest rather than the sum of all of them.
+
+        Args:
+            node_ip: Proxmox node the guests run on
+            guests: (guest_type, vmid) pairs, guest_type 'qemu' or 'lxc'
+            timeout: Graceful shutdown timeout per guest, in seconds
+
+        Returns:
+            A result for every requested guest, keyed by (guest_type, vmid)
+        """
+        if not guests:
+            return {}
+
+        # Allow for the forced stop after a graceful timeout
+        result = await self.run_proxmox(
+            node_ip, build_bulk_shutdown_script(guests, timeout), timeout=timeout + 60
+        )
+        results = parse_bulk_output(result.stdout)
+
+        missing = [guest for guest in guests if guest not in results]
+        if missing:
+            error = result.stderr.strip() or 'No result reported'
+            logger.error(f"Bulk shutdown on {node_ip}: no result for {len(missing)} guests: {error}")
+            for failed in missing_results(missing, error):
+                results[(failed.guest_type, failed.vmid)] = failed
+        return results
+
+    async def pve_shutdown_node(self, node_ip: str) -> SSHResult:
+        """Power off a Proxmox node (the connection usually drops mid-command)."""
+        return await self.run_proxmox(node_ip, 'shutdown -h now', timeout=30)
+
+    async def send_wol(self, mac: str, broadcast: str) -> SSHResult:
+        """
+        Send a Wake-on-LAN magic packet from the bot's host.
+
+        Returns:
+            SSHResult-shaped status, so callers handle it like other commands
+        """
+        try:
+            packet = magic_packet(mac)
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                sock.sendto(packet, (broadcast, WOL_PORT))
+        except (ValueError, OSError) as e:
+            return SSHResult(success=False, stdout='', stderr=str(e), exit_code=-1)
+        return SSHResult(success=True, stdout=f'Magic packet sent to {mac}', stderr='', exit_code=0)
+
     # ==================== System Commands ====================
 
     async def apt_update(self, host: str) -> SSHResult:
@@ -297,6 +711,30 @@ class SSHManager:
         """Get memory usage."""
         return await self.run(host, 'free -h | grep Mem')
 
+    async def probe(
+        self,
+        host: str,
+        fields: List[str],
+        user: str = None,
+        timeout: int = 60
+    ) -> HostProbe:
+        """
+        Collect several health probes from a host in a single exec.
+
+        Args:
+            host: Target host IP or hostname
+            fields: Probe fields to collect (see core.probe.PROBE_COMMANDS)
+            user: SSH user (defaults to config.user)
+            timeout: Command timeout in seconds
+
+        Returns:
+            HostProbe with one typed attribute per requested field
+        """
+        result = await self.run(host, build_probe_script(fields), user=user, timeout=timeout)
+        if not result.stdout:
+            return HostProbe(host=host, success=False, error=result.stderr.strip() or 'No output')
+        return parse_probe_output(host, fields, result.stdout)
+
     # ==================== File Operations ====================
 
     async def read_file(self, host: str, path: str) -> SSHResult:
@@ -0,0 +1,19 @@
+"""
+Sentinel Bot Tests
+Offline tests for the core modules. Run from the bot directory:
+
+    python -m pytest tests
+
+Core modules are imported without core/__init__ (and the Discord stack),
+the same way the tools/ scripts load them.
+"""
+
+import os
+import sys
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# config.py lives at the bot root; bench_database provides load_core_module
+for path in (BOT_DIR, os.path.join(BOT_DIR, 'tools')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,76 @@
+"""Database transaction isolation between concurrent writers."""
+
+import asyncio
+import os
+
+import pytest
+
+from bench_database import load_database_class
+
+Database = load_database_class()
+
+
+def run_with_db(tmp_path, scenario):
+    async def main():
+        db = Database(os.path.join(tmp_path, 'test.db'))
+        await db.initialize()
+        try:
+            return await scenario(db)
+        finally:
+            await db.close()
+    return asyncio.run(main())
+
+
+def test_failed_batch_keeps_other_writers(tmp_path):
+    notified = []
+
+    async def scenario(db):
+        db.notifier.notify = notified.append
+
+        async def failing_batch():
+            async with db.batch():
+                await db.record_update('radarr', '192.168.40.11')
+                await asyncio.sleep(0.05)
+                raise RuntimeError('boom')
+
+        async def api_create():
+            await asyncio.sleep(0.01)
+            return await db.create_task('from API')
+
+        results = await asyncio.gather(failing_batch(), api_create(), return_exceptions=True)
+        assert isinstance(results[0], RuntimeError)
+        return results[1], await db.get_task(results[1]), await db.get_recent_updates()
+
+    task_id, task, updates = run_with_db(tmp_path, scenario)
+    assert task is not None and task['description'] == 'from API'
+    assert updates == []
+    assert notified == [task_id]
+
+
+def test_nested_batch_commits_once(tmp_path):
+    notified = []
+
+    async def scenario(db):
+        db.notifier.notify = notified.append
+        with pytest.raises(RuntimeError):
+            async with db.batch():
+                await db.create_task('inner')
+                async with db.batch():
+                    await db.record_update('sonarr', '192.168.40.11')
+                raise RuntimeError('boom')
+        return await db.get_task_stats(), await db.get_recent_updates()
+
+    stats, updates = run_with_db(tmp_path, scenario)
+    assert stats == {} and updates == []
+    # Rolled-back tasks never wake waiters
+    assert notified == []
+
+
+def test_vacuum_refused_inside_batch(tmp_path):
+    async def scenario(db):
+        async with db.batch():
+            with pytest.raises(RuntimeError):
+                await db.incremental_vacuum()
+        return await db.incremental_vacuum()
+
+    assert run_with_db(tmp_path, scenario) >= 0
@@ -0,0 +1,126 @@
+"""InventoryService caching and invalidation."""
+
+import asyncio
+import json
+
+from bench_database import load_core_module
+
+inventory = load_core_module('inventory')
+ssh_manager = load_core_module('ssh_manager')
+PROXMOX_NODES = inventory.PROXMOX_NODES
+
+
+class FakeNode:
+    """pve_cluster_resources() backend; each fetch waits for `gate` if one is set."""
+
+    def __init__(self):
+        self.status = 'running'
+        self.fetches = 0
+        self.fetched_from = []
+        self.down = set()
+        self.gate = None
+        self.fetch_started = asyncio.Event()
+
+    async def pve_nodes_online(self):
+        return {name: name not in self.down for name in PROXMOX_NODES}
+
+    async def pve_cluster_resources(self, node_ip):
+        self.fetches += 1
+        self.fetched_from.append(node_ip)
+        status = self.status
+        self.fetch_started.set()
+        if self.gate:
+            await self.gate.wait()
+        resources = [
+            {'type': 'node', 'node': 'node01', 'status': 'online'},
+            {'type': 'qemu', 'vmid': 101, 'name': 'vm', 'node': 'node01', 'status': status},
+        ]
+        return ssh_manager.SSHResult(True, json.dumps(resources), '', 0)
+
+
+def test_cached_within_ttl():
+    async def main():
+        node = FakeNode()
+        service = inventory.InventoryService(node, ttl=60)
+        first = await service.get()
+        assert await service.get() is first
+        assert (await service.get(refresh=True)) is not first
+        return node.fetches
+
+    assert asyncio.run(main()) == 2
+
+
+def test_concurrent_callers_share_a_fetch():
+    async def main():
+        node = FakeNode()
+        node.gate = asyncio.Event()
+        service = inventory.InventoryService(node, ttl=60)
+        waiters = [asyncio.create_task(service.get(refresh=True)) for _ in range(5)]
+        await node.fetch_started.wait()
+        node.gate.set()
+        results = await asyncio.gather(*waiters)
+        assert all(result is results[0] for result in results)
+        return node.fetches
+
+    assert asyncio.run(main()) == 1
+
+
+def test_invalidate_during_fetch_is_kept():
+    async def main():
+        node = FakeNode()
+        node.gate = asyncio.Event()
+        service = inventory.InventoryService(node, ttl=60)
+
+        # The fetch reads the pre-action state, then the action completes and invalidates
+        fetch = asyncio.create_task(service.get())
+        await node.fetch_started.wait()
+        node.status = 'stopped'
+        service.invalidate()
+        node.gate.set()
+        assert (await fetch).guest(101).status == 'running'
+
+        # The next lookup must not serve that pre-action snapshot
+        node.gate = None
+        assert (await service.get()).guest(101).status == 'stopped'
+        assert (await service.get()).guest(101).status == 'stopped'
+        return node.fetches
+
+    assert asyncio.run(main()) == 2
+
+
+def test_waiter_refetches_after_invalidate():
+    async def main():
+        node = FakeNode()
+        node.gate = asyncio.Event()
+        service = inventory.InventoryService(node, ttl=60)
+
+        first = asyncio.create_task(service.get(refresh=True))
+        await node.fetch_started.wait()
+        # Queued behind the in-flight fetch, then an action invalidates
+        second = asyncio.create_task(service.get(refresh=True))
+        await asyncio.sleep(0)
+        node.status = 'stopped'
+        service.invalidate()
+        node.gate.set()
+
+        await first
+        assert (await second).guest(101).status == 'stopped'
+        return node.fetches
+
+    assert asyncio.run(main()) == 2
+
+
+def test_down_nodes_are_skipped():
+    async def main():
+        node = FakeNode()
+        node.down = {'node01'}
+        service = inventory.InventoryService(node, ttl=60)
+        assert await service.get()
+
+        node.down = set(PROXMOX_NODES)
+        assert await service.get(refresh=True)  # the last inventory is kept
+        return node.fetched_from, service.failures
+
+    fetched_from, failures = asyncio.run(main())
+    assert fetched_from == [PROXMOX_NODES['node02']]
+    assert failures == 1
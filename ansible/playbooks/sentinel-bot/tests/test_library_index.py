@@ -0,0 +1,91 @@
+"""LibraryIndex incremental sync from *arr history."""
+
+import asyncio
+import os
+import types
+from contextlib import asynccontextmanager
+
+from bench_database import load_core_module, load_database_class
+
+library_index = load_core_module('library_index')
+response_cache = load_core_module('response_cache')
+Database = load_database_class()
+
+
+class FakeResponse:
+    def __init__(self, status, body=None):
+        self.status = status
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+
+class FakeArr:
+    """Radarr/Sonarr: a movie library, its history, and a log of item fetches."""
+
+    def __init__(self):
+        self.movies = {1: {'id': 1, 'title': 'Alien', 'hasFile': True}}
+        self.history = []
+        self.fetched = []
+
+    @asynccontextmanager
+    async def request(self, method, url):
+        item_id = int(url.rsplit('/', 1)[1])
+        self.fetched.append(item_id)
+        movie = self.movies.get(item_id)
+        yield FakeResponse(200, movie) if movie else FakeResponse(404)
+
+
+class FakeBot:
+    def __init__(self, db, arr):
+        self.db = db
+        self.services = {'radarr': arr, 'sonarr': arr}
+        self.response_cache = response_cache.ResponseCache()
+        self.config = types.SimpleNamespace(api=types.SimpleNamespace(radarr_url='R', sonarr_url='S'))
+        self.arr = arr
+
+    async def api_get(self, url, service, params=None):
+        if url == 'R/api/v3/movie':
+            return list(self.arr.movies.values())
+        if url == 'S/api/v3/series':
+            return []
+        if url == 'R/api/v3/history/since':
+            return [r for r in self.arr.history if r['date'] >= params['date']]
+        if url == 'S/api/v3/history/since':
+            return []
+
+
+def test_history_cursor_is_exclusive(tmp_path):
+    async def main():
+        db = Database(os.path.join(tmp_path, 'test.db'))
+        await db.initialize()
+        arr = FakeArr()
+        index = library_index.LibraryIndex(FakeBot(db, arr))
+        await index.load()
+        await index.sync()
+        assert arr.fetched == []
+
+        arr.movies[2] = {'id': 2, 'title': 'Heat', 'hasFile': True}
+        arr.history = [
+            {'movieId': 1, 'date': '2099-01-01T00:00:00Z'},
+            {'movieId': 2, 'date': '2099-01-01T00:00:00.1234567Z'},
+        ]
+        await index.sync()
+        first = sorted(arr.fetched)
+        cursor = (await db.get_library_sync('radarr'))['history_cursor']
+
+        # The same history on the next tick (history/since includes the cursor) changes nothing
+        arr.fetched.clear()
+        await index.sync()
+        second = list(arr.fetched)
+
+        rows, total = await db.query_library('radarr')
+        await db.close()
+        return first, cursor, second, total
+
+    first, cursor, second, total = asyncio.run(main())
+    assert first == [1, 2]
+    assert cursor == '2099-01-01T00:00:00.1234567Z'
+    assert second == []
+    assert total == 2
@@ -0,0 +1,140 @@
+"""PowerExecutor ordering against the SimulatedCluster dry-run backend."""
+
+import asyncio
+import time
+
+import pytest
+
+from bench_database import load_core_module
+from config import CRITICAL_LXCS, LXC_STARTUP_ORDER, PROXMOX_NODES
+
+power_plan = load_core_module('power_plan')
+inventory = load_core_module('inventory')
+
+LATENCY = 0.01
+PIHOLE = f"lxc:{CRITICAL_LXCS['pi-hole'][1]}"
+NODE_NAMES = {ip: name for name, ip in PROXMOX_NODES.items()}
+
+
+def make_inventory():
+    resources = [{'type': 'node', 'node': name, 'status': 'online'} for name in PROXMOX_NODES]
+    resources += [
+        {'type': 'lxc', 'vmid': ctid, 'name': name, 'node': NODE_NAMES[node_ip], 'status': 'running'}
+        for name, node_ip, ctid in LXC_STARTUP_ORDER
+    ]
+    resources += [
+        {'type': 'qemu', 'vmid': 101 + i, 'name': f'vm{i}', 'node': node, 'status': 'running'}
+        for i, node in enumerate(list(PROXMOX_NODES) * 2)
+    ]
+    resources.append({
+        'type': 'qemu', 'vmid': 9000, 'name': 'template', 'node': 'node01',
+        'status': 'stopped', 'template': 1,
+    })
+    return inventory.Inventory.from_resources(resources)
+
+
+def execute(plan, cluster):
+    """Run a plan; returns {key: step} and {key: monotonic finish time}."""
+    finished_at = {}
+
+    async def on_step(step):
+        finished_at[step.key] = time.monotonic()
+
+    executor = power_plan.PowerExecutor(
+        cluster, poll_initial=LATENCY, poll_max=LATENCY, ready_timeout=2, boot_timeout=2, on_step=on_step
+    )
+    executor.batch_window = LATENCY
+    asyncio.run(executor.run(plan))
+    return plan.steps, finished_at
+
+
+def test_shutdown_order():
+    inv = make_inventory()
+    cluster = power_plan.SimulatedCluster(inv, latency=LATENCY)
+    steps, finished_at = execute(power_plan.build_shutdown_plan(inv), cluster)
+
+    assert all(step.ok for step in steps.values()), {k: s.error for k, s in steps.items() if not s.ok}
+    assert 'vm:9000' not in steps
+
+    guests = [key for key, step in steps.items() if step.kind != 'node']
+    # Pi-hole stops last, after every other guest
+    assert all(steps[PIHOLE].started_at >= finished_at[key] for key in guests if key != PIHOLE)
+    # LXCs stop only once every VM has
+    vms_done = max(finished_at[key] for key in guests if steps[key].kind == 'vm')
+    assert all(steps[key].started_at >= vms_done for key in guests if steps[key].kind == 'lxc')
+    # Each node shuts down after its own guests
+    for node in PROXMOX_NODES:
+        own = [key for key in guests if steps[key].node == node]
+        assert own
+        assert all(steps[f'node:{node}'].started_at >= finished_at[key] for key in own)
+
+
+def test_startup_order():
+    inv = make_inventory()
+    cluster = power_plan.SimulatedCluster(inv, powered_off=True, latency=LATENCY)
+
+    wake, _ = execute(power_plan.build_wake_plan(), cluster)
+    online = [step.node for step in wake.values() if step.ok]
+    assert sorted(online) == sorted(PROXMOX_NODES)
+
+    async def fetch():
+        return await inventory.InventoryService(cluster, ttl=0).get(refresh=True)
+
+    steps, finished_at = execute(power_plan.build_startup_plan(asyncio.run(fetch()), online), cluster)
+
+    assert all(step.ok and step.changed for step in steps.values())
+    assert {step.kind for step in steps.values()} == {'vm', 'lxc'}
+    # Pi-hole starts first, everything else waits for it to be running
+    assert all(step.started_at >= finished_at[PIHOLE] for key, step in steps.items() if key != PIHOLE)
+    assert all(guest['status'] == 'running' for guest in cluster.resources.values())
+
+
+def test_startup_skips_offline_nodes():
+    inv = make_inventory()
+    cluster = power_plan.SimulatedCluster(inv, latency=LATENCY)
+    steps, _ = execute(power_plan.build_startup_plan(inv, ['node01', 'node02']), cluster)
+
+    blocked = {key for key, step in steps.items() if step.status == 'blocked'}
+    assert blocked == {f'lxc:{ctid}' for _, node_ip, ctid in LXC_STARTUP_ORDER if NODE_NAMES[node_ip] == 'node03'}
+
+
+def test_failure_blocks_dependents():
+    inv = make_inventory()
+    cluster = power_plan.SimulatedCluster(inv, latency=LATENCY)
+    node_ip = PROXMOX_NODES['node01']
+
+    plan = power_plan.PowerPlan(operation='shutdown')
+    # CT 999 doesn't exist, so its stop fails
+    plan.add(power_plan.PowerStep(
+        key='lxc:999', kind='lxc', action='stop', name='missing', node='node01', node_ip=node_ip, vmid=999,
+    ))
+    plan.add(power_plan.PowerStep(
+        key='vm:101', kind='vm', action='stop', name='vm0', node='node01', node_ip=node_ip, vmid=101,
+        requires={'lxc:999'},
+    ))
+    plan.add(power_plan.PowerStep(
+        key='node:node01', kind='node', action='shutdown', name='node01', node='node01', node_ip=node_ip,
+        requires={'vm:101'},
+    ))
+    plan.add(power_plan.PowerStep(
+        key='vm:104', kind='vm', action='stop', name='vm3', node='node01', node_ip=node_ip, vmid=104,
+        after={'lxc:999'},
+    ))
+    steps, _ = execute(plan, cluster)
+
+    assert steps['lxc:999'].status == 'failed'
+    assert steps['vm:101'].status == 'blocked' and 'lxc:999' in steps['vm:101'].error
+    assert steps['node:node01'].status == 'blocked'
+    # `after` only orders, it doesn't block
+    assert steps['vm:104'].ok
+    assert cluster.resources[101]['status'] == 'running'
+    assert cluster.online['node01']
+    assert not any('shutdown -h' in command for command in cluster.commands)
+
+
+def test_cycle_rejected():
+    plan = power_plan.PowerPlan(operation='shutdown')
+    plan.add(power_plan.PowerStep('vm:1', 'vm', 'stop', 'a', 'node01', '', vmid=1, after={'vm:2'}))
+    plan.add(power_plan.PowerStep('vm:2', 'vm', 'stop', 'b', 'node01', '', vmid=2, after={'vm:1'}))
+    with pytest.raises(ValueError, match='cycle'):
+        plan.validate()
@@ -0,0 +1,124 @@
+"""Host probe parsing from recorded probe output."""
+
+import pytest
+
+from bench_database import load_core_module
+
+probe = load_core_module('probe')
+
+FIELDS = ['uptime', 'disk', 'memory', 'containers', 'stats', 'upgradable']
+
+# Probe output in the shape a Docker VM returns (tabs in docker output)
+HEALTHY = """\
+@@SENTINEL-BEGIN uptime@@
+up 3 weeks, 2 days, 4 hours, 17 minutes
+@@SENTINEL-END uptime rc=0@@
+@@SENTINEL-BEGIN disk@@
+/dev/sda1       61611820 21875524  36573156      38% /
+@@SENTINEL-END disk rc=0@@
+@@SENTINEL-BEGIN memory@@
+Mem:      8326529024  3087798272   404078592    12763136  4834652160  4943241216
+@@SENTINEL-END memory rc=0@@
+@@SENTINEL-BEGIN containers@@
+grafana\tUp 2 weeks\tgrafana/grafana:latest
+prometheus\tUp 2 weeks (healthy)\tprom/prometheus:latest
+uptime-kuma\tRestarting (1) 8 seconds ago\tlouislam/uptime-kuma:1
+jaeger\tExited (137) 3 days ago\tjaegertracing/all-in-one:latest
+backup-job\tExited (0) 5 hours ago\talpine:3.19
+@@SENTINEL-END containers rc=0@@
+@@SENTINEL-BEGIN stats@@
+grafana\t0.42%\t3.10%
+prometheus\t12.50%\t9.87%
+uptime-kuma\t--\t--
+@@SENTINEL-END stats rc=0@@
+@@SENTINEL-BEGIN upgradable@@
+curl/jammy-updates 7.81.0-1ubuntu1.16 amd64 [upgradable from: 7.81.0-1ubuntu1.15]
+libcurl4/jammy-updates 7.81.0-1ubuntu1.16 amd64 [upgradable from: 7.81.0-1ubuntu1.15]
+@@SENTINEL-END upgradable rc=0@@
+"""
+
+
+def test_build_script_delimits_each_field():
+    script = probe.build_probe_script(['uptime', 'upgradable'])
+    assert script.splitlines()[0] == "echo '@@SENTINEL-BEGIN uptime@@'"
+    assert 'echo "@@SENTINEL-END upgradable rc=$?@@"' in script
+    # The listing only runs once the cache refresh succeeded
+    assert 'apt-get update -qq >/dev/null 2>&1 && apt list --upgradable' in script
+
+    with pytest.raises(ValueError):
+        probe.build_probe_script(['uptime', 'kernel'])
+
+
+def test_parse_healthy_host():
+    result = probe.parse_probe_output('192.168.40.13', FIELDS, HEALTHY)
+
+    assert result.success and result.exit_codes == {name: 0 for name in FIELDS}
+    assert result.uptime == 'up 3 weeks, 2 days, 4 hours, 17 minutes'
+    assert result.disk == probe.DiskUsage(total_kb=61611820, used_kb=21875524, available_kb=36573156, percent=38)
+    assert result.memory.total == 8326529024 and result.memory.available == 4943241216
+    assert round(result.memory.percent, 1) == 37.1
+
+    problems = {c.name: c.problem for c in result.containers}
+    assert problems == {
+        'grafana': None, 'prometheus': None, 'uptime-kuma': 'restarting',
+        'jaeger': 'crashed', 'backup-job': None,
+    }
+    assert result.containers[0].image == 'grafana/grafana:latest'
+    # Rows docker couldn't sample ("--") are skipped
+    assert [(s.name, s.cpu_percent, s.mem_percent) for s in result.stats] == [
+        ('grafana', 0.42, 3.10), ('prometheus', 12.50, 9.87),
+    ]
+    assert len(result.upgradable) == 2 and result.upgradable[0].startswith('curl/')
+
+
+def test_crlf_output():
+    result = probe.parse_probe_output('host', FIELDS, HEALTHY.replace('\n', '\r\n'))
+    assert result.exit_codes == {name: 0 for name in FIELDS}
+    assert result.containers[1].status == 'Up 2 weeks (healthy)'
+
+
+def test_truncated_section():
+    # Exec timed out while `docker stats` was running: no END marker for it or anything after
+    output = HEALTHY[:HEALTHY.index('prometheus\t12.50%')]
+    result = probe.parse_probe_output('host', FIELDS, output)
+
+    assert set(result.exit_codes) == {'uptime', 'disk', 'memory', 'containers'}
+    assert len(result.containers) == 5
+    assert result.stats is None
+    assert result.upgradable is None
+
+
+def test_failed_commands():
+    output = """\
+@@SENTINEL-BEGIN containers@@
+@@SENTINEL-END containers rc=127@@
+@@SENTINEL-BEGIN stats@@
+@@SENTINEL-END stats rc=1@@
+@@SENTINEL-BEGIN upgradable@@
+@@SENTINEL-END upgradable rc=100@@
+"""
+    result = probe.parse_probe_output('host', ['containers', 'stats', 'upgradable'], output)
+
+    assert result.exit_codes == {'containers': 127, 'stats': 1, 'upgradable': 100}
+    # A failed apt-get update is not "no upgrades"
+    assert result.upgradable is None
+    assert result.containers is None and result.stats is None
+
+
+def test_up_to_date_is_empty_not_none():
+    output = "@@SENTINEL-BEGIN upgradable@@\n@@SENTINEL-END upgradable rc=0@@\n"
+    assert probe.parse_probe_output('host', ['upgradable'], output).upgradable == []
+
+
+def test_unrequested_and_garbage_lines_ignored():
+    output = "Welcome to Ubuntu\n" + HEALTHY + "@@SENTINEL-BEGIN uptime@@\nnoise"
+    result = probe.parse_probe_output('host', ['uptime'], output)
+    assert result.exit_codes == {'uptime': 0}
+    assert result.disk is None
+
+
+def test_malformed_rows():
+    assert probe.parse_disk('df: /: No such file or directory') is None
+    assert probe.parse_memory('Mem: lots') is None
+    assert probe.parse_containers('\nno-tabs-here\n') == []
+    assert probe.parse_stats('grafana\tN/A%\t1%') == []
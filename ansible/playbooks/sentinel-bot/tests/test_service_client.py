@@ -0,0 +1,180 @@
+"""ServiceClient retries and circuit breaking against a fake aiohttp server."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bench_database import load_core_module
+
+service_client = load_core_module('service_client')
+
+
+class FakeService:
+    """aiohttp app answering each request with the next scripted status (the last one repeats)."""
+
+    def __init__(self, *statuses, delay=0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.hits = []
+
+    async def handle(self, request):
+        self.hits.append(request.method)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return web.json_response({'status': status}, status=status)
+
+    def app(self):
+        app = web.Application()
+        app.router.add_route('*', '/api/{tail:.*}', self.handle)
+        return app
+
+
+def run(service, scenario, **client_kwargs):
+    """Run scenario(client) with a ServiceClient pointed at a TestServer for `service`."""
+    async def main():
+        async with TestServer(service.app()) as server:
+            client = service_client.ServiceClient('fake', str(server.make_url('/api')), **client_kwargs)
+
+            async def no_backoff(attempt):
+                pass
+            client._backoff = no_backoff
+            try:
+                return await scenario(client)
+            finally:
+                await client.close()
+    return asyncio.run(main())
+
+
+async def status_of(client, method='GET'):
+    async with client.request(method, 'items') as resp:
+        return resp.status
+
+
+@pytest.mark.parametrize('status', [503, 429])
+def test_get_retried_on_retry_status(status):
+    service = FakeService(status, status, 200)
+    assert run(service, status_of) == 200
+    assert service.hits == ['GET'] * 3
+
+
+def test_retries_exhausted_returns_last_response():
+    service = FakeService(503)
+
+    async def scenario(client):
+        return await status_of(client), client.stats()
+
+    status, stats = run(service, scenario, retries=2)
+    assert status == 503
+    assert len(service.hits) == 3 and stats['retried'] == 2
+
+
+@pytest.mark.parametrize('method', ['POST', 'PUT', 'DELETE'])
+def test_non_idempotent_not_retried(method):
+    service = FakeService(503, 200)
+    assert run(service, lambda client: status_of(client, method)) == 503
+    assert service.hits == [method]
+
+
+def test_client_errors_not_retried_or_counted():
+    service = FakeService(404)
+
+    async def scenario(client):
+        for _ in range(10):
+            assert await status_of(client) == 404
+        return client.breaker.state
+
+    assert run(service, scenario) == 'closed'
+    assert len(service.hits) == 10
+
+
+def test_rate_limit_does_not_open_breaker():
+    service = FakeService(429)
+
+    async def scenario(client):
+        client.breaker.threshold = 2
+        for _ in range(3):
+            await status_of(client)
+        return client.breaker.state
+
+    assert run(service, scenario, retries=2) == 'closed'
+
+
+def test_breaker_opens_at_threshold():
+    service = FakeService(500)
+
+    async def scenario(client):
+        client.breaker.threshold = 3
+        for i in range(3):
+            assert client.breaker.state == 'closed', i
+            assert await status_of(client) == 500
+        assert client.breaker.state == 'open'
+
+        with pytest.raises(service_client.CircuitOpenError):
+            await status_of(client)
+        # get_json swallows the open circuit
+        assert await client.get_json('items') is None
+        return client.stats()
+
+    stats = run(service, scenario, retries=0)
+    assert len(service.hits) == 3
+    assert stats['short_circuited'] == 2 and stats['failures'] == 3
+
+
+def test_half_open_trial_success_closes():
+    service = FakeService(500, 500, 200)
+
+    async def scenario(client):
+        client.breaker.threshold = 2
+        client.breaker.cooldown = 0.05
+        await status_of(client)
+        await status_of(client)
+        assert client.breaker.state == 'open'
+
+        await asyncio.sleep(0.06)
+        assert client.breaker.state == 'half_open'
+        assert await status_of(client) == 200
+        assert client.breaker.state == 'closed' and client.breaker.failures == 0
+        assert await status_of(client) == 200
+
+    run(service, scenario, retries=0)
+    assert len(service.hits) == 4
+
+
+def test_half_open_trial_failure_reopens():
+    service = FakeService(500)
+
+    async def scenario(client):
+        client.breaker.threshold = 2
+        client.breaker.cooldown = 0.05
+        await status_of(client)
+        await status_of(client)
+        await asyncio.sleep(0.06)
+
+        assert await status_of(client) == 500
+        assert client.breaker.state == 'open'
+        with pytest.raises(service_client.CircuitOpenError):
+            await status_of(client)
+
+    run(service, scenario, retries=0)
+    assert len(service.hits) == 3
+
+
+def test_half_open_allows_one_trial():
+    service = FakeService(500, 500, 200, delay=0.02)
+
+    async def scenario(client):
+        client.breaker.threshold = 2
+        client.breaker.cooldown = 0.05
+        await status_of(client)
+        await status_of(client)
+        await asyncio.sleep(0.06)
+
+        return await asyncio.gather(status_of(client), status_of(client), return_exceptions=True)
+
+    results = run(service, scenario, retries=0)
+    assert sorted(map(type, results), key=str) == sorted([int, service_client.CircuitOpenError], key=str)
+    assert 200 in results
+    assert len(service.hits) == 3
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Sentinel Database Micro-Benchmark
+Measures task queue throughput (tasks/sec) for create, claim and complete
+against a throwaway SQLite database.
+
+Usage:
+    python tools/bench_database.py [--tasks 2000]
+
+Run it on both sides of a database change to compare.
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import time
+import types
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_core_module(name: str) -> types.ModuleType:
+    """Import a core/ module without running core/__init__ (and the Discord stack)."""
+    if 'sentinel_core' not in sys.modules:
+        package = types.ModuleType('sentinel_core')
+        package.__path__ = [os.path.join(BOT_DIR, 'core')]
+        sys.modules['sentinel_core'] = package
+    return importlib.import_module(f'sentinel_core.{name}')
+
+
+def load_database_class():
+    """Import core/database.py directly so the Discord stack isn't required."""
+    return load_core_module('database').Database
+
+
+async def timed(label: str, count: int, coro) -> None:
+    """Run a coroutine and print its throughput."""
+    started = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {count:>7} tasks  {elapsed:7.3f}s  {count / elapsed:10.0f} tasks/sec")
+
+
+async def run(count: int) -> None:
+    Database = load_database_class()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        await db.initialize()
+
+        async def create():
+            for i in range(count):
+                await db.create_task(f"Benchmark task {i}", priority=('high', 'medium', 'low')[i % 3])
+
+        async def claim():
+            for _ in range(count):
+                task = await db.get_next_task()
+                await db.claim_task(task['id'], 'bench', 'bench')
+
+        async def complete():
+            for task_id in range(1, count + 1):
+                await db.complete_task(task_id, 'bench', 'done')
+
+        await timed('create', count, create())
+        await timed('claim (next + claim)', count, claim())
+        await timed('complete', count, complete())
+
+        if hasattr(db, 'batch'):
+            async def create_batched():
+                async with db.batch():
+                    for i in range(count):
+                        await db.create_task(f"Batched task {i}")
+
+            await timed('create (batch)', count, create_batched())
+
+        await db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=2000, help='Number of tasks per phase')
+    args = parser.parse_args()
+
+    sys.path.insert(0, BOT_DIR)
+    asyncio.run(run(args.tasks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Sentinel Pending-Task Lookup Benchmark
+Measures next-task and queue-page latency as the tasks table grows, to check
+that lookups stay flat with a large history and a large pending backlog.
+
+Usage:
+    python tools/bench_pending_tasks.py [--history 100000] [--pending 1000]
+
+Completed tasks are bulk-loaded as history; the pending backlog is spread
+across all priorities.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from bench_database import load_core_module
+
+PRIORITIES = ('high', 'medium', 'low')
+
+
+async def bulk_insert(db, count: int, status: str, offset: int = 0) -> None:
+    """Insert rows directly, bypassing the per-task audit log."""
+    cursor = await db._connection.execute('PRAGMA table_info(tasks)')
+    has_rank = 'priority_rank' in {row['name'] for row in await cursor.fetchall()}
+    ranks = getattr(load_core_module('database'), 'PRIORITY_RANKS', {})
+
+    rows = []
+    for i in range(offset, offset + count):
+        priority = PRIORITIES[i % 3]
+        created_at = f"2026-01-01 00:{(i // 60) % 60:02d}:{i % 60:02d}"
+        row = (f"Task {i}", status, priority, created_at)
+        rows.append(row + (ranks.get(priority, 2),) if has_rank else row)
+
+    columns = 'description, status, priority, created_at' + (', priority_rank' if has_rank else '')
+    placeholders = ', '.join('?' * len(rows[0]))
+    await db._connection.executemany(
+        f'INSERT INTO tasks ({columns}) VALUES ({placeholders})', rows
+    )
+    await db._connection.commit()
+
+
+async def measure(label: str, coro_factory, iterations: int) -> None:
+    """Print the mean latency of a lookup."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await coro_factory()
+    elapsed = (time.perf_counter() - started) / iterations
+    print(f"  {label:<26} {elapsed * 1e6:9.1f} us")
+
+
+async def run(history: int, pending: int, iterations: int) -> None:
+    Database = load_core_module('database').Database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        await db.initialize()
+
+        completed = 0
+        offset = 0
+        for target, backlog in ((history // 100, 10), (history // 10, 10), (history, pending)):
+            await bulk_insert(db, target - completed, 'completed', offset=offset)
+            offset += target - completed
+            completed = target
+            await bulk_insert(db, backlog, 'pending', offset=offset)
+            offset += backlog
+
+            stats = await db.get_task_stats()
+            print(f"history={stats.get('completed', 0)} pending={stats.get('pending', 0)}")
+            await measure('get_next_task', db.get_next_task, iterations)
+            await measure('get_pending_tasks(50)', lambda: db.get_pending_tasks(limit=50), iterations)
+
+        module = load_core_module('database')
+        if hasattr(module, 'PENDING_INDEX'):
+            query = (f"SELECT * FROM tasks INDEXED BY {module.PENDING_INDEX} WHERE status = 'pending' "
+                     f"ORDER BY {module.PENDING_ORDER} LIMIT 1")
+        else:
+            query = f"SELECT * FROM tasks WHERE status = 'pending' ORDER BY {module.PRIORITY_ORDER}, created_at LIMIT 1"
+        cursor = await db._connection.execute(f"EXPLAIN QUERY PLAN {query}")
+        print("query plan:", '; '.join(row['detail'] for row in await cursor.fetchall()))
+        await db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--history', type=int, default=100000, help='Completed tasks to load')
+    parser.add_argument('--pending', type=int, default=1000, help='Pending backlog at full size')
+    parser.add_argument('--iterations', type=int, default=500, help='Lookups per measurement')
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.history, args.pending, args.iterations)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Sentinel Claim-Next Load Test
+Drives POST /api/tasks/claim-next with concurrent simulated workers against
+a throwaway database and checks that no task is claimed twice and no
+request is wasted.
+
+Usage:
+    python tools/loadtest_claim_next.py [--workers 20] [--tasks 500]
+
+Each worker keeps claiming until the queue is empty, so the only requests
+that may come back empty are one final request per worker.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from bench_database import BOT_DIR, load_database_class
+
+
+def load_create_app():
+    """Import webhooks/server.py directly so the Discord stack isn't required."""
+    path = os.path.join(BOT_DIR, 'webhooks', 'server.py')
+    spec = importlib.util.spec_from_file_location('sentinel_webhooks', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.create_app
+
+
+async def run(workers: int, count: int) -> int:
+    Database = load_database_class()
+    create_app = load_create_app()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'loadtest.db'))
+        await db.initialize()
+        async with db.batch():
+            for i in range(count):
+                await db.create_task(f"Load test task {i}", priority=('high', 'medium', 'low')[i % 3])
+
+        bot = SimpleNamespace(db=db, ssh=None, channel_router=None, guilds=[], is_ready=lambda: True)
+        config = SimpleNamespace(webhook=SimpleNamespace(api_key='loadtest'))
+        app = create_app(bot, config)
+        client = app.test_client()
+
+        claimed = []
+        requests = Counter()
+
+        async def worker(n: int):
+            while True:
+                requests[n] += 1
+                resp = await client.post('/api/tasks/claim-next', json={'instance_id': f'worker-{n}'})
+                body = await resp.get_json()
+                if resp.status_code != 200:
+                    raise RuntimeError(f"worker-{n}: HTTP {resp.status_code} {body}")
+                if not body.get('task'):
+                    return
+                claimed.append(body['task']['id'])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(workers)))
+        elapsed = time.perf_counter() - started
+        await db.close()
+
+    total_requests = sum(requests.values())
+    double_claims = [task_id for task_id, n in Counter(claimed).items() if n > 1]
+    wasted = total_requests - count - workers
+
+    print(f"workers={workers} tasks={count} requests={total_requests} "
+          f"elapsed={elapsed:.2f}s ({count / elapsed:.0f} claims/sec)")
+    print(f"claimed={len(set(claimed))} double_claims={len(double_claims)} wasted_requests={wasted}")
+
+    if double_claims or wasted or len(set(claimed)) != count:
+        print("FAIL")
+        return 1
+    print("OK")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=20, help='Concurrent workers')
+    parser.add_argument('--tasks', type=int, default=500, help='Tasks to enqueue')
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.workers, args.tasks)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Sentinel Database Migration Tool
+Shows the schema version of a sentinel database and applies pending
+migrations, or rehearses them with --dry-run.
+
+Usage:
+    python tools/migrate_database.py [--db /app/data/sentinel.db] [--dry-run]
+
+The bot migrates automatically on startup; use this to check what a
+deploy will do against a copy of the production database first.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+import aiosqlite
+
+from bench_database import load_core_module
+
+
+async def run(db_path: str, dry_run: bool) -> int:
+    migrations = load_core_module('migrations')
+
+    if not os.path.exists(db_path):
+        print(f"Database not found: {db_path}")
+        return 1
+
+    async with aiosqlite.connect(db_path) as connection:
+        current = await migrations.get_schema_version(connection)
+        latest = migrations.MIGRATIONS[-1].version
+        print(f"{db_path}: schema version {current} (latest {latest})")
+
+        for step in migrations.MIGRATIONS:
+            if step.version > current:
+                print(f"  pending  {step.version}: {step.description}")
+
+        report = await migrations.migrate(connection, dry_run=dry_run)
+
+    if report.applied:
+        verb = 'Would apply' if dry_run else 'Applied'
+        print(f"{verb} {len(report.applied)} migration(s) in {report.elapsed_ms:.1f}ms")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default=os.environ.get('DB_PATH', '/app/data/sentinel.db'),
+                        help='Database path (default: $DB_PATH)')
+    parser.add_argument('--dry-run', action='store_true', help='Run pending migrations, then roll back')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(name)s: %(message)s')
+    sys.exit(asyncio.run(run(args.db, args.dry_run)))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,11 +3,13 @@ Sentinel Bot Webhook Server
 Quart-based async HTTP server for webhooks and APIs.
 """
 
+import asyncio
+import json
 import logging
 from functools import wraps
 from typing import TYPE_CHECKING
 
-from quart import Quart, request, jsonify
+from quart import Quart, request, jsonify, make_response
 
 if TYPE_CHECKING:
     from core import SentinelBot
@@ -15,6 +17,27 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger('sentinel.webhooks')
 
+# Task feed limits (seconds)
+LONG_POLL_DEFAULT_TIMEOUT = 30
+LONG_POLL_MAX_TIMEOUT = 60
+STREAM_KEEPALIVE_INTERVAL = 15
+
+# Task list page size
+TASK_PAGE_DEFAULT = 50
+TASK_PAGE_MAX = 200
+
+
+def parse_task_cursor(value: str):
+    """Parse an `after` cursor of the form "<rank>,<created_at>,<id>"."""
+    rank, rest = value.split(',', 1)
+    created_at, task_id = rest.rsplit(',', 1)
+    return int(rank), created_at, int(task_id)
+
+
+def format_task_cursor(cursor) -> str:
+    """Format a (rank, created_at, id) keyset cursor for the `after` parameter."""
+    return ','.join(str(part) for part in cursor)
+
 
 def require_api_key(f):
     """Decorator to require API key for endpoints."""
@@ -46,6 +69,14 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             'status': 'healthy',
             'bot_ready': bot.is_ready() if bot else False,
             'guilds': len(bot.guilds) if bot else 0,
+            'ssh_pool': bot.ssh.pool_stats() if bot and bot.ssh else None,
+            'task_feed': bot.db.notifier.stats() if bot and bot.db else None,
+            'outbound': bot.channel_router.stats() if bot and bot.channel_router else None,
+            'services': {name: client.stats() for name, client in bot.services.items()} if bot else None,
+            'response_cache': bot.response_cache.stats() if bot and bot.response_cache else None,
+            'library': bot.library.stats() if bot and bot.library else None,
+            'inventory': bot.inventory.stats() if bot and bot.inventory else None,
+            'arr_webhooks': getattr(bot.get_cog('Scheduler'), 'arr_events', None) if bot else None,
         })
 
     # ==================== Watchtower Webhook ====================
@@ -106,6 +137,9 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             }
             event = event_map.get(notification_type, notification_type)
 
+            if notification_type == 'MEDIA_AVAILABLE' and bot.library:
+                await bot.library.on_media_available(media_type, media.get('tmdbId'), media.get('tvdbId'))
+
             if bot.channel_router:
                 await bot.channel_router.send_media_notification(
                     title=title,
@@ -123,17 +157,61 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             logger.error(f"Jellyseerr webhook error: {e}")
             return jsonify({'error': str(e)}), 500
 
+    # ==================== Radarr/Sonarr Webhooks ====================
+
+    @app.route('/webhook/<any(radarr, sonarr):service>', methods=['POST'])
+    async def arr_webhook(service: str):
+        """
+        Handle Radarr/Sonarr Grab, Download and DownloadFailure events.
+
+        Acknowledged immediately; the event is applied in the background so
+        a slow queue poll never holds up the *arr's webhook call.
+        """
+        # Imported here: core/__init__ pulls in Discord, which tools/ load tests run without
+        from core.arr_events import parse_arr_event
+
+        try:
+            data = await request.get_json()
+            event = parse_arr_event(service, data or {})
+            if event is None:
+                # Test and other event types
+                return jsonify({'status': 'ignored'})
+
+            logger.info(f"{service} webhook: {event.event_type} {event.title}")
+
+            scheduler = bot.get_cog('Scheduler')
+            if not scheduler:
+                return jsonify({'error': 'Scheduler not loaded'}), 503
+
+            app.add_background_task(scheduler.handle_arr_event, event)
+            return jsonify({'status': 'accepted'}), 202
+        except Exception as e:
+            logger.error(f"{service} webhook error: {e}")
+            return jsonify({'error': str(e)}), 500
+
     # ==================== Claude Task API ====================
 
     @app.route('/api/tasks', methods=['GET'])
     async def list_tasks():
-        """List pending tasks."""
+        """List pending tasks (?limit=50, ?after=<rank,created_at,id> for the next page)."""
         try:
             if not bot.db:
                 return jsonify({'error': 'Database not available'}), 503
 
-            tasks = await bot.db.get_pending_tasks(limit=50)
-            return jsonify({'tasks': tasks})
+            try:
+                limit = int(request.args.get('limit', TASK_PAGE_DEFAULT))
+                after = request.args.get('after')
+                after = parse_task_cursor(after) if after else None
+            except ValueError:
+                return jsonify({'error': 'invalid limit or after cursor'}), 400
+            limit = max(1, min(limit, TASK_PAGE_MAX))
+
+            tasks = await bot.db.get_pending_tasks(limit=limit, after=after)
+            next_after = None
+            if len(tasks) == limit:
+                next_after = format_task_cursor(bot.db.pending_cursor(tasks[-1]))
+
+            return jsonify({'tasks': tasks, 'next_after': next_after})
         except Exception as e:
             logger.error(f"List tasks error: {e}")
             return jsonify({'error': str(e)}), 500
@@ -149,6 +227,7 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             description = data.get('description')
             priority = data.get('priority', 'medium')
             submitted_by = data.get('submitted_by', 'api')
+            tag = data.get('tag')
 
             if not description:
                 return jsonify({'error': 'description required'}), 400
@@ -156,7 +235,8 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             task_id = await bot.db.create_task(
                 description=description,
                 priority=priority,
-                submitted_by=submitted_by
+                submitted_by=submitted_by,
+                tag=tag
             )
 
             # Notify via Discord
@@ -187,6 +267,107 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
             logger.error(f"Get next task error: {e}")
             return jsonify({'error': str(e)}), 500
 
+    @app.route('/api/tasks/wait', methods=['GET'])
+    async def wait_for_task():
+        """Long-poll for the next available task (?timeout=30, max 60 seconds)."""
+        try:
+            if not bot.db:
+                return jsonify({'error': 'Database not available'}), 503
+
+            try:
+                timeout = float(request.args.get('timeout', LONG_POLL_DEFAULT_TIMEOUT))
+            except ValueError:
+                return jsonify({'error': 'timeout must be a number'}), 400
+            timeout = max(0.0, min(timeout, LONG_POLL_MAX_TIMEOUT))
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+
+            while True:
+                # Snapshot before checking so a task created in between still wakes us
+                version = bot.db.notifier.version
+                task = await bot.db.get_next_task()
+                if task:
+                    return jsonify({'task': task})
+
+                remaining = deadline - loop.time()
+                if remaining <= 0 or not await bot.db.notifier.wait(version, remaining):
+                    return jsonify({'task': None, 'message': 'No pending tasks'})
+        except Exception as e:
+            logger.error(f"Wait for task error: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/tasks/stream', methods=['GET'])
+    async def stream_tasks():
+        """Server-sent events feed of tasks as they become pending."""
+        if not bot.db:
+            return jsonify({'error': 'Database not available'}), 503
+
+        async def events():
+            with bot.db.notifier.subscribe() as queue:
+                # Current backlog first, so a fresh subscriber doesn't miss anything
+                for task in await bot.db.get_pending_tasks(limit=50):
+                    yield f"event: task\ndata: {json.dumps(task)}\n\n".encode()
+
+                while True:
+                    try:
+                        task_id = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_INTERVAL)
+                    except asyncio.TimeoutError:
+                        yield b": keepalive\n\n"
+                        continue
+
+                    task = await bot.db.get_task(task_id)
+                    if task and task['status'] == 'pending':
+                        yield f"event: task\ndata: {json.dumps(task)}\n\n".encode()
+
+        response = await make_response(events(), {
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        })
+        response.timeout = None
+        return response
+
+    @app.route('/api/tasks/claim-next', methods=['POST'])
+    async def claim_next_task():
+        """Atomically claim the next available task (optionally by tag or priority)."""
+        try:
+            if not bot.db:
+                return jsonify({'error': 'Database not available'}), 503
+
+            data = await request.get_json() or {}
+            instance_id = data.get('instance_id')
+            instance_name = data.get('instance_name')
+
+            if not instance_id:
+                return jsonify({'error': 'instance_id required'}), 400
+
+            task = await bot.db.claim_next_task(
+                instance_id,
+                instance_name,
+                tag=data.get('tag'),
+                priority=data.get('priority')
+            )
+            if not task:
+                return jsonify({'task': None, 'message': 'No pending tasks'})
+
+            # Update instance heartbeat
+            await bot.db.update_instance_heartbeat(instance_id, instance_name or instance_id, 'working')
+
+            # Notify via Discord
+            if bot.channel_router:
+                await bot.channel_router.send_task_notification(
+                    task_id=task['id'],
+                    description=task['description'],
+                    event='claimed',
+                    instance_name=instance_name
+                )
+
+            return jsonify({'status': 'claimed', 'task': task})
+        except Exception as e:
+            logger.error(f"Claim next task error: {e}")
+            return jsonify({'error': str(e)}), 500
+
     @app.route('/api/tasks/<int:task_id>/claim', methods=['POST'])
     async def claim_task(task_id: int):
         """Claim a task for processing."""
@@ -209,8 +390,8 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
 
                 # Notify via Discord
                 if bot.channel_router:
-                    task = await bot.db.get_pending_tasks(limit=100)
-                    task_desc = next((t['description'] for t in task if t['id'] == task_id), 'Unknown')
+                    task = await bot.db.get_task(task_id)
+                    task_desc = task['description'] if task else 'Unknown'
                     await bot.channel_router.send_task_notification(
                         task_id=task_id,
                         description=task_desc,
@@ -297,17 +478,19 @@ def create_app(bot: 'SentinelBot', config: 'Config') -> Quart:
 
     @app.route('/api/stats', methods=['GET'])
     async def get_stats():
-        """Get task queue statistics."""
+        """Get task queue and database storage statistics."""
         try:
             if not bot.db:
                 return jsonify({'error': 'Database not available'}), 503
 
             task_stats = await bot.db.get_task_stats()
             instances = await bot.db.get_active_instances(minutes=10)
+            storage = await bot.db.get_storage_stats()
 
             return jsonify({
                 'tasks': task_stats,
                 'active_instances': len(instances),
+                'storage': storage,
             })
         except Exception as e:
             logger.error(f"Stats error: {e}")